@@ -2,4 +2,25 @@ from app import models
 
 def insert_publikasi(db, data: dict):
     publikasi = models.Publikasi(**data)
-    db.add(publikasi)
\ No newline at end of file
+    db.add(publikasi)
+
+def escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def get_publikasi_page(db, filters: dict, title_query=None, after=None, limit=50):
+    """
+    Satu halaman publikasi dengan keyset pagination (ORDER BY id, lanjut dari id `after`),
+    sehingga biaya tiap halaman tidak bergantung pada posisinya di tabel.
+    """
+    query = db.query(models.Publikasi)
+    for col, value in filters.items():
+        if value is not None:
+            query = query.filter(getattr(models.Publikasi, col) == value)
+    if title_query:
+        query = query.filter(models.Publikasi.judul.ilike(f"%{escape_like(title_query)}%", escape="\\"))
+    if after is not None:
+        query = query.filter(models.Publikasi.id > after)
+
+    rows = query.order_by(models.Publikasi.id).limit(limit + 1).all()
+    next_cursor = rows[limit - 1].id if len(rows) > limit else None
+    return rows[:limit], next_cursor
@@ -1,18 +1,45 @@
+import logging
 import pandas as pd
 import uvicorn
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, UploadFile, File, Depends
 from sqlalchemy.orm import Session
 from app.database import SessionLocal, engine
 from app import models, crud
 from app.utils.cleaner import clean_and_match_data
-from app.routes import publication_collection, publication_analysis, upload
+from app.routes import publication_collection, publication_analysis, upload, jobs, publications, metrics
+from app.utils.loader import missing_fingerprints
+from app.utils.classifier import topic_classifier
 
 models.Base.metadata.create_all(bind=engine)
-app = FastAPI()
+
+logger = logging.getLogger(__name__)
+
+def check_publication_schema():
+    """Hanya memeriksa; perubahan skema dan backfill fingerprint dijalankan lewat `python -m app.migrate`."""
+    try:
+        with SessionLocal() as db:
+            if missing_fingerprints(db):
+                logger.warning("Publications without a fingerprint found, run `python -m app.migrate` before uploading")
+    except Exception as e:
+        logger.warning(f"Publication schema is not up to date, run `python -m app.migrate`: {e}")
+
+@asynccontextmanager
+async def lifespan(app):
+    check_publication_schema()
+    # Model topik dimuat sekali per proses, bukan per request /analysis/classify.
+    await topic_classifier.start()
+    yield
+    await topic_classifier.stop()
+
+app = FastAPI(lifespan=lifespan)
 
 app.include_router(publication_collection.router, prefix="/collection", tags=["Publication Collection"])
 app.include_router(publication_analysis.router, prefix="/analysis", tags=["Publication Analysis"])
 app.include_router(upload.router, prefix="/insertdb", tags=["Upload"])
+app.include_router(jobs.router, prefix="/jobs", tags=["Jobs"])
+app.include_router(publications.router, prefix="/publications", tags=["Publications"])
+app.include_router(metrics.router, tags=["Metrics"])
 
 if __name__ == "__main__":
     uvicorn.run("app.main:app", host="0.0.0.0", port=8000, reload=True)
\ No newline at end of file
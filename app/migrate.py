@@ -0,0 +1,24 @@
+import logging
+import argparse
+from app.database import SessionLocal, engine
+from app import models
+from app.utils.loader import ensure_publication_schema
+
+logger = logging.getLogger(__name__)
+
+def migrate(remove_duplicates=False):
+    """Buat tabel yang belum ada lalu samakan tabel publikasi lama dengan model (kolom, index, fingerprint)."""
+    models.Base.metadata.create_all(bind=engine)
+    with SessionLocal() as db:
+        ensure_publication_schema(db, remove_duplicates=remove_duplicates)
+    logger.info("Publication schema is up to date")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    parser = argparse.ArgumentParser(description="Migrate the publication table to the current schema")
+    parser.add_argument(
+        "--remove-duplicates", action="store_true",
+        help="hapus baris lama dengan fingerprint yang sama (hanya satu yang disimpan)"
+    )
+    args = parser.parse_args()
+    migrate(remove_duplicates=args.remove_duplicates)
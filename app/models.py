@@ -1,11 +1,18 @@
 import uuid
-from sqlalchemy import Column, String
+from sqlalchemy import Column, String, Integer, Index
 from sqlalchemy.dialects.postgresql import UUID
 from .database import Base
 
+# Kolom filter API baca; id ikut di index agar keyset pagination (ORDER BY id) tetap memakai index.
+FILTER_COLUMNS = ["nip", "id_scopus", "tahun", "sumber_data", "topic", "domain"]
+
 class Publikasi(Base):
     __tablename__ = "publikasi"
-    __table_args__ = {'schema': 'penelitian'}
+    __table_args__ = (
+        Index("ux_publikasi_fingerprint", "fingerprint", unique=True),
+        *[Index(f"ix_publikasi_{col}_id", col, "id") for col in FILTER_COLUMNS],
+        {'schema': 'penelitian'},
+    )
 
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     nip = Column(String(30))
@@ -17,4 +24,37 @@ class Publikasi(Base):
     tahun = Column(String(10))
     tautan = Column(String)
     doi = Column(String)
-    sumber_data = Column(String, nullable=True)
\ No newline at end of file
+    sumber_data = Column(String, nullable=True)
+    topic = Column(Integer, nullable=True)
+    domain = Column(String, nullable=True)
+    fingerprint = Column(String(40))
+    content_hash = Column(String(40))
+    # Diisi migrasi untuk baris lama yang fingerprint-nya sudah dipakai baris lain (fingerprint tetap NULL).
+    duplicate_of = Column(String(40))
+
+class TrenTopikTahun(Base):
+    __tablename__ = "tren_topik_tahun"
+    __table_args__ = {'schema': 'penelitian'}
+
+    topic = Column(Integer, primary_key=True)
+    tahun = Column(Integer, primary_key=True)
+    topic_name = Column(String)
+    count = Column(Integer)
+
+class TrenDomainTahun(Base):
+    __tablename__ = "tren_domain_tahun"
+    __table_args__ = {'schema': 'penelitian'}
+
+    domain = Column(String, primary_key=True)
+    tahun = Column(Integer, primary_key=True)
+    count = Column(Integer)
+
+class TrenTopikDosen(Base):
+    __tablename__ = "tren_topik_dosen"
+    __table_args__ = {'schema': 'penelitian'}
+
+    nip = Column(String(30), primary_key=True)
+    rank = Column(Integer, primary_key=True)
+    topic = Column(Integer)
+    topic_name = Column(String)
+    count = Column(Integer)
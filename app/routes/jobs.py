@@ -0,0 +1,24 @@
+from fastapi import APIRouter, HTTPException
+from starlette.responses import StreamingResponse
+from app.utils.jobs import job_manager
+
+router = APIRouter()
+
+def get_job_or_404(job_id: str):
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job
+
+@router.get("/")
+async def list_jobs():
+    return [job.to_dict() for job in job_manager.list()]
+
+@router.get("/{job_id}")
+async def get_job(job_id: str):
+    return get_job_or_404(job_id).to_dict()
+
+@router.get("/{job_id}/logs")
+async def stream_job_logs(job_id: str):
+    job = get_job_or_404(job_id)
+    return StreamingResponse(job_manager.stream_logs(job), media_type="text/plain")
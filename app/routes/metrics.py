@@ -0,0 +1,9 @@
+from fastapi import APIRouter
+from starlette.responses import Response
+from app.utils.metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
+
+router = APIRouter()
+
+@router.get("/metrics")
+async def metrics():
+    return Response(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -1,47 +1,73 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import Response
 from starlette.responses import StreamingResponse
-from pathlib import Path
-import subprocess
 import logging
+from typing import Literal, Optional
+from app.database import SessionLocal, get_read_db, run_db
+from app.schemas import ClassifyRequest, ClassifyResponse
+from app.utils.classifier import CLASSIFY_MAX_TITLES, ClassifierBusy, ClassifierUnavailable, topic_classifier
+from app.utils.pipeline import ANALYSIS_STAGES
+from app.utils.jobs import job_manager
+from app.utils.trends import TRENDS_CACHE_TTL, get_trends, materialize_trends
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
-BASE_DIR = Path(__file__).resolve().parents[2]
+def materialize_after_analysis(job):
+    job.add_log("[trends] Materializing trend aggregates into the database")
+    with SessionLocal() as db:
+        materialize_trends(db)
+    job.add_log("[trends] Trend tables updated")
+    try:
+        topic_classifier.reload_if_changed()
+    except Exception as e:
+        job.add_log(f"[classify] Failed to reload topic model: {e}")
 
-SCRIPTS = [
-    ("preprocessing_title.py", BASE_DIR / "src" / "data-cleaning"),
-    ("publication_trend.py", BASE_DIR / "src" / "modelling")
-]
-
-def stream_script(scripts_with_path: list):
-    def generate():
-        for script_name, script_dir in scripts_with_path:
-            script_path = script_dir / script_name
-            if not script_path.exists():
-                logger.error(f"Script not found: {script_path}")
-                yield f"Script not found: {script_path}\n"
-                continue
+@router.post("/run-analysis/")
+async def run_analysis(
+    mode: Literal["train", "assign", "domains"] = "train",
+    force: bool = False,
+    stream: bool = True
+):
+    job, created = job_manager.submit(
+        "analysis", ANALYSIS_STAGES,
+        on_success=materialize_after_analysis,
+        force=force, params={"trend": {"mode": mode}}
+    )
+    if not created:
+        logger.info(f"Analysis job {job.id} already running, reusing it")
 
-            logger.info(f"Running script: {script_path}")
-            process = subprocess.Popen(
-                ["python", str(script_path)],
-                stdout=subprocess.PIPE,
-                stderr=subprocess.STDOUT,
-                text=True
-            )
-            for line in iter(process.stdout.readline, ''):
-                logger.info(line.strip())
-                yield line
-            process.stdout.close()
-            process.wait()
-            logger.info(f"Finished: {script_name}\n")
-            yield f"\nFinished: {script_name}\n\n"
-    return generate
+    if not stream:
+        return {"job_id": job.id, "status": job.status, "deduplicated": not created, "status_url": f"/jobs/{job.id}"}
 
-@router.post("/run-analysis/")
-async def run_analysis():
     return StreamingResponse(
-        stream_script(SCRIPTS),
-        media_type="text/plain"
-    )
\ No newline at end of file
+        job_manager.stream_logs(job),
+        media_type="text/plain",
+        headers={"X-Job-Id": job.id}
+    )
+
+@router.get("/trends")
+async def trends(
+    nip: Optional[str] = None,
+    if_none_match: Optional[str] = Header(None),
+    db=Depends(get_read_db)
+):
+    """Agregat topik x tahun, domain x tahun dan topik teratas per NIP dari tabel tren."""
+    etag, body = await run_db(db, get_trends, nip=nip)
+    headers = {"ETag": etag, "Cache-Control": f"max-age={int(TRENDS_CACHE_TTL)}"}
+    if if_none_match is not None and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@router.post("/classify", response_model=ClassifyResponse)
+async def classify(request: ClassifyRequest):
+    """Topik, nama topik, probabilitas dan domain untuk judul baru dari model yang dimuat saat startup."""
+    if not 1 <= len(request.judul) <= CLASSIFY_MAX_TITLES:
+        raise HTTPException(status_code=422, detail=f"Send between 1 and {CLASSIFY_MAX_TITLES} titles")
+    try:
+        items = await topic_classifier.classify(request.judul)
+    except ClassifierUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except ClassifierBusy as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    return {"items": items}
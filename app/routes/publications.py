@@ -0,0 +1,35 @@
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, Query
+from app.database import get_read_db, run_db
+from app import crud, schemas
+
+MAX_PAGE_SIZE = 500
+
+router = APIRouter()
+
+@router.get("/", response_model=schemas.PublikasiPage)
+async def list_publications(
+    nip: Optional[str] = None,
+    id_scopus: Optional[str] = None,
+    tahun: Optional[str] = None,
+    sumber_data: Optional[str] = None,
+    topic: Optional[int] = None,
+    domain: Optional[str] = None,
+    q: Optional[str] = Query(None, min_length=3, description="Cari di judul (index trigram)"),
+    after: Optional[UUID] = Query(None, description="next_cursor dari halaman sebelumnya"),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    db=Depends(get_read_db),
+):
+    filters = {
+        "nip": nip,
+        "id_scopus": id_scopus,
+        "tahun": tahun,
+        "sumber_data": sumber_data,
+        "topic": topic,
+        "domain": domain,
+    }
+    items, next_cursor = await run_db(
+        db, crud.get_publikasi_page, filters, title_query=q, after=after, limit=limit
+    )
+    return {"items": items, "next_cursor": next_cursor}
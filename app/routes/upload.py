@@ -1,44 +1,42 @@
-import pandas as pd
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from app.database import get_db
-from app.utils.cleaner import clean_and_match_data
-from app.utils.cleanup import clean_id_scopus
-from app import models
+import sys
+from fastapi import APIRouter, HTTPException
+from app.database import SessionLocal
+from app.utils.loader import COPY_CHUNK_SIZE, SchemaNotReady, publication_schema_ready, upsert_publications
+from app.utils.offload import run_blocking
 from pathlib import Path
 
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR / "src" / "data-cleaning"))
+
+from stage_io import iter_stage, stage_exists
+
+FINAL_PUBLICATION_PATH = BASE_DIR / "data" / "cleaned" / "final_publication"
+
 router = APIRouter()
 
+def load_final_publication():
+    """Dijalankan di pool pekerjaan berat, dengan session milik thread itu sendiri."""
+    with SessionLocal() as db:
+        if not publication_schema_ready(db):
+            raise SchemaNotReady("Publication table is not migrated, run `python -m app.migrate` first.")
+        return upsert_publications(db, iter_stage(FINAL_PUBLICATION_PATH, chunk_size=COPY_CHUNK_SIZE))
+
 @router.post("/upload/")
-async def upload_exceo(db: Session = Depends(get_db)):
-    BASE_DIR = Path(__file__).resolve().parents[2]
-    file_path = BASE_DIR / "data" / "cleaned" / "final_publication.xlsx"
+async def upload_exceo():
+    if not stage_exists(FINAL_PUBLICATION_PATH):
+        return {"error": f"failed to read file: '{FINAL_PUBLICATION_PATH}' not found"}
 
     try:
-        df = pd.read_excel(file_path)
+        stats = await run_blocking(load_final_publication)
+    except SchemaNotReady as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
-        return {"error": f"failed to read file: {e}"}
-
-    cleaned_df = clean_and_match_data(df)
-
-    publikasi_list = []
-    for _, row in cleaned_df.iterrows():
-        try:
-            publikasi = models.Publikasi(**row.to_dict())
-            publikasi_list.append(publikasi)
-        except Exception as e:
-            print(f"Row parse error: {e}")
-    
-    try:
-        db.bulk_save_objects(publikasi_list)
-        db.commit()
-    except Exception as e:
-        db.rollback()
         return {"error": f"DB Error: {e}"}
 
-    try:
-        clean_id_scopus(db)
-    except Exception as e:
-        return {"message": f"{len(publikasi_list)} inserted, but clean failed", "error": str(e)}
-
-    return {"message": f"{len(publikasi_list)} records inserted from local file and id_scopus cleaned"}
\ No newline at end of file
+    return {
+        "message": (
+            f"{stats['inserted']} inserted, {stats['updated']} updated, "
+            f"{stats['unchanged']} unchanged from local file"
+        ),
+        **stats,
+    }
@@ -1,5 +1,6 @@
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
+from uuid import UUID
 
 class PublikasiBase(BaseModel):
     nip: Optional[str]
@@ -12,6 +13,25 @@ class PublikasiBase(BaseModel):
     tautan: Optional[str]
     doi: Optional[str]
     sumber_data: Optional[str]
+    topic: Optional[int] = None
+    domain: Optional[str] = None
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class PublikasiPage(BaseModel):
+    items: List[PublikasiBase]
+    next_cursor: Optional[UUID] = None
+
+class ClassifyRequest(BaseModel):
+    judul: List[str]
+
+class ClassifiedTitle(BaseModel):
+    judul: str
+    topic: int
+    topic_name: Optional[str] = None
+    probability: Optional[float] = None
+    domain: str
+
+class ClassifyResponse(BaseModel):
+    items: List[ClassifiedTitle]
@@ -0,0 +1,217 @@
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+CLEANING_DIR = BASE_DIR / "src" / "data-cleaning"
+MODELLING_DIR = BASE_DIR / "src" / "modelling"
+MODEL_PATH = BASE_DIR / "model" / "bertopic_model"
+DOMAIN_MAP_PATH = BASE_DIR / "data" / "cleaned" / "output" / "topic_domain_mapping"
+
+for src_dir in [CLEANING_DIR, MODELLING_DIR]:
+    if str(src_dir) not in sys.path:
+        sys.path.insert(0, str(src_dir))
+
+from stage_io import read_stage, stage_exists
+from profiling import profiled
+from preprocessing_titles import clean_text
+from embedding_backend import EmbeddingBackend
+from model_artifact import MANIFEST_FILE, artifact_exists, legacy_model_file, load_model_artifact
+
+EMBED_MODEL_NAME = os.getenv("EMBED_MODEL_NAME", "paraphrase-multilingual-MiniLM-L12-v2")
+CLASSIFY_PRELOAD = os.getenv("CLASSIFY_PRELOAD", "true").lower() in ["1", "true", "yes"]
+CLASSIFY_MAX_BATCH = int(os.getenv("CLASSIFY_MAX_BATCH", "64"))
+CLASSIFY_MAX_WAIT_MS = float(os.getenv("CLASSIFY_MAX_WAIT_MS", "10"))
+CLASSIFY_MAX_QUEUE = int(os.getenv("CLASSIFY_MAX_QUEUE", "2000"))
+CLASSIFY_MAX_TITLES = int(os.getenv("CLASSIFY_MAX_TITLES", "100"))
+# false: tanpa UMAP/HDBSCAN, topik dari kemiripan dengan topic embedding (start lebih cepat, tanpa outlier -1)
+CLASSIFY_CLUSTER_MODELS = os.getenv("CLASSIFY_CLUSTER_MODELS", "true").lower() in ["1", "true", "yes"]
+
+logger = logging.getLogger(__name__)
+
+class ClassifierUnavailable(Exception):
+    pass
+
+class ClassifierBusy(Exception):
+    pass
+
+class TopicClassifier:
+    """
+    Model BERTopic, embedder dan pemetaan domain yang dimuat sekali per proses API. Judul dari
+    banyak request dikumpulkan menjadi micro-batch (maks. CLASSIFY_MAX_BATCH judul atau
+    CLASSIFY_MAX_WAIT_MS menunggu) lalu di-transform sekaligus di satu thread inferensi.
+    """
+
+    def __init__(self, model_path=MODEL_PATH, max_batch=CLASSIFY_MAX_BATCH, max_wait_ms=CLASSIFY_MAX_WAIT_MS,
+                 max_queue=CLASSIFY_MAX_QUEUE):
+        self.model_path = Path(model_path)
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+        self.max_queue = max_queue
+        self._state = None
+        self._load_lock = threading.Lock()
+        self._queue = None
+        self._worker = None
+        # Satu thread: model tidak dibagi antar thread dan batch berikutnya menunggu yang sedang jalan.
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="classify")
+
+    @property
+    def loaded(self):
+        return self._state is not None
+
+    def load(self):
+        """Muat model, embedder dan pemetaan domain lalu lakukan warm-up; state lama diganti atomik."""
+        if not artifact_exists(self.model_path):
+            raise ClassifierUnavailable(f"Model artifact '{self.model_path}' not found, run training first.")
+
+        with self._load_lock:
+            start = time.perf_counter()
+            mtime = self._model_mtime()
+            embedder = EmbeddingBackend(EMBED_MODEL_NAME, workers=1)
+            topic_model = load_model_artifact(self.model_path, embedder, cluster_models=CLASSIFY_CLUSTER_MODELS)
+
+            topic_info = topic_model.get_topic_info()
+            topic_names = dict(zip(topic_info["Topic"], topic_info["Name"]))
+            topic_to_domain = {}
+            if stage_exists(DOMAIN_MAP_PATH):
+                domain_map_df = read_stage(DOMAIN_MAP_PATH)
+                topic_to_domain = dict(zip(domain_map_df["topic"], domain_map_df["best_domain"]))
+            else:
+                logger.warning(f"Domain mapping '{DOMAIN_MAP_PATH}' not found, domains will be 'Unassigned'")
+
+            state = {
+                "topic_model": topic_model, "embedder": embedder, "topic_names": topic_names,
+                "topic_to_domain": topic_to_domain, "mtime": mtime,
+            }
+            # Embedder dimuat lazy; warm-up agar request pertama tidak menanggung waktu muat model.
+            self._predict(state, ["warmup"])
+            self._state = state
+            logger.info(f"Loaded topic classifier from {self.model_path} in {time.perf_counter() - start:.2f}s")
+
+    def _model_mtime(self):
+        manifest = self.model_path / MANIFEST_FILE
+        path = manifest if manifest.exists() else legacy_model_file(self.model_path)
+        return path.stat().st_mtime if path.exists() else None
+
+    def reload_if_changed(self):
+        """Muat ulang setelah training/assign menulis model baru; dipanggil di luar event loop."""
+        mtime = self._model_mtime()
+        if mtime is not None and (self._state is None or mtime != self._state["mtime"]):
+            self.load()
+
+    @staticmethod
+    def _predict(state, titles):
+        cleaned = [clean_text(t) for t in titles]
+        embeddings = state["embedder"].encode(cleaned)
+        topics, probs = state["topic_model"].transform(cleaned, embeddings)
+
+        results = []
+        for i, (title, topic) in enumerate(zip(titles, topics)):
+            topic = int(topic)
+            if probs is None:
+                probability = None
+            elif getattr(probs, "ndim", 1) == 2:
+                probability = float(probs[i].max())
+            else:
+                probability = float(probs[i])
+            results.append({
+                "judul": title,
+                "topic": topic,
+                "topic_name": state["topic_names"].get(topic),
+                "probability": probability,
+                "domain": state["topic_to_domain"].get(topic, "Unassigned"),
+            })
+        return results
+
+    def predict(self, titles):
+        state = self._state
+        if state is None:
+            raise ClassifierUnavailable("Topic model is not loaded.")
+        with profiled("classify_batch", rows_in=len(titles), stage="classify") as prof:
+            results = self._predict(state, titles)
+            prof.rows_out = len(results)
+        return results
+
+    async def start(self, preload=CLASSIFY_PRELOAD):
+        self._queue = asyncio.Queue(maxsize=self.max_queue)
+        self._worker = asyncio.create_task(self._batch_loop())
+        if not preload:
+            return
+        try:
+            await asyncio.get_running_loop().run_in_executor(self._executor, self.load)
+        except Exception as e:
+            # API tetap jalan tanpa model (mis. belum pernah training); /analysis/classify menjawab 503.
+            logger.warning(f"Topic classifier not loaded: {e}")
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        while self._queue is not None and not self._queue.empty():
+            _, future = self._queue.get_nowait()
+            if not future.done():
+                future.set_exception(ClassifierUnavailable("Classifier is shutting down."))
+
+    async def classify(self, titles):
+        """Masukkan judul ke antrean micro-batch dan tunggu hasilnya (urutan sama dengan input)."""
+        if self._state is None or self._queue is None:
+            raise ClassifierUnavailable("Topic model is not loaded.")
+        if self._queue.qsize() + len(titles) > self.max_queue:
+            raise ClassifierBusy(f"Classification queue is full ({self._queue.qsize()} titles waiting).")
+
+        loop = asyncio.get_running_loop()
+        futures = []
+        for title in titles:
+            future = loop.create_future()
+            self._queue.put_nowait((title, future))
+            futures.append(future)
+        return await asyncio.gather(*futures)
+
+    async def _next_batch(self):
+        batch = [await self._queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_wait
+        while len(batch) < self.max_batch:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        while len(batch) < self.max_batch and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _batch_loop(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._next_batch()
+            batch = [(title, future) for title, future in batch if not future.done()]
+            if not batch:
+                continue
+            try:
+                results = await loop.run_in_executor(self._executor, self.predict, [title for title, _ in batch])
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                logger.exception("Topic classification batch failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+topic_classifier = TopicClassifier()
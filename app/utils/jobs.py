@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import uuid
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from app.utils.pipeline import execution_order, run_pipeline
+
+logger = logging.getLogger(__name__)
+
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "1"))
+MAX_JOB_LOG_LINES = 5000
+MAX_FINISHED_JOBS = 100
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    key: str
+    planned_stages: list
+    status: str = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float = None
+    finished_at: float = None
+    stages: list = field(default_factory=list)
+    current_stage: str = None
+    error: str = None
+    logs: list = field(default_factory=list)
+    dropped_logs: int = 0
+
+    @property
+    def finished(self):
+        return self.status in ["done", "failed"]
+
+    def add_log(self, line):
+        self.logs.append(line)
+        if len(self.logs) > MAX_JOB_LOG_LINES:
+            overflow = len(self.logs) - MAX_JOB_LOG_LINES
+            del self.logs[:overflow]
+            self.dropped_logs += overflow
+
+    def to_dict(self):
+        finished_stages = sum(1 for stage in self.stages if stage["status"] in ["done", "skipped"])
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "current_stage": self.current_stage,
+            "progress": finished_stages / len(self.planned_stages) if self.planned_stages else 0.0,
+            "planned_stages": self.planned_stages,
+            "stages": self.stages,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": (self.finished_at or time.time()) - self.started_at if self.started_at else None,
+            "error": self.error,
+        }
+
+class JobManager:
+    """
+    Menjalankan pipeline sebagai job latar belakang dengan ID. Job identik (jenis + parameter sama)
+    yang masih antre/berjalan dipakai bersama (single-flight) dan jumlah job paralel dibatasi.
+    """
+
+    def __init__(self, max_concurrent=MAX_CONCURRENT_JOBS):
+        self.executor = ThreadPoolExecutor(max_workers=max_concurrent, thread_name_prefix="pipeline-job")
+        self.jobs = {}
+        self.in_flight = {}
+        self.lock = threading.Lock()
+
+    def submit(self, kind, stage_names, on_success=None, **run_kwargs):
+        """
+        Kembalikan (job, dibuat_baru); job yang sama dan belum selesai tidak dijalankan dua kali.
+        `on_success` dipanggil setelah semua stage berhasil, masih sebagai bagian dari job.
+        """
+        key = json.dumps({"kind": kind, "stages": stage_names, **run_kwargs}, sort_keys=True, default=str)
+        with self.lock:
+            existing = self.in_flight.get(key)
+            if existing is not None:
+                return existing, False
+
+            order, _ = execution_order(stage_names, include_upstream=run_kwargs.get("include_upstream", False))
+            job = Job(id=uuid.uuid4().hex, kind=kind, key=key, planned_stages=order)
+            self.jobs[job.id] = job
+            self.in_flight[key] = job
+            self._prune()
+
+        self.executor.submit(self._run, job, stage_names, run_kwargs, on_success)
+        return job, True
+
+    def get(self, job_id):
+        return self.jobs.get(job_id)
+
+    def list(self):
+        return sorted(self.jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def _prune(self):
+        finished = [job for job in self.list() if job.finished]
+        for job in finished[MAX_FINISHED_JOBS:]:
+            self.jobs.pop(job.id, None)
+
+    def _run(self, job, stage_names, run_kwargs, on_success=None):
+        job.status = "running"
+        job.started_at = time.time()
+
+        def on_log(stage_name, line):
+            job.add_log(f"[{stage_name}] {line}")
+
+        def on_stage(result):
+            job.stages = [s for s in job.stages if s["stage"] != result["stage"]] + [result]
+            running = [s["stage"] for s in job.stages if s["status"] == "running"]
+            job.current_stage = ", ".join(running) or None
+
+        try:
+            results = run_pipeline(stage_names, on_log=on_log, on_stage=on_stage, **run_kwargs)
+            job.stages = results
+            failed = [r for r in results if r["status"] == "failed"]
+            if failed:
+                job.error = f"Stage {failed[0]['stage']} failed: {failed[0].get('error', '')}"
+            elif on_success is not None:
+                on_success(job)
+            job.status = "failed" if failed else "done"
+        except Exception as e:
+            logger.exception(f"[JOB] {job.kind} job {job.id} crashed")
+            job.status = "failed"
+            job.error = str(e)
+        finally:
+            job.current_stage = None
+            job.finished_at = time.time()
+            with self.lock:
+                if self.in_flight.get(job.key) is job:
+                    del self.in_flight[job.key]
+            logger.info(f"[JOB] {job.kind} job {job.id} {job.status} in {job.finished_at - job.started_at:.2f}s")
+
+    async def stream_logs(self, job, poll_interval=0.5):
+        """Async generator log job; tidak memblokir event loop selama pipeline berjalan."""
+        cursor = 0
+        while True:
+            start = max(cursor - job.dropped_logs, 0)
+            lines = job.logs[start:]
+            cursor = job.dropped_logs + start + len(lines)
+            for line in lines:
+                yield f"{line}\n"
+            if job.finished and cursor >= job.dropped_logs + len(job.logs):
+                yield f"\nJob {job.id} {job.status}\n"
+                return
+            await asyncio.sleep(poll_interval)
+
+job_manager = JobManager()
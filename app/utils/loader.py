@@ -0,0 +1,293 @@
+import io
+import os
+import csv
+import sys
+import time
+import uuid
+import hashlib
+import logging
+import pandas as pd
+from pathlib import Path
+from sqlalchemy import inspect, text
+from sqlalchemy.orm import Session
+from app import models
+from app.utils.cleaner import clean_and_match_data
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR / "src" / "data-cleaning"))
+
+from identifiers import normalize_doi
+from profiling import profiled
+
+logger = logging.getLogger(__name__)
+
+COPY_CHUNK_SIZE = int(os.getenv("COPY_CHUNK_SIZE", "50000"))
+TARGET_TABLE = "penelitian.publikasi"
+STAGING_TABLE = "publikasi_staging"
+FINGERPRINT_STAGING_TABLE = "publikasi_fingerprint_staging"
+SEEN_TABLE = "publikasi_seen_fingerprints"
+PAYLOAD_COLUMNS = [
+    "nip", "id_scopus", "nama", "judul", "jenis_publikasi",
+    "nama_jurnal", "tahun", "tautan", "doi", "sumber_data", "topic", "domain"
+]
+LOAD_COLUMNS = ["id"] + PAYLOAD_COLUMNS + ["fingerprint", "content_hash"]
+# Kolom yang ditambahkan setelah tabel pertama kali dibuat; create_all tidak mengubah tabel lama.
+ADDED_COLUMNS = {
+    "topic": "INTEGER",
+    "domain": "VARCHAR",
+    "fingerprint": "VARCHAR(40)",
+    "content_hash": "VARCHAR(40)",
+    "duplicate_of": "VARCHAR(40)",
+}
+NULLABLE_COLUMNS = ["topic", "domain"]
+
+def _sha1(values):
+    return values.map(lambda v: hashlib.sha1(v.encode("utf-8")).hexdigest())
+
+def publication_fingerprint(df):
+    """
+    Kunci alami satu publikasi milik satu dosen: NIP + DOI ternormalisasi,
+    atau NIP + judul ternormalisasi + tahun bila DOI kosong.
+    """
+    nip = df["nip"].fillna("").astype(str).str.strip()
+    doi = df["doi"].map(normalize_doi)
+    title = (
+        df["judul"].fillna("").astype(str).str.lower()
+        .str.replace(r"[^a-z0-9]+", " ", regex=True).str.strip()
+    )
+    tahun = df["tahun"].fillna("").astype(str).str.strip()
+    key = ("title:" + title + "|" + tahun).where(doi.isna(), "doi:" + doi.astype(str))
+    return _sha1(nip + "|" + key)
+
+def content_hash(df):
+    """Hash seluruh kolom isi; baris dengan fingerprint sama dan hash sama tidak ditulis ulang."""
+    payload = df[PAYLOAD_COLUMNS].fillna("").astype(str)
+    joined = payload[PAYLOAD_COLUMNS[0]].str.cat([payload[col] for col in PAYLOAD_COLUMNS[1:]], sep="\x1f")
+    return _sha1(joined)
+
+class SchemaNotReady(Exception):
+    pass
+
+def publication_schema_ready(db: Session):
+    """
+    Cek murah (katalog saja) sebelum upload: kolom fingerprint dan index unik untuk ON CONFLICT ada.
+    Migrasi sendiri tidak dijalankan di jalur request.
+    """
+    inspector = inspect(db.connection())
+    schema, table = TARGET_TABLE.split(".")
+    columns = {col["name"] for col in inspector.get_columns(table, schema=schema)}
+    if not set(ADDED_COLUMNS) <= columns:
+        return False
+    return any(
+        index["unique"] and index["column_names"] == ["fingerprint"]
+        for index in inspector.get_indexes(table, schema=schema)
+    )
+
+def ensure_publication_schema(db: Session, remove_duplicates=False):
+    """
+    Samakan tabel lama dengan model: kolom baru, index filter, index trigram judul dan fingerprint.
+    Dijalankan lewat `python -m app.migrate`, bukan saat aplikasi di-import.
+    """
+    for col, ddl in ADDED_COLUMNS.items():
+        db.execute(text(f"ALTER TABLE {TARGET_TABLE} ADD COLUMN IF NOT EXISTS {col} {ddl}"))
+    for index in models.Publikasi.__table__.indexes:
+        index.create(db.connection(), checkfirst=True)
+    db.commit()
+    ensure_trigram_index(db)
+    if remove_duplicates or missing_fingerprints(db):
+        backfill_fingerprints(db, remove_duplicates=remove_duplicates)
+
+def missing_fingerprints(db: Session):
+    """
+    True jika masih ada baris dari upload lama yang belum diproses backfill. Duplikat yang sengaja
+    dibiarkan tanpa fingerprint ditandai lewat duplicate_of sehingga tidak dihitung lagi.
+    """
+    return bool(db.execute(text(
+        f"SELECT EXISTS (SELECT 1 FROM {TARGET_TABLE} WHERE fingerprint IS NULL AND duplicate_of IS NULL)"
+    )).scalar())
+
+def ensure_trigram_index(db: Session):
+    """Index GIN trigram untuk pencarian judul; dilewati jika ekstensi pg_trgm tidak tersedia."""
+    try:
+        with db.begin_nested():
+            db.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+            db.execute(text(
+                f"CREATE INDEX IF NOT EXISTS ix_publikasi_judul_trgm "
+                f"ON {TARGET_TABLE} USING gin (judul gin_trgm_ops)"
+            ))
+        db.commit()
+        return True
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"[SCHEMA] pg_trgm not available, title search falls back to a sequential scan: {e}")
+        return False
+
+def backfill_fingerprints(db: Session, remove_duplicates=False):
+    """
+    Isi fingerprint untuk baris dari upload sebelumnya sehingga upsert berikutnya mengenali baris
+    yang sudah ada. Duplikat (fingerprint sama) tidak mendapat fingerprint karena index unik, tetapi
+    fingerprint-nya dicatat di duplicate_of; dengan remove_duplicates semua baris duplikat dihapus.
+    """
+    conn = db.connection()
+    legacy = pd.read_sql(
+        text(
+            f"SELECT id, {', '.join(PAYLOAD_COLUMNS)} FROM {TARGET_TABLE} "
+            f"WHERE fingerprint IS NULL AND duplicate_of IS NULL"
+        ),
+        conn
+    )
+    n_backfilled, n_duplicates, n_removed = 0, 0, 0
+
+    cursor = conn.connection.cursor()
+    try:
+        if not legacy.empty:
+            legacy["id"] = legacy["id"].astype(str)
+            legacy["topic"] = legacy["topic"].astype("Int64").astype("string")
+            legacy["fingerprint"] = publication_fingerprint(legacy)
+            legacy["content_hash"] = content_hash(legacy)
+
+            existing = pd.read_sql(
+                text(f"SELECT fingerprint FROM {TARGET_TABLE} WHERE fingerprint IS NOT NULL"), conn
+            )["fingerprint"]
+            duplicate = legacy["fingerprint"].duplicated() | legacy["fingerprint"].isin(existing)
+            # String kosong di staging menjadi NULL lewat NULLIF saat UPDATE.
+            legacy["duplicate_of"] = legacy["fingerprint"].where(duplicate, "")
+            legacy["fingerprint"] = legacy["fingerprint"].where(~duplicate, "")
+
+            cursor.execute(
+                f"CREATE TEMP TABLE {FINGERPRINT_STAGING_TABLE} "
+                f"(id UUID, fingerprint VARCHAR(40), content_hash VARCHAR(40), duplicate_of VARCHAR(40)) "
+                f"ON COMMIT DROP"
+            )
+            copy_frame(cursor, legacy[["id", "fingerprint", "content_hash", "duplicate_of"]], FINGERPRINT_STAGING_TABLE)
+            cursor.execute(
+                f"UPDATE {TARGET_TABLE} AS p SET fingerprint = NULLIF(s.fingerprint, ''), "
+                f"content_hash = s.content_hash, duplicate_of = NULLIF(s.duplicate_of, '') "
+                f"FROM {FINGERPRINT_STAGING_TABLE} AS s WHERE p.id = s.id"
+            )
+            n_duplicates = int(duplicate.sum())
+            n_backfilled = len(legacy) - n_duplicates
+
+        if remove_duplicates:
+            cursor.execute(f"DELETE FROM {TARGET_TABLE} WHERE duplicate_of IS NOT NULL")
+            n_removed = cursor.rowcount
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        cursor.close()
+
+    logger.info(
+        f"[LOAD] backfilled {n_backfilled} fingerprints, marked {n_duplicates} duplicate rows, "
+        f"removed {n_removed} duplicate rows"
+    )
+    if n_duplicates and not remove_duplicates:
+        logger.warning("[LOAD] run `python -m app.migrate --remove-duplicates` to delete duplicate rows")
+    return n_duplicates
+
+def prepare_chunk(df):
+    """Bersihkan satu potongan data dan siapkan kolom sesuai urutan tabel staging."""
+    if "topic" in df.columns:
+        df = df.astype({"topic": "string"})
+    df = clean_and_match_data(df)
+    # Dulu dibersihkan dengan UPDATE REGEXP_REPLACE ke seluruh tabel setelah insert.
+    df["id_scopus"] = df["id_scopus"].str.replace(r"\.0$", "", regex=True)
+    df = df.reindex(columns=PAYLOAD_COLUMNS, fill_value="")
+    df["fingerprint"] = publication_fingerprint(df)
+    df["content_hash"] = content_hash(df)
+    df["id"] = [str(uuid.uuid4()) for _ in range(len(df))]
+    return df[LOAD_COLUMNS]
+
+def copy_frame(cursor, df, table):
+    # QUOTE_ALL agar string kosong tetap '' (bukan NULL) seperti hasil insert ORM sebelumnya,
+    # kecuali kolom hasil topic modelling yang memang boleh kosong.
+    nullable = [col for col in NULLABLE_COLUMNS if col in df.columns]
+    force_null = f", FORCE_NULL ({', '.join(nullable)})" if nullable else ""
+    buffer = io.StringIO()
+    df.to_csv(buffer, index=False, header=False, quoting=csv.QUOTE_ALL)
+    buffer.seek(0)
+    cursor.copy_expert(
+        f"COPY {table} ({', '.join(df.columns)}) FROM STDIN WITH (FORMAT csv{force_null})",
+        buffer
+    )
+
+def upsert_sql():
+    columns = ", ".join(LOAD_COLUMNS)
+    updates = ", ".join(f"{col} = EXCLUDED.{col}" for col in PAYLOAD_COLUMNS + ["content_hash"])
+    # xmax = 0 hanya untuk baris yang baru di-insert; baris tanpa perubahan tidak di-RETURN.
+    return (
+        f"WITH written AS ("
+        f" INSERT INTO {TARGET_TABLE} AS p ({columns}) SELECT {columns} FROM {STAGING_TABLE}"
+        f" ON CONFLICT (fingerprint) DO UPDATE SET {updates}"
+        f" WHERE p.content_hash IS DISTINCT FROM EXCLUDED.content_hash"
+        f" RETURNING (xmax = 0) AS inserted"
+        f") SELECT COUNT(*) FILTER (WHERE inserted), COUNT(*) FILTER (WHERE NOT inserted) FROM written"
+    )
+
+def upsert_publications(db: Session, chunks):
+    """
+    Upsert potongan DataFrame ke penelitian.publikasi lewat COPY ke tabel staging sementara.
+    Hanya baris baru atau berubah yang ditulis; semua potongan masuk dalam satu transaksi.
+    Baris dengan fingerprint yang sudah muncul, di potongan yang sama maupun sebelumnya, dihitung
+    sebagai duplikat dan tidak ditulis (kemunculan pertama yang dipakai).
+    """
+    start = time.time()
+    counts = {"rows": 0, "inserted": 0, "updated": 0, "unchanged": 0, "duplicates": 0}
+    n_chunks = 0
+    statement = upsert_sql()
+
+    cursor = db.connection().connection.cursor()
+    with profiled("db_upsert", stage="db_load") as prof:
+        try:
+            cursor.execute(
+                f"CREATE TEMP TABLE {STAGING_TABLE} "
+                f"(LIKE {TARGET_TABLE} INCLUDING DEFAULTS) ON COMMIT DROP"
+            )
+            # Fingerprint yang sudah ditulis run ini; disimpan di server agar memori tetap per potongan.
+            cursor.execute(f"CREATE TEMP TABLE {SEEN_TABLE} (fingerprint VARCHAR(40) PRIMARY KEY) ON COMMIT DROP")
+            for chunk in chunks:
+                chunk = prepare_chunk(chunk)
+                if chunk.empty:
+                    continue
+                # ON CONFLICT tidak boleh menyentuh baris yang sama dua kali dalam satu perintah.
+                unique = chunk.drop_duplicates("fingerprint")
+                copy_frame(cursor, unique, STAGING_TABLE)
+                cursor.execute(
+                    f"DELETE FROM {STAGING_TABLE} AS s USING {SEEN_TABLE} AS seen "
+                    f"WHERE s.fingerprint = seen.fingerprint"
+                )
+                repeated = cursor.rowcount
+                cursor.execute(f"INSERT INTO {SEEN_TABLE} SELECT fingerprint FROM {STAGING_TABLE}")
+                cursor.execute(statement)
+                inserted, updated = cursor.fetchone()
+                cursor.execute(f"TRUNCATE {STAGING_TABLE}")
+
+                n_chunks += 1
+                counts["rows"] += len(chunk)
+                counts["duplicates"] += len(chunk) - len(unique) + repeated
+                counts["inserted"] += inserted
+                counts["updated"] += updated
+                counts["unchanged"] += len(unique) - repeated - inserted - updated
+                logger.info(f"[LOAD] chunk {n_chunks}: {inserted} inserted, {updated} updated")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+        prof.rows_in = counts["rows"]
+        prof.rows_out = counts["inserted"] + counts["updated"]
+
+    seconds = time.time() - start
+    stats = {
+        **counts,
+        "chunks": n_chunks,
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(counts["rows"] / seconds, 1) if seconds > 0 else None,
+    }
+    logger.info(
+        f"[LOAD] {counts['rows']} rows in {seconds:.2f}s ({stats['rows_per_second']} rows/s): "
+        f"{counts['inserted']} inserted, {counts['updated']} updated, {counts['unchanged']} unchanged"
+    )
+    return stats
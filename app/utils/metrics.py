@@ -0,0 +1,69 @@
+import sys
+import threading
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR / "src" / "data-cleaning"))
+
+from profiling import current_rss, drain_records
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+BLOCK_METRICS = [
+    ("pipeline_block_runs_total", "counter", "Jumlah eksekusi stage/fungsi yang diprofil."),
+    ("pipeline_block_errors_total", "counter", "Jumlah eksekusi yang berakhir dengan exception."),
+    ("pipeline_block_wall_seconds_total", "counter", "Total wall time."),
+    ("pipeline_block_cpu_seconds_total", "counter", "Total CPU time (user + system)."),
+    ("pipeline_block_rows_in_total", "counter", "Total baris masuk."),
+    ("pipeline_block_rows_out_total", "counter", "Total baris keluar."),
+    ("pipeline_block_last_wall_seconds", "gauge", "Wall time eksekusi terakhir."),
+    ("pipeline_block_last_peak_rss_bytes", "gauge", "Puncak RSS eksekusi terakhir."),
+    ("pipeline_block_max_peak_rss_bytes", "gauge", "Puncak RSS tertinggi sejak API berjalan."),
+    ("pipeline_block_last_run_timestamp_seconds", "gauge", "Waktu mulai eksekusi terakhir."),
+]
+
+_lock = threading.Lock()
+_blocks = {}
+
+def _observe(record):
+    key = (record.stage or "", record.name)
+    block = _blocks.setdefault(key, {name: 0.0 for name, kind, _ in BLOCK_METRICS if kind == "counter"})
+    block["pipeline_block_runs_total"] += 1
+    block["pipeline_block_errors_total"] += record.status != "ok"
+    block["pipeline_block_wall_seconds_total"] += record.wall_seconds
+    block["pipeline_block_cpu_seconds_total"] += record.cpu_seconds
+    block["pipeline_block_rows_in_total"] += record.rows_in or 0
+    block["pipeline_block_rows_out_total"] += record.rows_out or 0
+    block["pipeline_block_last_wall_seconds"] = record.wall_seconds
+    block["pipeline_block_last_run_timestamp_seconds"] = record.started_at
+    if record.peak_rss_bytes is not None:
+        block["pipeline_block_last_peak_rss_bytes"] = record.peak_rss_bytes
+        block["pipeline_block_max_peak_rss_bytes"] = max(
+            block.get("pipeline_block_max_peak_rss_bytes", 0), record.peak_rss_bytes
+        )
+
+def _label_value(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def render_metrics():
+    """Gabungkan record profil baru ke agregat lalu render dalam format teks Prometheus."""
+    with _lock:
+        for record in drain_records():
+            _observe(record)
+        blocks = sorted(_blocks.items())
+
+    lines = []
+    for name, kind, help_text in BLOCK_METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {kind}")
+        for (stage, block_name), values in blocks:
+            if name in values:
+                labels = f'stage="{_label_value(stage)}",block="{_label_value(block_name)}"'
+                lines.append(f"{name}{{{labels}}} {float(values[name])!r}")
+
+    rss = current_rss()
+    if rss is not None:
+        lines.append("# HELP process_resident_memory_bytes Resident memory proses API.")
+        lines.append("# TYPE process_resident_memory_bytes gauge")
+        lines.append(f"process_resident_memory_bytes {rss}")
+    return "\n".join(lines) + "\n"
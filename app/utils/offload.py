@@ -0,0 +1,14 @@
+import os
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+# Pool terpisah untuk pekerjaan berat (pandas, COPY) agar tidak menghabiskan threadpool
+# bawaan yang juga dipakai endpoint baca.
+BLOCKING_WORKERS = int(os.getenv("BLOCKING_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(max_workers=BLOCKING_WORKERS, thread_name_prefix="blocking")
+
+async def run_blocking(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
@@ -0,0 +1,496 @@
+import io
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import importlib
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from graphlib import TopologicalSorter
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+CLEANING_DIR = BASE_DIR / "src" / "data-cleaning"
+MODELLING_DIR = BASE_DIR / "src" / "modelling"
+RAW_DATA_DIR = BASE_DIR / "data" / "raw"
+CLEANED_DATA_DIR = BASE_DIR / "data" / "cleaned"
+OUTPUT_DIR = CLEANED_DATA_DIR / "output"
+MODEL_DIR = BASE_DIR / "model"
+STATE_PATH = CLEANED_DATA_DIR / ".pipeline_state.json"
+STOPWORD_FILES = [CLEANING_DIR / "stopwords" / "english.txt", CLEANING_DIR / "stopwords" / "indonesian.txt"]
+PROFILE_FIELDS = ["cpu_seconds", "peak_rss_bytes", "rows_in", "rows_out"]
+# Konfigurasi model yang dibaca modul stage dari environment saat import; ikut fingerprint.
+# Mengubah HDBSCAN_MIN_CLUSTER_SIZE/NR_TOPICS menjalankan ulang trend, tetapi reduksi UMAP tetap
+# diambil dari cache (kuncinya embedding + parameter UMAP saja).
+TREND_ENV = [
+    "TOPIC_MODE", "OUTLIER_RETRAIN_RATE", "HDBSCAN_MIN_CLUSTER_SIZE", "NR_TOPICS", "TREND_BIN",
+    "EMBED_MODEL_NAME", "EMBED_BACKEND", "EMBED_ONNX_FILE",
+    "UMAP_N_NEIGHBORS", "UMAP_N_COMPONENTS", "UMAP_MIN_DIST", "UMAP_METRIC", "UMAP_RANDOM_STATE",
+    "UMAP_LOW_MEMORY", "UMAP_FIT_SAMPLE",
+]
+PIPELINE_WORKERS = int(os.getenv("PIPELINE_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+for src_dir in [CLEANING_DIR, MODELLING_DIR]:
+    if str(src_dir) not in sys.path:
+        sys.path.insert(0, str(src_dir))
+
+import stage_io
+from stage_io import find_stage, stage_rows
+from profiling import ProfileRecord, add_records, collect_records, log_records_to_mlflow, profiled
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class Stage:
+    name: str
+    module: str
+    function: str
+    inputs: list
+    outputs: list
+    optional_inputs: list = field(default_factory=list)
+    # File kode selain modul stage, dependensi lebih dulu (urutan ini juga urutan reload).
+    code: list = field(default_factory=list)
+    # Variabel environment yang mengubah output stage.
+    env: list = field(default_factory=list)
+
+def stage_code_files(stage):
+    """Modul stage, stage_io dan helper di stage.code: semua yang masuk fingerprint kode."""
+    module_file = (CLEANING_DIR if (CLEANING_DIR / f"{stage.module}.py").exists() else MODELLING_DIR) / f"{stage.module}.py"
+    return [module_file, CLEANING_DIR / "stage_io.py"] + list(stage.code)
+
+def code_mtimes(paths):
+    return {str(path): path.stat().st_mtime_ns for path in paths if path.exists()}
+
+STAGES = {
+    stage.name: stage for stage in [
+        Stage(
+            "nip_scopus_id", "preprocessing_id", "preprocess_nip_scopus_id",
+            inputs=[RAW_DATA_DIR / "nip_scopus_id.xlsx"],
+            outputs=[CLEANED_DATA_DIR / "nip_scopus_id_cleaned"],
+            code=[CLEANING_DIR / "raw_excel.py"],
+        ),
+        Stage(
+            "sister", "preprocessing_sister", "main",
+            inputs=[RAW_DATA_DIR / "sister.xlsx", CLEANED_DATA_DIR / "nip_scopus_id_cleaned"],
+            outputs=[CLEANED_DATA_DIR / "sister_cleaned"],
+            code=[CLEANING_DIR / "raw_excel.py"],
+        ),
+        Stage(
+            "scopus", "preprocessing_scopus", "main",
+            inputs=[RAW_DATA_DIR / "scopus.xlsx", CLEANED_DATA_DIR / "nip_scopus_id_cleaned"],
+            outputs=[CLEANED_DATA_DIR / "scopus_cleaned"],
+            code=[CLEANING_DIR / "raw_excel.py"],
+        ),
+        Stage(
+            "combine", "combine_publication", "main",
+            inputs=[CLEANED_DATA_DIR / "sister_cleaned", CLEANED_DATA_DIR / "scopus_cleaned"],
+            outputs=[CLEANED_DATA_DIR / "combined_publication"],
+            code=[CLEANING_DIR / "identifiers.py"],
+        ),
+        Stage(
+            "sort", "sort_publication", "sort_nip_data",
+            inputs=[CLEANED_DATA_DIR / "combined_publication"],
+            optional_inputs=[OUTPUT_DIR / "topic_assignments"],
+            outputs=[
+                CLEANED_DATA_DIR / "final_publication", CLEANED_DATA_DIR / "empty_nip",
+                CLEANED_DATA_DIR / "journals_list",
+            ],
+            code=[CLEANING_DIR / "preprocessing_titles.py", *STOPWORD_FILES],
+        ),
+        Stage(
+            "titles", "preprocessing_titles", "preprocess_titles",
+            inputs=[CLEANED_DATA_DIR / "combined_publication"],
+            outputs=[CLEANED_DATA_DIR / "titles_cleaned"],
+            code=STOPWORD_FILES,
+        ),
+        Stage(
+            "trend", "publication_trend", "main",
+            inputs=[CLEANED_DATA_DIR / "titles_cleaned"],
+            outputs=[
+                OUTPUT_DIR / "topic_assignments", OUTPUT_DIR / "topic_trends", OUTPUT_DIR / "topic_domain_trends",
+                OUTPUT_DIR / "topic_domain_mapping", MODEL_DIR / "bertopic_model" / "artifact.json",
+            ],
+            code=[
+                MODELLING_DIR / "embedding_cache.py", MODELLING_DIR / "embedding_backend.py",
+                MODELLING_DIR / "reduction_cache.py", MODELLING_DIR / "topic_metrics.py",
+                MODELLING_DIR / "trend_engine.py", MODELLING_DIR / "model_artifact.py",
+            ],
+            env=TREND_ENV,
+        ),
+        Stage(
+            "aggregates", "trend_aggregates", "main",
+            inputs=[OUTPUT_DIR / "topic_assignments"],
+            optional_inputs=[CLEANED_DATA_DIR / "final_publication"],
+            outputs=[
+                OUTPUT_DIR / "trend_topic_year", OUTPUT_DIR / "trend_domain_year",
+                OUTPUT_DIR / "trend_nip_topics",
+            ],
+            code=[CLEANING_DIR / "preprocessing_titles.py", CLEANING_DIR / "sort_publication.py", *STOPWORD_FILES],
+            env=["TOP_TOPICS_PER_NIP"],
+        ),
+    ]
+}
+
+COLLECTION_STAGES = ["nip_scopus_id", "sister", "scopus", "combine", "sort"]
+ANALYSIS_STAGES = ["titles", "trend", "aggregates"]
+
+_state_lock = threading.Lock()
+_capture_lock = threading.Lock()
+_capture_local = threading.local()
+_capture_users = 0
+_original_stdout = None
+# mtime file kode per stage saat modulnya terakhir di-import; diambil saat import agar perubahan
+# sebelum run pertama tetap terdeteksi.
+_code_mtimes = {name: code_mtimes(stage_code_files(stage)) for name, stage in STAGES.items()}
+_process_pool_code = None
+_pool_lock = threading.Lock()
+_process_pool = None
+_process_pool_workers = None
+_log_manager = None
+
+def resolve_path(path):
+    """File nyata untuk sebuah path; path stage tanpa suffix dicari lewat stage_io."""
+    path = Path(path)
+    if path.suffix:
+        return path if path.exists() else None
+    found, _ = find_stage(path)
+    return found
+
+def output_present(path):
+    """Output basi (format lain lebih baru) dianggap belum ada sehingga stage dijalankan ulang."""
+    try:
+        return resolve_path(path) is not None
+    except stage_io.StaleStageError as e:
+        logger.warning(f"[PIPELINE] {e}")
+        return False
+
+def file_digest(path, cache):
+    """Hash isi file, memakai ulang hash lama selama mtime dan ukuran file tidak berubah."""
+    stat = path.stat()
+    key = str(path)
+    cached = cache.get(key)
+    if cached and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2]
+
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    cache[key] = [stat.st_mtime_ns, stat.st_size, digest.hexdigest()]
+    return cache[key][2]
+
+def stage_fingerprint(stage, params, digest_cache):
+    """Fingerprint dari isi input, versi kode stage, konfigurasi environment, dan parameter pemanggilan."""
+    fingerprint = hashlib.sha256()
+    fingerprint.update(json.dumps({"stage": stage.name, "params": params}, sort_keys=True, default=str).encode())
+    if stage.env:
+        env = {key: os.getenv(key) for key in stage.env}
+        fingerprint.update(json.dumps({"env": env}, sort_keys=True).encode())
+
+    for path in stage_code_files(stage):
+        fingerprint.update(f"code:{path.name}:{file_digest(path, digest_cache)}".encode())
+
+    for path in list(stage.inputs) + list(stage.optional_inputs):
+        found = resolve_path(path)
+        digest = file_digest(found, digest_cache) if found else "missing"
+        fingerprint.update(f"input:{Path(path).name}:{digest}".encode())
+    return fingerprint.hexdigest()
+
+def load_state():
+    if STATE_PATH.exists():
+        try:
+            return json.loads(STATE_PATH.read_text())
+        except json.JSONDecodeError:
+            logger.warning(f"[PIPELINE] Ignoring unreadable state file: {STATE_PATH}")
+    return {"stages": {}, "digests": {}}
+
+def save_state(state):
+    STATE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = STATE_PATH.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(state, indent=2))
+    tmp_path.replace(STATE_PATH)
+
+def execution_order(stage_names, include_upstream=False):
+    """Urutan topologis stage; dependensi diturunkan dari output stage lain yang menjadi input."""
+    producers = {str(out): stage.name for stage in STAGES.values() for out in stage.outputs}
+    graph = {
+        name: {producers[str(p)] for p in STAGES[name].inputs if str(p) in producers}
+        for name in STAGES
+    }
+
+    selected = set(stage_names)
+    if include_upstream:
+        pending = list(selected)
+        while pending:
+            for dep in graph[pending.pop()]:
+                if dep not in selected:
+                    selected.add(dep)
+                    pending.append(dep)
+
+    order = TopologicalSorter({name: graph[name] & selected for name in selected}).static_order()
+    return list(order), graph
+
+class _ThreadRoutedStdout(io.TextIOBase):
+    """Teruskan print() dari thread yang sedang menjalankan stage ke sink-nya."""
+
+    def write(self, s):
+        sink = getattr(_capture_local, "sink", None)
+        if sink is None or _capture_local.in_sink:
+            return _original_stdout.write(s)
+        buffer = _capture_local.buffer + s
+        *lines, _capture_local.buffer = buffer.split("\n")
+        _capture_local.in_sink = True
+        try:
+            for line in lines:
+                sink(line.rstrip("\r"))
+        finally:
+            _capture_local.in_sink = False
+        return len(s)
+
+    def flush(self):
+        _original_stdout.flush()
+
+class _ThreadLogHandler(logging.Handler):
+    def __init__(self, thread_id, sink):
+        super().__init__()
+        self.thread_id = thread_id
+        self.sink = sink
+        self.setFormatter(logging.Formatter("%(levelname)s %(name)s: %(message)s"))
+
+    def emit(self, record):
+        if record.thread != self.thread_id or record.name == __name__ or _capture_local.in_sink:
+            return
+        _capture_local.in_sink = True
+        try:
+            self.sink(self.format(record))
+        finally:
+            _capture_local.in_sink = False
+
+def _start_capture(sink):
+    global _capture_users, _original_stdout
+    with _capture_lock:
+        if _capture_users == 0:
+            _original_stdout = sys.stdout
+            sys.stdout = _ThreadRoutedStdout()
+        _capture_users += 1
+    _capture_local.sink = sink
+    _capture_local.buffer = ""
+    _capture_local.in_sink = False
+    handler = _ThreadLogHandler(threading.get_ident(), sink)
+    logging.getLogger().addHandler(handler)
+    return handler
+
+def _stop_capture(handler):
+    global _capture_users
+    logging.getLogger().removeHandler(handler)
+    if _capture_local.buffer:
+        _capture_local.sink(_capture_local.buffer)
+    _capture_local.sink = None
+    with _capture_lock:
+        _capture_users -= 1
+        if _capture_users == 0:
+            sys.stdout = _original_stdout
+
+def run_stage(stage, params, on_log):
+    """Jalankan satu fungsi stage di proses ini sambil meneruskan log-nya baris per baris."""
+    def sink(line):
+        logger.info(f"[STAGE:{stage.name}] {line}")
+        if on_log:
+            on_log(stage.name, line)
+
+    handler = _start_capture(sink)
+    try:
+        return _call_stage(stage, params)
+    finally:
+        _stop_capture(handler)
+
+def count_rows(paths):
+    """Total baris dari stage yang jumlah barisnya bisa dibaca dari metadata; None jika tidak ada."""
+    counts = [stage_rows(p) for p in paths if not Path(p).suffix and resolve_path(p)]
+    counts = [c for c in counts if c is not None]
+    return sum(counts) if counts else None
+
+def _call_stage(stage, params):
+    """Panggil fungsi stage di dalam profiler; kembalikan semua record profil selama stage berjalan."""
+    with collect_records() as records:
+        with profiled(stage.name, stage=stage.name, rows_in=count_rows(stage.inputs), dump_profile=True) as record:
+            module = _import_stage_module(stage)
+            getattr(module, stage.function)(**params)
+            record.rows_out = count_rows(stage.outputs)
+    return records
+
+def _import_stage_module(stage):
+    """
+    Import modul stage. Jika salah satu file kode yang masuk fingerprint berubah sejak import terakhir
+    (proses API hidup lama), stage_io dan helper di stage.code yang sudah ter-import dimuat ulang
+    lebih dulu, baru modul stage, agar kode yang berjalan sama dengan kode yang di-fingerprint.
+    """
+    files = stage_code_files(stage)
+    mtimes = code_mtimes(files)
+    module = importlib.import_module(stage.module)
+    if _code_mtimes.get(stage.name) != mtimes:
+        for path in files[1:]:
+            if path.suffix == ".py" and path.stem in sys.modules:
+                importlib.reload(sys.modules[path.stem])
+        module = importlib.reload(module)
+        _code_mtimes[stage.name] = mtimes
+    return module
+
+def all_code_mtimes():
+    return code_mtimes({path for stage in STAGES.values() for path in stage_code_files(stage)})
+
+def _run_stage_in_worker(name, params, log_queue):
+    """Entry point di proses worker; log dikirim balik ke proses utama lewat queue."""
+    stage = STAGES[name]
+    handler = _start_capture(lambda line: log_queue.put((name, line)))
+    try:
+        return [record.to_dict() for record in _call_stage(stage, params)]
+    finally:
+        _stop_capture(handler)
+
+def _get_process_pool(workers):
+    """
+    Pool proses dipakai ulang antar run agar pandas/rapidfuzz/torch tidak di-import ulang.
+    Pool diganti bila file kode stage mana pun berubah, sehingga worker tidak menjalankan helper lama.
+    """
+    global _process_pool, _process_pool_workers, _process_pool_code, _log_manager
+    with _pool_lock:
+        code = all_code_mtimes()
+        if _process_pool is None or _process_pool_workers != workers or _process_pool_code != code:
+            if _process_pool is not None:
+                logger.info("[PIPELINE] Restarting worker pool (worker count or stage code changed)")
+                _process_pool.shutdown(wait=False)
+            _process_pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+            _process_pool_workers = workers
+            _process_pool_code = code
+        if _log_manager is None:
+            _log_manager = multiprocessing.get_context("spawn").Manager()
+        return _process_pool, _log_manager
+
+def run_pipeline(stage_names, force=False, include_upstream=False, params=None, on_log=None, workers=None, on_stage=None):
+    """
+    Jalankan stage sesuai DAG. Stage yang saling independen (mis. sister dan scopus) dijalankan
+    bersamaan di process pool berukuran `workers` (default PIPELINE_WORKERS); workers=1 berarti
+    berurutan di proses ini. Stage dilewati jika fingerprint (isi input + versi kode + env + parameter)
+    sama dengan run sukses terakhir dan outputnya masih ada. Jika satu stage gagal, tidak ada
+    stage baru yang dijadwalkan sehingga stage turunan tidak berjalan di atas input basi.
+    """
+    params = params or {}
+    workers = max(1, workers or PIPELINE_WORKERS)
+    order, graph = execution_order(stage_names, include_upstream=include_upstream)
+    selected = set(order)
+    sorter = TopologicalSorter({name: graph[name] & selected for name in selected})
+    sorter.prepare()
+    results = []
+    profile_records = []
+
+    def emit(stage_name, line):
+        if on_log:
+            on_log(stage_name, line)
+
+    def record(result):
+        results.append(result)
+        if on_stage:
+            on_stage(result)
+
+    log_queue = None
+    if workers > 1:
+        pool, manager = _get_process_pool(workers)
+        log_queue = manager.Queue()
+
+        def drain_logs():
+            while (item := log_queue.get()) is not None:
+                stage_name, line = item
+                logger.info(f"[STAGE:{stage_name}] {line}")
+                emit(stage_name, line)
+
+        drain_thread = threading.Thread(target=drain_logs, daemon=True)
+        drain_thread.start()
+    else:
+        pool = ThreadPoolExecutor(max_workers=1)
+
+    running = {}
+    failed = False
+    try:
+        while running or (sorter.is_active() and not failed):
+            # Setelah ada kegagalan, stage baru tidak dijadwalkan; yang sedang berjalan ditunggu.
+            for name in (sorter.get_ready() if not failed else ()):
+                stage = STAGES[name]
+                stage_params = params.get(name, {})
+
+                with _state_lock:
+                    state = load_state()
+                    fingerprint = stage_fingerprint(stage, stage_params, state["digests"])
+                    save_state(state)
+
+                previous = state["stages"].get(name, {})
+                outputs_present = all(output_present(p) for p in stage.outputs)
+                if not force and previous.get("fingerprint") == fingerprint and outputs_present:
+                    logger.info(f"[PIPELINE] Skipping {name}: inputs and code unchanged")
+                    emit(name, f"Skipped: {name} (inputs and code unchanged)")
+                    record({"stage": name, "status": "skipped", "seconds": 0.0})
+                    sorter.done(name)
+                    continue
+
+                logger.info(f"[PIPELINE] Running stage: {name}")
+                emit(name, f"Running: {name}")
+                if log_queue is not None:
+                    future = pool.submit(_run_stage_in_worker, name, stage_params, log_queue)
+                else:
+                    future = pool.submit(run_stage, stage, stage_params, on_log)
+                running[future] = (name, fingerprint, time.time())
+                if on_stage:
+                    on_stage({"stage": name, "status": "running", "seconds": 0.0})
+
+            if not running:
+                continue
+
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name, fingerprint, start = running.pop(future)
+                seconds = time.time() - start
+                error = future.exception()
+                if error is not None:
+                    failed = True
+                    logger.error(f"[PIPELINE] Stage {name} failed: {error}")
+                    emit(name, f"Failed: {name} ({error})")
+                    record({"stage": name, "status": "failed", "seconds": seconds, "error": str(error)})
+                    continue
+
+                with _state_lock:
+                    state = load_state()
+                    state["stages"][name] = {
+                        "fingerprint": fingerprint,
+                        "finished_at": time.time(),
+                        "seconds": seconds,
+                    }
+                    save_state(state)
+
+                stage_records = future.result() or []
+                if log_queue is not None:
+                    # Record dari worker belum ada di proses ini (untuk /metrics).
+                    add_records(stage_records)
+                stage_records = [r if isinstance(r, dict) else r.to_dict() for r in stage_records]
+                profile_records.extend(stage_records)
+                stage_profile = next((r for r in stage_records if r["name"] == name), {})
+
+                logger.info(f"[PIPELINE] Finished stage: {name} ({seconds:.2f}s)")
+                emit(name, f"Finished: {name} ({seconds:.2f}s)")
+                record({
+                    "stage": name, "status": "done", "seconds": seconds,
+                    **{key: stage_profile.get(key) for key in PROFILE_FIELDS},
+                })
+                sorter.done(name)
+    finally:
+        if log_queue is not None:
+            log_queue.put(None)
+            drain_thread.join()
+        else:
+            pool.shutdown(wait=True)
+
+    log_records_to_mlflow([ProfileRecord(**r) for r in profile_records])
+    return results
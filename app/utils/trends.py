@@ -0,0 +1,100 @@
+import os
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app import models
+from app.utils.loader import copy_frame
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(BASE_DIR / "src" / "data-cleaning"))
+
+from stage_io import read_stage
+from profiling import profiled
+
+OUTPUT_DIR = BASE_DIR / "data" / "cleaned" / "output"
+TRENDS_CACHE_TTL = float(os.getenv("TRENDS_CACHE_TTL", "300"))
+
+# stage agregat (lihat src/modelling/trend_aggregates.py) -> tabel tujuan
+AGGREGATE_TABLES = {
+    "trend_topic_year": models.TrenTopikTahun,
+    "trend_domain_year": models.TrenDomainTahun,
+    "trend_nip_topics": models.TrenTopikDosen,
+}
+
+logger = logging.getLogger(__name__)
+
+_cache = {}
+_cache_lock = threading.Lock()
+
+def materialize_trends(db: Session):
+    """Ganti isi tabel tren dengan agregat hasil analisis terakhir dalam satu transaksi."""
+    cursor = db.connection().connection.cursor()
+    with profiled("materialize_trends", stage="db_load") as prof:
+        prof.rows_out = 0
+        try:
+            for stage_name, model in AGGREGATE_TABLES.items():
+                table = f"{model.__table__.schema}.{model.__tablename__}"
+                df = read_stage(OUTPUT_DIR / stage_name)
+                df = df[[col.name for col in model.__table__.columns]].dropna(
+                    subset=[col.name for col in model.__table__.primary_key]
+                )
+                cursor.execute(f"DELETE FROM {table}")
+                if not df.empty:
+                    copy_frame(cursor, df, table)
+                prof.rows_out += len(df)
+                logger.info(f"[TRENDS] {table}: {len(df)} rows")
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            cursor.close()
+    invalidate_trends_cache()
+
+def invalidate_trends_cache():
+    with _cache_lock:
+        _cache.clear()
+
+def load_trends(db: Session, nip=None):
+    topic_year = db.execute(text(
+        "SELECT topic, topic_name, tahun, count FROM penelitian.tren_topik_tahun ORDER BY tahun, count DESC"
+    )).mappings().all()
+    domain_year = db.execute(text(
+        "SELECT domain, tahun, count FROM penelitian.tren_domain_tahun ORDER BY tahun, count DESC"
+    )).mappings().all()
+
+    nip_query = "SELECT nip, rank, topic, topic_name, count FROM penelitian.tren_topik_dosen"
+    if nip is not None:
+        nip_topics = db.execute(text(f"{nip_query} WHERE nip = :nip ORDER BY rank"), {"nip": nip})
+    else:
+        nip_topics = db.execute(text(f"{nip_query} ORDER BY nip, rank"))
+
+    return {
+        "topic_year": [dict(row) for row in topic_year],
+        "domain_year": [dict(row) for row in domain_year],
+        "nip_topics": [dict(row) for row in nip_topics.mappings().all()],
+    }
+
+def get_trends(db: Session, nip=None):
+    """
+    Kembalikan (etag, body JSON) tren; dibaca dari tabel hanya bila cache kosong atau
+    sudah lewat TRENDS_CACHE_TTL detik. Cache dikosongkan setiap kali tabel tren diperbarui.
+    """
+    key = nip or ""
+    now = time.monotonic()
+    with _cache_lock:
+        entry = _cache.get(key)
+    if entry is not None and entry[0] > now:
+        return entry[1], entry[2]
+
+    body = json.dumps(load_trends(db, nip=nip), sort_keys=True, default=str).encode("utf-8")
+    etag = f'"{hashlib.sha1(body).hexdigest()}"'
+    with _cache_lock:
+        _cache[key] = (now + TRENDS_CACHE_TTL, etag, body)
+    return etag, body
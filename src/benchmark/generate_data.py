@@ -0,0 +1,195 @@
+import argparse
+import string
+import numpy as np
+from pathlib import Path
+from openpyxl import Workbook
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DEFAULT_OUTPUT_DIR = BASE_DIR / "data" / "benchmark" / "raw"
+
+# Baris data per sheet (batas Excel 1.048.576 dikurangi header); sisanya ke sheet lanjutan
+# dengan header yang sama, yang dibaca raw_excel sebagai satu tabel.
+EXCEL_MAX_ROWS = 1_048_575
+
+FIRST_NAMES = [
+    "budi", "ani", "siti", "agus", "dewi", "rudi", "rina", "joko", "sri", "eko", "wahyu", "nur",
+    "putri", "andi", "yuli", "hendra", "fitri", "bayu", "indah", "dian", "arif", "lestari", "hadi",
+    "ratna", "fajar", "maya", "teguh", "novi", "rizky", "wulan", "dedi", "sari", "ilham", "ayu",
+]
+LAST_NAMES = [
+    "santoso", "wijaya", "saputra", "pratama", "kusuma", "hidayat", "nugroho", "susanto", "lestari",
+    "setiawan", "wibowo", "rahman", "purnomo", "halim", "siregar", "nasution", "harahap", "gunawan",
+    "utomo", "hasibuan", "simanjuntak", "prasetyo", "firmansyah", "kurniawan", "suryadi", "permana",
+]
+TITLE_WORDS = [
+    "analysis", "deep", "learning", "model", "system", "data", "network", "optimization", "rice",
+    "health", "policy", "education", "energy", "climate", "water", "urban", "community", "design",
+    "evaluation", "impact", "framework", "approach", "classification", "prediction", "sensor",
+    "renewable", "forest", "agriculture", "economic", "social", "student", "hospital", "patient",
+    "analisis", "sistem", "pengaruh", "penerapan", "pengembangan", "kinerja", "masyarakat",
+    "pendidikan", "kesehatan", "lingkungan", "ekonomi", "pertanian", "energi", "teknologi",
+    "informasi", "manajemen", "strategi", "kualitas", "produksi", "metode", "berbasis", "studi",
+    "kasus", "daerah", "industri", "digital", "machine", "neural", "image", "segmentation", "covid",
+    "vaccine", "nutrition", "tourism", "finance", "banking", "marketing", "tsunami", "earthquake",
+]
+CONNECTORS = ["for", "of", "in", "on", "using", "with", "dan", "di", "pada", "untuk", "terhadap"]
+PUBLICATION_TYPES = ["Jurnal", "Prosiding", "Buku", "Artikel"]
+JOURNALS = [f"journal of {w}" for w in TITLE_WORDS[:40]] + [f"jurnal {w}" for w in TITLE_WORDS[33:60]]
+
+def misspell(text, rng):
+    """Satu salah ketik acak: tukar, hapus, gandakan atau ganti satu huruf."""
+    if len(text) < 4:
+        return text
+    pos = int(rng.integers(1, len(text) - 2))
+    op = int(rng.integers(4))
+    if op == 0:
+        return text[:pos] + text[pos + 1] + text[pos] + text[pos + 2:]
+    if op == 1:
+        return text[:pos] + text[pos + 1:]
+    if op == 2:
+        return text[:pos] + text[pos] + text[pos:]
+    return text[:pos] + rng.choice(list(string.ascii_lowercase)) + text[pos + 1:]
+
+def make_authors(n_authors, rng):
+    firsts = rng.choice(FIRST_NAMES, size=n_authors)
+    lasts = rng.choice(LAST_NAMES, size=n_authors)
+    names = [f"{f} {l}" for f, l in zip(firsts, lasts)]
+    # Langkah acak yang selalu maju menjamin ID unik tanpa membuat seluruh rentang di memori.
+    nips = 10**8 + np.cumsum(rng.integers(1, 50, size=n_authors))
+    scopus_ids = 5 * 10**9 + np.cumsum(rng.integers(1, 5000, size=n_authors))
+    return {
+        "name": names,
+        "nip": [f"19{nip:09d}{i % 10}" for i, nip in enumerate(nips)],
+        "id_scopus": [str(sid) for sid in scopus_ids],
+    }
+
+def make_titles(n, rng):
+    lengths = rng.integers(5, 12, size=n)
+    words = rng.choice(TITLE_WORDS, size=(n, 12))
+    connectors = rng.choice(CONNECTORS, size=n)
+    titles = []
+    for i in range(n):
+        w = list(words[i, :lengths[i]])
+        w.insert(len(w) // 2, connectors[i])
+        titles.append(" ".join(w).capitalize())
+    return titles
+
+def scopus_author(name, id_scopus):
+    first, last = name.split(" ", 1)
+    return f"{last.title()}, {first.title()} ({id_scopus})"
+
+def write_xlsx(path, header, rows, max_rows=EXCEL_MAX_ROWS):
+    book = Workbook(write_only=True)
+    for n, start in enumerate(range(0, max(len(rows), 1), max_rows), start=1):
+        sheet = book.create_sheet(title=f"Sheet{n}")
+        sheet.append(header)
+        for row in rows[start:start + max_rows]:
+            sheet.append(row)
+    book.save(path)
+
+def generate(n_publications, output_dir=DEFAULT_OUTPUT_DIR, dup_rate=0.3, typo_rate=0.05,
+             missing_nip_rate=0.1, authors_per_lecturer=20, seed=42):
+    """
+    Tulis sister.xlsx, scopus.xlsx dan nip_scopus_id.xlsx sintetis dengan format kolom seperti export asli.
+    dup_rate: porsi publikasi yang muncul di kedua sumber (harus digabung oleh combine_fuzzy).
+    typo_rate: porsi judul/nama yang diberi salah ketik di salah satu sumber.
+    """
+    rng = np.random.default_rng(seed)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    n_authors = max(20, n_publications // authors_per_lecturer)
+    authors = make_authors(n_authors, rng)
+    titles = make_titles(n_publications, rng)
+    years = rng.integers(2010, 2025, size=n_publications)
+    journals = rng.choice(JOURNALS, size=n_publications)
+    types = rng.choice(PUBLICATION_TYPES, size=n_publications)
+    has_doi = rng.random(n_publications) < 0.7
+    n_lecturers = rng.integers(1, 4, size=n_publications)
+    n_external = rng.integers(0, 3, size=n_publications)
+
+    source = rng.random(n_publications)
+    in_both = source < dup_rate
+    in_sister = in_both | (source >= dup_rate + (1 - dup_rate) / 2)
+    in_scopus = in_both | ~in_sister
+
+    mapping_rows = []
+    for i in range(n_authors):
+        sid = authors["id_scopus"][i]
+        r = rng.random()
+        if r < 0.5:
+            sid_cell = sid
+        elif r < 0.9:
+            sid_cell = f"https://www.scopus.com/authid/detail.uri?authorId={sid}"
+        else:
+            sid_cell = None
+        mapping_rows.append([authors["nip"][i], sid_cell, authors["name"][i].title()])
+
+    sister_rows, scopus_rows = [], []
+    for p in range(n_publications):
+        lecturers = rng.choice(n_authors, size=n_lecturers[p], replace=False)
+        doi = f"10.{1000 + p % 9000}/bench.{p}" if has_doi[p] else None
+        year = int(years[p])
+
+        if in_sister[p]:
+            for a in lecturers:
+                name = authors["name"][a]
+                if rng.random() < typo_rate:
+                    name = misspell(name, rng)
+                nip = authors["nip"][a] if rng.random() >= missing_nip_rate else None
+                sister_rows.append([
+                    nip, name.title(), titles[p], types[p], journals[p],
+                    f"https://sister.example.ac.id/publikasi/{p}" if rng.random() < 0.5 else None,
+                    doi, f"{year}-{int(rng.integers(1, 13)):02d}-{int(rng.integers(1, 29)):02d}", "SISTER",
+                ])
+
+        if in_scopus[p]:
+            title = titles[p]
+            if in_both[p] and rng.random() < typo_rate:
+                title = misspell(title, rng)
+            names = [scopus_author(authors["name"][a], authors["id_scopus"][a]) for a in lecturers]
+            ids = [authors["id_scopus"][a] for a in lecturers]
+            for _ in range(n_external[p]):
+                ext_id = str(int(rng.integers(10**10, 10**11)))
+                names.append(scopus_author(f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", ext_id))
+                ids.append(ext_id)
+            scopus_doi = f"https://doi.org/{doi}" if doi and rng.random() < 0.3 else doi
+            scopus_rows.append([
+                "; ".join(names), ";".join(ids), title, journals[p], None,
+                f"https://www.scopus.com/record/{p}", scopus_doi, year, "SCOPUS",
+            ])
+
+    write_xlsx(output_dir / "nip_scopus_id.xlsx", ["nip", "id_scopus", "nm"], mapping_rows)
+    write_xlsx(
+        output_dir / "sister.xlsx",
+        ["NIP", "NAMA_SDM", "JUDUL", "JENIS_PUBLIKASI", "NAMA_JURNAL", "TAUTAN", "DOI", "TANGGAL", "SUMBER DATA"],
+        sister_rows
+    )
+    write_xlsx(
+        output_dir / "scopus.xlsx",
+        ["Author full names", "Author(s) ID", "Title", "Source title", "Conference name",
+         "Link", "DOI", "Year", "Sumber data"],
+        scopus_rows
+    )
+
+    return {
+        "publications": n_publications,
+        "authors": n_authors,
+        "sister_rows": len(sister_rows),
+        "scopus_rows": len(scopus_rows),
+        "in_both": int(in_both.sum()),
+    }
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic SISTER/Scopus raw exports")
+    parser.add_argument("--size", type=int, default=1000, help="jumlah publikasi")
+    parser.add_argument("--output-dir", type=Path, default=DEFAULT_OUTPUT_DIR)
+    parser.add_argument("--dup-rate", type=float, default=0.3)
+    parser.add_argument("--typo-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+    summary = generate(
+        args.size, output_dir=args.output_dir, dup_rate=args.dup_rate,
+        typo_rate=args.typo_rate, seed=args.seed
+    )
+    print(f"Synthetic data written to {args.output_dir}: {summary}")
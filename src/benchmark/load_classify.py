@@ -0,0 +1,164 @@
+import re
+import sys
+import json
+import time
+import argparse
+import threading
+import numpy as np
+import requests
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+RESULTS_DIR = BENCH_DIR.parent.parent / "logs" / "benchmark"
+DEFAULT_URL = "http://localhost:8000"
+CLASSIFY_PATH = "/analysis/classify"
+
+# Target default: judul dosen di-tag interaktif, jadi p95 harus terasa instan pada beban puncak kecil.
+TARGET_RPS = 50.0
+TARGET_P95_MS = 300.0
+
+sys.path.insert(0, str(BENCH_DIR))
+
+from generate_data import make_titles
+
+BATCH_METRIC_RE = re.compile(
+    r'^pipeline_block_(runs|rows_in)_total\{stage="classify",block="classify_batch"\} (\S+)$', re.MULTILINE
+)
+
+def batch_counters(base_url):
+    """Jumlah micro-batch dan judul yang sudah diproses server (dari /metrics), None jika tidak tersedia."""
+    try:
+        text = requests.get(f"{base_url}/metrics", timeout=10).text
+    except requests.RequestException:
+        return None
+    counters = {name: float(value) for name, value in BATCH_METRIC_RE.findall(text)}
+    return counters if len(counters) == 2 else {"runs": 0.0, "rows_in": 0.0}
+
+def worker(url, titles, titles_per_request, deadline, max_requests, counter, lock, latencies, errors):
+    session = requests.Session()
+    rng = np.random.default_rng(threading.get_ident() % (2 ** 32))
+    while time.perf_counter() < deadline:
+        with lock:
+            if counter[0] >= max_requests:
+                return
+            counter[0] += 1
+        payload = {"judul": list(rng.choice(titles, size=titles_per_request))}
+        start = time.perf_counter()
+        try:
+            response = session.post(url, json=payload, timeout=30)
+            ok = response.status_code == 200
+            status = response.status_code
+        except requests.RequestException as e:
+            ok, status = False, type(e).__name__
+        elapsed = time.perf_counter() - start
+        with lock:
+            if ok:
+                latencies.append(elapsed)
+            else:
+                errors[str(status)] = errors.get(str(status), 0) + 1
+
+def run_load(base_url, concurrency, duration, max_requests, titles_per_request, seed):
+    titles = make_titles(1000, np.random.default_rng(seed))
+    url = base_url + CLASSIFY_PATH
+    requests.post(url, json={"judul": titles[:1]}, timeout=60)
+
+    latencies, errors, counter, lock = [], {}, [0], threading.Lock()
+    before = batch_counters(base_url)
+    start = time.perf_counter()
+    threads = [
+        threading.Thread(
+            target=worker,
+            args=(url, titles, titles_per_request, start + duration, max_requests, counter, lock, latencies, errors),
+        )
+        for _ in range(concurrency)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    seconds = time.perf_counter() - start
+    after = batch_counters(base_url)
+
+    latencies_ms = np.asarray(latencies) * 1000
+    result = {
+        "requests": len(latencies) + sum(errors.values()),
+        "ok": len(latencies),
+        "errors": errors,
+        "seconds": seconds,
+        "requests_per_second": len(latencies) / seconds if seconds > 0 else 0.0,
+        "titles_per_second": len(latencies) * titles_per_request / seconds if seconds > 0 else 0.0,
+    }
+    if len(latencies_ms):
+        result.update({
+            "latency_ms_mean": float(latencies_ms.mean()),
+            "latency_ms_p50": float(np.percentile(latencies_ms, 50)),
+            "latency_ms_p95": float(np.percentile(latencies_ms, 95)),
+            "latency_ms_p99": float(np.percentile(latencies_ms, 99)),
+            "latency_ms_max": float(latencies_ms.max()),
+        })
+    if before is not None and after is not None and after["runs"] > before["runs"]:
+        result["server_batches"] = int(after["runs"] - before["runs"])
+        result["mean_batch_size"] = (after["rows_in"] - before["rows_in"]) / (after["runs"] - before["runs"])
+    return result
+
+def check_targets(result, target_rps, target_p95_ms):
+    failures = []
+    if result["requests_per_second"] < target_rps:
+        failures.append(f"throughput {result['requests_per_second']:.1f} req/s < target {target_rps:.1f} req/s")
+    p95 = result.get("latency_ms_p95")
+    if p95 is None or p95 > target_p95_ms:
+        failures.append(f"p95 latency {p95 if p95 is not None else float('nan'):.1f} ms > target {target_p95_ms:.1f} ms")
+    if result["errors"]:
+        failures.append(f"errors: {result['errors']}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the /analysis/classify endpoint")
+    parser.add_argument("--url", default=DEFAULT_URL, help="base URL API")
+    parser.add_argument("--concurrency", type=int, default=16, help="jumlah klien paralel")
+    parser.add_argument("--duration", type=float, default=30.0, help="lama pengujian (detik)")
+    parser.add_argument("--max-requests", type=int, default=10 ** 9)
+    parser.add_argument("--titles-per-request", type=int, default=1)
+    parser.add_argument("--target-rps", type=float, default=TARGET_RPS)
+    parser.add_argument("--target-p95-ms", type=float, default=TARGET_P95_MS)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, default=None, help="file JSON hasil")
+    args = parser.parse_args()
+
+    result = run_load(
+        args.url.rstrip("/"), args.concurrency, args.duration, args.max_requests, args.titles_per_request, args.seed
+    )
+    result["config"] = {
+        "url": args.url, "concurrency": args.concurrency, "duration": args.duration,
+        "titles_per_request": args.titles_per_request, "target_rps": args.target_rps,
+        "target_p95_ms": args.target_p95_ms,
+    }
+    result["timestamp"] = datetime.now().isoformat(timespec="seconds")
+
+    print(
+        f"{result['ok']}/{result['requests']} ok in {result['seconds']:.1f}s: "
+        f"{result['requests_per_second']:.1f} req/s, {result['titles_per_second']:.1f} titles/s"
+    )
+    if "latency_ms_p95" in result:
+        print(
+            f"latency ms: p50 {result['latency_ms_p50']:.1f}, p95 {result['latency_ms_p95']:.1f}, "
+            f"p99 {result['latency_ms_p99']:.1f}, max {result['latency_ms_max']:.1f}"
+        )
+    if "mean_batch_size" in result:
+        print(f"server micro-batches: {result['server_batches']} (mean size {result['mean_batch_size']:.1f})")
+
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"classify-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.write_text(json.dumps(result, indent=2))
+    print(f"Load test results saved to: {output}")
+
+    failures = check_targets(result, args.target_rps, args.target_p95_ms)
+    for failure in failures:
+        print(f"TARGET MISSED: {failure}")
+    sys.exit(1 if failures else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import hashlib
+import numpy as np
+
+try:
+    from bertopic.backend import BaseEmbedder
+except ImportError:
+    BaseEmbedder = object
+
+class HashingEmbedder(BaseEmbedder):
+    """
+    Pengganti SentenceTransformer untuk benchmark offline: hashing trick kata ke vektor acak tetap
+    (deterministik, tanpa unduhan model). Kualitas topik tidak dinilai, hanya waktu dan memori.
+    """
+
+    def __init__(self, model_name=None, dim=64):
+        if BaseEmbedder is not object:
+            super().__init__()
+        self.dim = dim
+        self._word_vectors = {}
+
+    def _word_vector(self, word):
+        vector = self._word_vectors.get(word)
+        if vector is None:
+            seed = int.from_bytes(hashlib.sha1(word.encode("utf-8")).digest()[:8], "little")
+            vector = np.random.default_rng(seed).standard_normal(self.dim).astype(np.float32)
+            self._word_vectors[word] = vector
+        return vector
+
+    def encode(self, sentences, batch_size=64, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        embeddings = np.zeros((len(sentences), self.dim), dtype=np.float32)
+        for i, sentence in enumerate(sentences):
+            words = str(sentence).lower().split()
+            if words:
+                embeddings[i] = np.mean([self._word_vector(w) for w in words], axis=0)
+        return embeddings
+
+    def embed(self, documents, verbose=False):
+        return self.encode(documents)
@@ -0,0 +1,214 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).resolve().parent
+BASE_DIR = BENCH_DIR.parent.parent
+DEFAULT_WORK_DIR = BASE_DIR / "data" / "benchmark"
+RESULTS_DIR = BASE_DIR / "logs" / "benchmark"
+SOURCE_DIRS = ["data-cleaning", "modelling"]
+RESULT_PREFIX = "BENCH_RESULT "
+
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BENCH_DIR))
+
+from app.utils.pipeline import STAGES, execution_order
+from generate_data import generate
+
+DEFAULT_STAGE_PARAMS = {"trend": {"mode": "train"}}
+
+def peak_rss_mb():
+    """Puncak resident memory proses ini dalam MB (None jika platform tidak menyediakan)."""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+def install_offline_embedder():
+    """Ganti SentenceTransformer dengan HashingEmbedder (dimuat oleh embedding_backend) agar stage trend tidak mengunduh model."""
+    from offline_embedder import HashingEmbedder
+    try:
+        import sentence_transformers
+    except ImportError:
+        import types
+        sentence_transformers = types.ModuleType("sentence_transformers")
+        sys.modules["sentence_transformers"] = sentence_transformers
+    sentence_transformers.SentenceTransformer = HashingEmbedder
+    return HashingEmbedder
+
+def run_child(stage_name, root, params):
+    """Dijalankan di subprocess: import modul stage dari sandbox lalu ukur waktu fungsi stage-nya."""
+    root = Path(root)
+    for src_dir in SOURCE_DIRS:
+        sys.path.insert(0, str(root / "src" / src_dir))
+
+    stage = STAGES[stage_name]
+    if stage_name == "trend":
+        install_offline_embedder()
+
+    import_start = time.perf_counter()
+    module = __import__(stage.module)
+    import_seconds = time.perf_counter() - import_start
+
+    from profiling import collect_records, profiled
+    start = time.perf_counter()
+    with collect_records() as records, profiled(stage_name, stage=stage_name):
+        getattr(module, stage.function)(**params)
+    seconds = time.perf_counter() - start
+
+    result = {
+        "seconds": seconds, "import_seconds": import_seconds, "peak_rss_mb": peak_rss_mb(),
+        "profile": [record.to_dict() for record in records],
+    }
+    print(RESULT_PREFIX + json.dumps(result), flush=True)
+
+def prepare_sandbox(root):
+    """Salin kode stage ke sandbox agar BASE_DIR tiap modul menunjuk ke data sintetis, bukan data asli."""
+    for src_dir in SOURCE_DIRS:
+        shutil.copytree(
+            BASE_DIR / "src" / src_dir, root / "src" / src_dir,
+            dirs_exist_ok=True, ignore=shutil.ignore_patterns("__pycache__")
+        )
+    shutil.rmtree(root / "data" / "cleaned", ignore_errors=True)
+
+def run_stage(stage_name, root, params, verbose=False):
+    env = dict(os.environ, EMBED_MODEL_NAME="offline-hashing", MLFLOW_TRACKING_URI="")
+    cmd = [
+        sys.executable, str(Path(__file__).resolve()), "--child", stage_name,
+        "--root", str(root), "--params", json.dumps(params)
+    ]
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=root, env=env, capture_output=True, text=True)
+    wall_seconds = time.perf_counter() - start
+
+    result_lines = [line for line in proc.stdout.splitlines() if line.startswith(RESULT_PREFIX)]
+    if verbose:
+        print(proc.stdout, end="")
+        print(proc.stderr, end="", file=sys.stderr)
+    if proc.returncode != 0 or not result_lines:
+        error = (proc.stderr.strip().splitlines() or ["unknown error"])[-1]
+        return {"status": "failed", "wall_seconds": wall_seconds, "error": error}
+
+    result = json.loads(result_lines[-1][len(RESULT_PREFIX):])
+    return {"status": "done", "wall_seconds": wall_seconds, **result}
+
+def run_size(size, stage_names, work_dir, dup_rate, typo_rate, seed, verbose=False):
+    root = Path(work_dir) / f"size-{size}"
+    prepare_sandbox(root)
+
+    start = time.perf_counter()
+    summary = generate(size, output_dir=root / "data" / "raw", dup_rate=dup_rate, typo_rate=typo_rate, seed=seed)
+    generate_seconds = time.perf_counter() - start
+    print(f"[size {size}] generated in {generate_seconds:.1f}s: {summary}")
+
+    order, graph = execution_order(stage_names)
+    stages = {}
+    for name in order:
+        failed_deps = [dep for dep in graph[name] if stages.get(dep, {}).get("status") in ["failed", "skipped"]]
+        if failed_deps:
+            stages[name] = {"status": "skipped", "error": f"upstream failed: {', '.join(failed_deps)}"}
+        else:
+            stages[name] = run_stage(name, root, DEFAULT_STAGE_PARAMS.get(name, {}), verbose=verbose)
+
+        result = stages[name]
+        if result["status"] == "done":
+            rss = f"{result['peak_rss_mb']:.0f} MB" if result.get("peak_rss_mb") is not None else "n/a"
+            print(f"[size {size}] {name}: {result['seconds']:.2f}s, peak RSS {rss}")
+        else:
+            print(f"[size {size}] {name}: {result['status']} ({result.get('error')})")
+
+    return {"size": size, "data": summary, "generate_seconds": generate_seconds, "stages": stages}
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(old_path, new_path):
+    """Cetak selisih waktu dan memori per ukuran data dan stage antara dua file hasil."""
+    old = json.loads(Path(old_path).read_text())
+    new = json.loads(Path(new_path).read_text())
+    old_runs = {run["size"]: run for run in old["runs"]}
+
+    print(f"{'size':>9} {'stage':<15} {'old s':>9} {'new s':>9} {'change':>8} {'old MB':>8} {'new MB':>8}")
+    for run in new["runs"]:
+        old_run = old_runs.get(run["size"])
+        if old_run is None:
+            continue
+        for name, result in run["stages"].items():
+            before = old_run["stages"].get(name, {})
+            if result.get("status") != "done" or before.get("status") != "done":
+                continue
+            change = (result["seconds"] - before["seconds"]) / before["seconds"] if before["seconds"] else 0.0
+            print(
+                f"{run['size']:>9} {name:<15} {before['seconds']:>9.2f} {result['seconds']:>9.2f} "
+                f"{change:>+8.1%} {before.get('peak_rss_mb') or 0:>8.0f} {result.get('peak_rss_mb') or 0:>8.0f}"
+            )
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark pipeline stages on synthetic data")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000], help="jumlah publikasi")
+    parser.add_argument("--stages", nargs="+", default=list(STAGES), choices=list(STAGES))
+    parser.add_argument("--dup-rate", type=float, default=0.3)
+    parser.add_argument("--typo-rate", type=float, default=0.05)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--work-dir", type=Path, default=DEFAULT_WORK_DIR)
+    parser.add_argument("--output", type=Path, default=None, help="file JSON hasil")
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("OLD", "NEW"))
+    parser.add_argument("--verbose", action="store_true", help="tampilkan output tiap stage")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    parser.add_argument("--root", help=argparse.SUPPRESS)
+    parser.add_argument("--params", default="{}", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.root, json.loads(args.params))
+        return
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    commit = git_commit()
+    results = {
+        "commit": commit,
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "config": {
+            "sizes": args.sizes, "stages": args.stages, "dup_rate": args.dup_rate,
+            "typo_rate": args.typo_rate, "seed": args.seed,
+        },
+        "runs": [
+            run_size(size, args.stages, args.work_dir, args.dup_rate, args.typo_rate, args.seed, verbose=args.verbose)
+            for size in args.sizes
+        ],
+    }
+
+    output = args.output
+    if output is None:
+        RESULTS_DIR.mkdir(parents=True, exist_ok=True)
+        output = RESULTS_DIR / f"bench-{commit or 'nocommit'}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Benchmark results saved to: {output}")
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,23 @@
+import logging
+import numpy as np
 import pandas as pd
 from pathlib import Path
 from rapidfuzz import fuzz, process
+from stage_io import read_stage, write_stage
+from identifiers import normalize_doi, normalize_link
+from profiling import profiled
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 CLEANED_DATA_DIR = BASE_DIR / "data" / "cleaned"
-SCOPUS_PATH = CLEANED_DATA_DIR / "scopus_cleaned.xlsx"
-SISTER_PATH = CLEANED_DATA_DIR / "sister_cleaned.xlsx"
-OUTPUT_PATH = CLEANED_DATA_DIR / "combined_publication.xlsx"
+SCOPUS_PATH = CLEANED_DATA_DIR / "scopus_cleaned"
+SISTER_PATH = CLEANED_DATA_DIR / "sister_cleaned"
+OUTPUT_PATH = CLEANED_DATA_DIR / "combined_publication"
+
+log = logging.getLogger(__name__)
 
 def load_and_prepare():
-    df_scopus = pd.read_excel(SCOPUS_PATH, dtype={"nip": str, "author_id": str})
-    df_sister = pd.read_excel(SISTER_PATH, dtype={"nip": str, "id_scopus": str})
+    df_scopus = read_stage(SCOPUS_PATH)
+    df_sister = read_stage(SISTER_PATH)
 
     df_scopus = df_scopus.rename(columns={
         "author_name": "nama",
@@ -43,57 +50,158 @@ def load_and_prepare():
 
     return df_sister, df_scopus
 
-def combine_fuzzy(df_sister, df_scopus, threshold=90, name_threshold=85):
-    combined = []
-    matched_sister_idx = set()
+def exact_key_matches(df_sister, df_scopus):
+    """Posisi baris SISTER untuk tiap baris Scopus yang DOI atau tautannya identik (-1 jika tidak ada)."""
+    matches = np.full(len(df_scopus), -1, dtype=np.int64)
+    for column, normalize in [("doi", normalize_doi), ("tautan", normalize_link)]:
+        sister_keys = df_sister[column].map(normalize)
+        key_to_pos = {}
+        for pos, key in enumerate(sister_keys):
+            if pd.notna(key):
+                key_to_pos.setdefault(key, pos)
+
+        scopus_keys = df_scopus[column].map(normalize)
+        found = scopus_keys.map(key_to_pos).fillna(-1).to_numpy(dtype=np.int64)
+        matches = np.where(matches == -1, found, matches)
+    return matches
+
+def length_bands(lengths, growth=1.1):
+    bands = []
+    lo = int(lengths.min())
+    max_len = int(lengths.max())
+    while lo <= max_len:
+        hi = max(lo, int(lo * growth))
+        if ((lengths >= lo) & (lengths <= hi)).any():
+            bands.append((lo, hi))
+        lo = hi + 1
+    return bands
+
+def blocked_title_matches(query_titles, sister_titles, threshold=90, workers=-1):
+    """
+    Cari judul SISTER terbaik untuk tiap judul unik Scopus, hanya di dalam blok panjang judul.
+
+    token_sort_ratio >= threshold mensyaratkan |l1 - l2| <= (1 - threshold/100) * (l1 + l2),
+    sehingga kandidat di luar jendela panjang tidak mungkin lolos dan boleh dilewati.
+    Hasil: posisi kandidat terbaik (-1 jika tidak ada) dan jumlah pasangan yang dihitung per blok.
+    """
+    best_pos = np.full(len(query_titles), -1, dtype=np.int64)
+    block_stats = []
+
+    def sorted_length(title):
+        return len(" ".join(sorted(title.split()))) if isinstance(title, str) else -1
+
+    query_len = np.array([sorted_length(t) for t in query_titles], dtype=np.int64)
+    sister_len = np.array([sorted_length(t) for t in sister_titles], dtype=np.int64)
+
+    valid_query = query_len >= 0
+    if not valid_query.any() or not (sister_len >= 0).any():
+        return best_pos, block_stats
+
+    slack = 1 - threshold / 100
+    for lo, hi in length_bands(query_len[valid_query]):
+        query_pos = np.flatnonzero(valid_query & (query_len >= lo) & (query_len <= hi))
+        if slack >= 1:
+            window = sister_len >= 0
+        else:
+            window_lo = np.floor(lo * (1 - slack) / (1 + slack) - 1e-9)
+            window_hi = np.ceil(hi * (1 + slack) / (1 - slack) + 1e-9)
+            window = (sister_len >= window_lo) & (sister_len <= window_hi)
+        candidate_pos = np.flatnonzero(window)
+
+        pairs = len(query_pos) * len(candidate_pos)
+        block_stats.append({"block": f"{lo}-{hi}", "queries": len(query_pos), "candidates": len(candidate_pos), "pairs": pairs})
+        if pairs == 0:
+            continue
+
+        # uint8 (skor 0-100) cukup untuk perbandingan; pasangan di bawah threshold sudah 0 dari rapidfuzz.
+        scores = process.cdist(
+            [query_titles[i] for i in query_pos],
+            [sister_titles[i] for i in candidate_pos],
+            scorer=fuzz.token_sort_ratio,
+            score_cutoff=threshold,
+            dtype=np.uint8,
+            workers=workers
+        )
+        best = scores.argmax(axis=1)
+        best_score = scores[np.arange(len(query_pos)), best]
+        hit = best_score >= threshold
+        best_pos[query_pos[hit]] = candidate_pos[best[hit]]
+
+    return best_pos, block_stats
+
+def combine_fuzzy(df_sister, df_scopus, threshold=90, name_threshold=85, workers=-1):
+    df_sister = df_sister.reset_index(drop=True)
+    df_scopus = df_scopus.reset_index(drop=True)
 
     sister_titles = df_sister["judul"].tolist()
     sister_title_to_index = dict(zip(sister_titles, df_sister.index))
 
-    for idx_s, row_s in df_scopus.iterrows():
-        match = process.extractOne(row_s["judul"], sister_titles, scorer=fuzz.token_sort_ratio)
-
-        if match and match[1] >= threshold:
-            matched_title = match[0]
-            match_idx = sister_title_to_index[matched_title]
-            row_t = df_sister.loc[match_idx]
-
-            nip_s = row_s["nip"]
-            nip_t = row_t["nip"]
-
-            name_score = fuzz.token_sort_ratio(str(row_s["nama"]), str(row_t["nama"]))
-
-            if name_score < name_threshold:
-                combined.append(row_s.to_dict())
-                continue
-
-            if pd.notna(nip_s) and pd.notna(nip_t) and nip_s != nip_t:
-                combined.append(row_s.to_dict())
-                continue
-
-            matched_sister_idx.add(match_idx)
-
-            combined_row = row_s.copy()
-            combined_row["sumber_data"] = "SISTER, SCOPUS"
-
-            if pd.isna(combined_row["nip"]) or combined_row["nip"].strip().lower() in ["", "nan"]:
-                combined_row["nip"] = nip_t if pd.notna(nip_t) else nip_s
-
-            combined.append(combined_row.to_dict())
-        else:
-            combined.append(row_s.to_dict())
-
-        if idx_s % 100 == 0:
-            print(f"Processed {idx_s}/{len(df_scopus)}")
-
+    match_pos = exact_key_matches(df_sister, df_scopus)
+    exact_count = int((match_pos >= 0).sum())
+    print(f"Exact DOI/link matches: {exact_count}/{len(df_scopus)}")
+
+    remaining = df_scopus.loc[match_pos == -1, "judul"]
+    unique_titles = remaining.drop_duplicates().tolist()
+    with profiled("fuzzy_title_match", rows_in=len(unique_titles)) as prof:
+        best_pos, block_stats = blocked_title_matches(unique_titles, sister_titles, threshold=threshold, workers=workers)
+        prof.rows_out = int((best_pos >= 0).sum())
+
+    for stats in block_stats:
+        log.info(f"Block {stats['block']} chars: {stats['queries']} x {stats['candidates']} = {stats['pairs']} pairs scored")
+    total_pairs = sum(stats["pairs"] for stats in block_stats)
+    print(f"Fuzzy pairs scored: {total_pairs} (full scan: {len(unique_titles) * len(sister_titles)})")
+
+    title_to_pos = {title: pos for title, pos in zip(unique_titles, best_pos) if pos >= 0}
+    fuzzy_pos = remaining.map(lambda t: title_to_pos.get(t, -1) if pd.notna(t) else -1)
+    match_pos[remaining.index.to_numpy()] = fuzzy_pos.to_numpy(dtype=np.int64)
+
+    is_fuzzy = np.zeros(len(df_scopus), dtype=bool)
+    is_fuzzy[remaining.index.to_numpy()] = True
+    canonical_pos = np.array([
+        sister_title_to_index.get(t, pos) if pd.notna(t) else pos for pos, t in enumerate(sister_titles)
+    ], dtype=np.int64)
+    resolved = np.where(is_fuzzy & (match_pos >= 0), canonical_pos[np.maximum(match_pos, 0)], match_pos)
+    match_idx = pd.Series(resolved, index=df_scopus.index).where(resolved >= 0)
+
+    matched = match_idx.notna()
+    df_target = df_sister.reindex(match_idx[matched].astype(int).to_numpy())
+    df_target.index = match_idx[matched].index
+
+    name_score = pd.Series(0.0, index=df_scopus.index)
+    if matched.any():
+        with profiled("fuzzy_name_check", rows_in=int(matched.sum())):
+            name_score[matched] = process.cpdist(
+                df_scopus.loc[matched, "nama"].astype(str).tolist(),
+                df_target["nama"].astype(str).tolist(),
+                scorer=fuzz.token_sort_ratio,
+                workers=workers
+            )
+
+    nip_s = df_scopus["nip"]
+    nip_t = df_target["nip"].reindex(df_scopus.index)
+    nip_conflict = nip_s.notna() & nip_t.notna() & (nip_s.astype(str) != nip_t.astype(str))
+
+    accepted = matched & (name_score >= name_threshold) & ~nip_conflict
+
+    combined = df_scopus.copy()
+    combined.loc[accepted, "sumber_data"] = "SISTER, SCOPUS"
+
+    nip_empty = nip_s.isna() | nip_s.astype(str).str.strip().str.lower().isin(["", "nan"])
+    fill_nip = accepted & nip_empty & nip_t.notna()
+    combined.loc[fill_nip, "nip"] = nip_t[fill_nip]
+
+    matched_sister_idx = set(match_idx[accepted].astype(int))
     unmatched_sister = df_sister.loc[~df_sister.index.isin(matched_sister_idx)]
-    combined += unmatched_sister.to_dict(orient="records")
 
-    df_combined = pd.DataFrame(combined).fillna("")
+    df_combined = pd.concat([combined, unmatched_sister], ignore_index=True).fillna("")
     return df_combined
 
-if __name__ == "__main__":
+def main():
     df_sister, df_scopus = load_and_prepare()
     df_combined = combine_fuzzy(df_sister, df_scopus)
-    df_combined.to_excel(OUTPUT_PATH, index=False)
-    print(f"Combined publication saved to: {OUTPUT_PATH}")
\ No newline at end of file
+    output_path = write_stage(df_combined, OUTPUT_PATH)
+    print(f"Combined publication saved to: {output_path}")
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s [%(levelname)s] %(name)s: %(message)s")
+    main()
\ No newline at end of file
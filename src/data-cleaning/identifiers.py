@@ -0,0 +1,17 @@
+import re
+import pandas as pd
+
+DOI_PREFIX_RE = re.compile(r"^(https?://)?(dx\.)?doi\.org/|^doi:\s*")
+LINK_SCHEME_RE = re.compile(r"^https?://(www\.)?")
+
+def normalize_doi(value):
+    if pd.isna(value):
+        return pd.NA
+    value = DOI_PREFIX_RE.sub("", str(value).strip().lower()).strip()
+    return value if value and value not in ["nan", "none"] else pd.NA
+
+def normalize_link(value):
+    if pd.isna(value):
+        return pd.NA
+    value = LINK_SCHEME_RE.sub("", str(value).strip().lower()).rstrip("/")
+    return value if value and value not in ["nan", "none"] else pd.NA
@@ -1,6 +1,8 @@
 import pandas as pd
 import re
 from pathlib import Path
+from raw_excel import read_raw_excel
+from stage_io import write_stage
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 RAW_DATA_DIR = BASE_DIR / "data" / "raw"
@@ -8,7 +10,7 @@ CLEANED_DATA_DIR = BASE_DIR / "data" / "cleaned"
 CLEANED_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
 INPUT_PATH = RAW_DATA_DIR / "nip_scopus_id.xlsx"
-OUTPUT_PATH = CLEANED_DATA_DIR / "nip_scopus_id_cleaned.xlsx"
+OUTPUT_PATH = CLEANED_DATA_DIR / "nip_scopus_id_cleaned"
 
 def normalize_name(name):
     name = str(name).strip().lower()
@@ -39,7 +41,7 @@ def extract_scopus_id(value):
     return pd.NA
 
 def preprocess_nip_scopus_id():
-    df = pd.read_excel(INPUT_PATH, dtype={"nip": str, "id_scopus": str})
+    df = read_raw_excel(INPUT_PATH, columns=["nip", "id_scopus", "nm"], dtype={"nip": str, "id_scopus": str})
 
     if not {"nip", "id_scopus", "nm"}.issubset(df.columns):
         raise ValueError("Kolom 'nip', 'id_scopus', dan 'nm' harus ada di file input")
@@ -51,8 +53,8 @@ def preprocess_nip_scopus_id():
 
     df = df.drop_duplicates(subset=["nip", "id_scopus", "nm"], keep="first")
 
-    df.to_excel(OUTPUT_PATH, index=False)
-    print(f"Cleaned data saved to: {OUTPUT_PATH}")
+    output_path = write_stage(df, OUTPUT_PATH)
+    print(f"Cleaned data saved to: {output_path}")
 
 if __name__ == "__main__":
     preprocess_nip_scopus_id()
\ No newline at end of file
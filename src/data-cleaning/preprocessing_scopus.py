@@ -1,8 +1,12 @@
 import os
 import re
+import numpy as np
 import pandas as pd
 from pathlib import Path
-from rapidfuzz import fuzz
+from rapidfuzz import fuzz, process
+from raw_excel import read_raw_excel
+from stage_io import read_stage, write_stage
+from profiling import profiled
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 RAW_DATA_DIR = BASE_DIR / "data" / "raw"
@@ -10,7 +14,8 @@ DATA_PATH = RAW_DATA_DIR / "scopus.xlsx"
 CLEANED_DATA_DIR = BASE_DIR / "data" / "cleaned"
 CLEANED_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
-MAPPING_PATH = CLEANED_DATA_DIR / "nip_scopus_id_cleaned.xlsx"
+MAPPING_PATH = CLEANED_DATA_DIR / "nip_scopus_id_cleaned"
+OUTPUT_PATH = CLEANED_DATA_DIR / "scopus_cleaned"
 
 def normalize_name(name):
     name = str(name).lower().strip()
@@ -51,17 +56,36 @@ def clean_string_column(col):
     return col.apply(lambda x: str(x).strip().lower() if pd.notna(x) else pd.NA)
 
 
-def fuzzy_match_name(name, candidate_map):
-    name_norm = normalize_name(name)
-    best_match = None
-    best_score = 0
-    for candidate_name, nip in candidate_map:
-        candidate_norm = normalize_name(candidate_name)
-        score = fuzz.token_sort_ratio(name_norm, candidate_norm)
-        if score > best_score:
-            best_match = nip
-            best_score = score
-    return best_match if best_score >= 80 else pd.NA
+def fuzzy_match_names(names, candidate_map, threshold=80, workers=-1, max_cells=5_000_000):
+    """Cocokkan sekumpulan nama ke NIP sekaligus; tiap nama unik hanya dinilai sekali."""
+    result = pd.Series(pd.NA, index=names.index, dtype="object")
+    if names.empty or not candidate_map:
+        return result
+
+    candidate_norm = [normalize_name(candidate_name) for candidate_name, _ in candidate_map]
+    candidate_nip = np.array([nip for _, nip in candidate_map], dtype=object)
+
+    unique_names = pd.unique(names)
+    unique_norm = [normalize_name(name) for name in unique_names]
+
+    chunk_size = max(1, max_cells // len(candidate_norm))
+    best_nip = np.full(len(unique_names), pd.NA, dtype=object)
+    with profiled("fuzzy_match_names", rows_in=len(unique_names)) as prof:
+        for start in range(0, len(unique_norm), chunk_size):
+            scores = process.cdist(
+                unique_norm[start:start + chunk_size],
+                candidate_norm,
+                scorer=fuzz.token_sort_ratio,
+                dtype=np.float64,
+                workers=workers
+            )
+            best = scores.argmax(axis=1)
+            best_score = scores[np.arange(len(best)), best]
+            best_nip[start:start + chunk_size] = np.where(best_score >= threshold, candidate_nip[best], pd.NA)
+        prof.rows_out = int(pd.notna(best_nip).sum())
+
+    name_to_nip = dict(zip(unique_names, best_nip))
+    return names.map(name_to_nip)
 
 
 def pad_or_truncate(lst, length):
@@ -92,13 +116,13 @@ def load_and_clean_data():
     if not DATA_PATH.exists():
         raise FileNotFoundError(f"File '{DATA_PATH}' not found.")
 
-    df = pd.read_excel(DATA_PATH)
-    df.columns = df.columns.str.lower()
-
     required_columns = [
         "author full names", "author(s) id", "title", "source title",
         "conference name", "link", "doi", "year", "sumber data"
     ]
+    df = read_raw_excel(DATA_PATH, columns=required_columns)
+    df.columns = df.columns.str.lower()
+
     df = df[[col for col in required_columns if col in df.columns]]
 
     for col in ["title", "source title", "conference name"]:
@@ -127,7 +151,7 @@ def load_and_clean_data():
 
     df = df.drop_duplicates(subset=["judul", "author_name"], keep="first")
 
-    df_map = pd.read_excel(MAPPING_PATH, dtype={"nip": str, "id_scopus": str})
+    df_map = read_stage(MAPPING_PATH)
     df_map["nm_norm"] = df_map["nm"].astype(str).apply(normalize_name)
 
     id_scopus_to_nip = df_map.dropna(subset=["id_scopus", "nip"]).set_index("id_scopus")["nip"].to_dict()
@@ -140,15 +164,11 @@ def load_and_clean_data():
     candidate_map = list(df_map[["nm_norm", "nip"]].dropna().itertuples(index=False, name=None))
 
     missing_nip_mask = df["nip"].isna()
-    df.loc[missing_nip_mask, "nip"] = df.loc[missing_nip_mask, "author_name_norm"].apply(
-        lambda name: fuzzy_match_name(name, candidate_map)
-    )
+    df.loc[missing_nip_mask, "nip"] = fuzzy_match_names(df.loc[missing_nip_mask, "author_name_norm"], candidate_map)
 
     known_nip_map = df.loc[df["nip"].notna(), ["author_name_norm", "nip"]].drop_duplicates().values.tolist()
     still_missing_mask = df["nip"].isna()
-    df.loc[still_missing_mask, "nip"] = df.loc[still_missing_mask, "author_name_norm"].apply(
-        lambda name: fuzzy_match_name(name, known_nip_map)
-    )
+    df.loc[still_missing_mask, "nip"] = fuzzy_match_names(df.loc[still_missing_mask, "author_name_norm"], known_nip_map)
 
     df.drop(columns=["author_name_norm"], inplace=True, errors="ignore")
 
@@ -156,15 +176,13 @@ def load_and_clean_data():
 
     return df
 
+def main():
+    df_cleaned = load_and_clean_data()
+    output_path = write_stage(df_cleaned, OUTPUT_PATH)
+    print(f"Cleaned data saved to: {output_path}")
+
 if __name__ == "__main__":
     try:
-        df_cleaned = load_and_clean_data()
-
-        df_cleaned["nip"] = df_cleaned["nip"].apply(lambda x: str(x) if pd.notna(x) else pd.NA)
-        df_cleaned["author_id"] = df_cleaned["author_id"].apply(lambda x: str(x) if pd.notna(x) else pd.NA)
-
-        output_path = CLEANED_DATA_DIR / "scopus_cleaned.xlsx"
-        df_cleaned.to_excel(output_path, index=False)
-        print(f"Cleaned data saved to: {output_path}")
+        main()
     except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
@@ -1,15 +1,19 @@
 import os
+import numpy as np
 import pandas as pd
 import re
 from pathlib import Path
-from rapidfuzz import process
+from rapidfuzz import fuzz, process
+from raw_excel import read_raw_excel
+from stage_io import read_stage, stage_exists, write_stage
+from profiling import profiled
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 RAW_DATA_DIR = BASE_DIR / "data" / "raw"
 CLEANED_DATA_DIR = BASE_DIR / "data" / "cleaned"
 DATA_PATH = RAW_DATA_DIR / "sister.xlsx"
-MAPPING_PATH = CLEANED_DATA_DIR / "nip_scopus_id_cleaned.xlsx"
-OUTPUT_PATH = CLEANED_DATA_DIR / "sister_cleaned.xlsx"
+MAPPING_PATH = CLEANED_DATA_DIR / "nip_scopus_id_cleaned"
+OUTPUT_PATH = CLEANED_DATA_DIR / "sister_cleaned"
 
 CLEANED_DATA_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -22,11 +26,34 @@ def clean_authors(author_str):
 def clean_string_column(col):
     return col.apply(lambda x: str(x).strip().lower() if pd.notna(x) else pd.NA)
 
-def fuzzy_match_name(name, candidate_list, threshold=85):
-    if not name or pd.isna(name):
-        return None
-    match, score, _ = process.extractOne(name, candidate_list)
-    return match if score >= threshold else None
+def fuzzy_match_names(names, candidate_list, threshold=85, workers=-1, max_cells=5_000_000):
+    """Cocokkan nama unik ke daftar kandidat sekaligus; hasilnya dict nama -> kandidat terbaik."""
+    names = [name for name in pd.unique(names) if isinstance(name, str) and name]
+    if not names or not candidate_list:
+        return {}
+
+    matches = {}
+    chunk_size = max(1, max_cells // len(candidate_list))
+    with profiled("fuzzy_match_names", rows_in=len(names)) as prof:
+        for start in range(0, len(names), chunk_size):
+            chunk = names[start:start + chunk_size]
+            scores = process.cdist(chunk, candidate_list, scorer=fuzz.WRatio, dtype=np.float64, workers=workers)
+            best = scores.argmax(axis=1)
+            best_score = scores[np.arange(len(chunk)), best]
+            for name, idx, score in zip(chunk, best, best_score):
+                if score >= threshold:
+                    matches[name] = candidate_list[idx]
+        prof.rows_out = len(matches)
+    return matches
+
+def resolve_id_scopus(df, df_map):
+    """Isi id_scopus yang kosong dari nama SDM yang paling mirip dengan nama di df_map."""
+    unresolved = df["id_scopus"].isna()
+    matched_names = fuzzy_match_names(df.loc[unresolved, "nama_sdm"], df_map["nm"].tolist())
+
+    name_to_id = df_map.drop_duplicates(subset=["nm"], keep="first").set_index("nm")["id_scopus"]
+    resolved = df.loc[unresolved, "nama_sdm"].map(matched_names).map(name_to_id)
+    return df["id_scopus"].where(~unresolved, resolved)
 
 def clean_id_scopus(value):
     return re.sub(r"[^0-9]", "", str(value)) if pd.notna(value) else pd.NA
@@ -73,16 +100,16 @@ def overwrite_nama(df, df_map):
 def load_and_clean_data():
     if not DATA_PATH.exists():
         raise FileNotFoundError(f"File '{DATA_PATH}' not found.")
-    if not MAPPING_PATH.exists():
+    if not stage_exists(MAPPING_PATH):
         raise FileNotFoundError(f"Mapping file '{MAPPING_PATH}' not found.")
 
-    df = pd.read_excel(DATA_PATH)
-    df.columns = df.columns.str.lower()
-
     required_columns = [
         "nip", "nama_sdm", "judul", "jenis_publikasi", "nama_jurnal",
         "tautan", "doi", "tanggal", "sumber data"
     ]
+    df = read_raw_excel(DATA_PATH, columns=required_columns, dtype={"nip": str})
+    df.columns = df.columns.str.lower()
+
     df = df[[col for col in required_columns if col in df.columns]]
 
     df["judul"] = clean_string_column(df["judul"])
@@ -97,23 +124,13 @@ def load_and_clean_data():
 
     df = df.drop_duplicates(subset=["judul"], keep="first")
 
-    df_map = pd.read_excel(MAPPING_PATH, dtype={"nip": str, "id_scopus": str})
+    df_map = read_stage(MAPPING_PATH)
     df_map["nm"] = df_map["nm"].astype(str).str.lower().str.strip()
     df_map["nip"] = df_map["nip"].astype(str).str.strip()
 
     df = df.merge(df_map[["nip", "id_scopus", "nm"]], how="left", on="nip", suffixes=('', '_map'))
 
-    def resolve_id_scopus(row):
-        if pd.notna(row["id_scopus"]):
-            return row["id_scopus"]
-        matched_name = fuzzy_match_name(row["nama_sdm"], df_map["nm"].tolist())
-        if matched_name:
-            matched_row = df_map[df_map["nm"] == matched_name]
-            if not matched_row.empty:
-                return matched_row.iloc[0]["id_scopus"]
-        return pd.NA
-
-    df["id_scopus"] = df.apply(resolve_id_scopus, axis=1)
+    df["id_scopus"] = resolve_id_scopus(df, df_map)
     df["id_scopus"] = df["id_scopus"].apply(clean_id_scopus)
 
     df = df.drop(columns=["nm"])
@@ -125,10 +142,13 @@ def load_and_clean_data():
 
     return df
 
+def main():
+    df_cleaned = load_and_clean_data()
+    output_path = write_stage(df_cleaned, OUTPUT_PATH)
+    print(f"Cleaned data saved to: {output_path}")
+
 if __name__ == "__main__":
     try:
-        df_cleaned = load_and_clean_data()
-        df_cleaned.to_excel(OUTPUT_PATH, index=False)
-        print(f"Cleaned data saved to: {OUTPUT_PATH}")
+        main()
     except Exception as e:
         print(f"Error: {e}")
\ No newline at end of file
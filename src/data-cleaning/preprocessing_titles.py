@@ -1,26 +1,34 @@
-import pandas as pd
+import os
 import re
-import nltk
+import hashlib
+import multiprocessing
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from tqdm import tqdm
-from nltk.corpus import stopwords as nltk_stopwords
-from Sastrawi.StopWordRemover.StopWordRemoverFactory import StopWordRemoverFactory
+from stage_io import read_stage, write_stage
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
-RAW_FILE = BASE_DIR / "data" / "cleaned" / "combined_publication.xlsx"
-OUTPUT_FILE = BASE_DIR / "data" / "cleaned" / "titles_cleaned.xlsx"
+RAW_FILE = BASE_DIR / "data" / "cleaned" / "combined_publication"
+OUTPUT_FILE = BASE_DIR / "data" / "cleaned" / "titles_cleaned"
+CACHE_FILE = BASE_DIR / "data" / "cleaned" / ".titles_cache.parquet"
+STOPWORDS_DIR = Path(__file__).resolve().parent / "stopwords"
 
-nltk.download("stopwords", quiet=True)
+TITLE_WORKERS = int(os.getenv("TITLE_WORKERS", str(os.cpu_count() or 1)))
+PARALLEL_MIN_TITLES = 50_000
+TITLE_CHUNK_SIZE = 20_000
 
-stopwords_eng = set(nltk_stopwords.words("english"))
-stopwords_id = set(StopWordRemoverFactory().get_stop_words())
-stopwords = stopwords_eng.union(stopwords_id)
+def load_stopwords(names=("english", "indonesian")):
+    """Stopword NLTK (english) dan Sastrawi (indonesian) yang disimpan di repo, tanpa unduhan."""
+    words = set()
+    for name in names:
+        words.update((STOPWORDS_DIR / f"{name}.txt").read_text(encoding="utf-8").split())
+    return words
+
+stopwords = load_stopwords()
 
 non_alnum_re = re.compile(r"[^a-zA-Z0-9\s]")
 multi_space_re = re.compile(r"\s+")
 
-tqdm.pandas()
-
 def clean_text(text):
     if pd.isna(text):
         return ""
@@ -33,20 +41,80 @@ def clean_text(text):
     filtered_tokens = [t for t in tokens if t not in stopwords and len(t) > 2]
     return " ".join(filtered_tokens)
 
+def _clean_chunk(titles):
+    return [clean_text(t) for t in titles]
+
+def clean_titles(titles, workers=TITLE_WORKERS):
+    """
+    clean_text untuk satu Series: tiap judul unik dibersihkan sekali, dibagi per potongan ke
+    beberapa proses bila jumlahnya besar. Hasil per elemen identik dengan clean_text.
+    """
+    titles = pd.Series(titles)
+    valid = titles.notna()
+    unique = pd.unique(titles[valid].astype(str))
+
+    if workers > 1 and len(unique) >= PARALLEL_MIN_TITLES:
+        chunks = [unique[i:i + TITLE_CHUNK_SIZE] for i in range(0, len(unique), TITLE_CHUNK_SIZE)]
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            cleaned = [t for part in pool.map(_clean_chunk, chunks) for t in part]
+    else:
+        cleaned = _clean_chunk(unique)
+
+    mapping = dict(zip(unique, cleaned))
+    result = pd.Series("", index=titles.index, dtype=object)
+    result.loc[valid] = titles[valid].astype(str).map(mapping)
+    return result
+
+def title_hashes(titles):
+    return pd.util.hash_pandas_object(titles, index=False).to_numpy()
+
+def stopwords_digest():
+    return hashlib.sha1("\n".join(sorted(stopwords)).encode("utf-8")).hexdigest()
+
+def load_title_cache(cache_file, digest):
+    """Cache hash judul -> judul bersih; dibuang jika daftar stopword berubah."""
+    if cache_file.exists():
+        cache = pd.read_parquet(cache_file)
+        if len(cache) and (cache["stopwords"] == digest).all():
+            return pd.Series(cache["cleaned"].to_numpy(), index=cache["hash"].to_numpy())
+    return pd.Series(dtype=object, index=pd.Index([], dtype="uint64"))
+
+def clean_titles_cached(titles, cache_file=CACHE_FILE):
+    """clean_titles dengan cache per hash judul; hanya judul yang belum pernah dibersihkan yang diproses."""
+    titles = titles.astype(str)
+    digest = stopwords_digest()
+    hashes = title_hashes(titles)
+    known = load_title_cache(cache_file, digest)
+
+    missing = ~pd.Index(hashes).isin(known.index)
+    if missing.any():
+        new_titles = titles[missing].drop_duplicates()
+        new_entries = pd.Series(clean_titles(new_titles).to_numpy(), index=title_hashes(new_titles))
+        known = pd.concat([known, new_entries[~new_entries.index.duplicated()]])
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        pd.DataFrame({
+            "hash": known.index.to_numpy(dtype="uint64"),
+            "cleaned": known.to_numpy(),
+            "stopwords": digest,
+        }).to_parquet(cache_file, index=False)
+
+    print(f"Title cache: {int((~missing).sum())} cached, {int(missing.sum())} cleaned")
+    return pd.Series(known.loc[hashes].to_numpy(), index=titles.index)
+
 def preprocess_titles():
-    df = pd.read_excel(RAW_FILE, dtype=str)
+    df = read_stage(RAW_FILE)
     df.columns = df.columns.str.lower()
 
     if not {"judul", "tahun"}.issubset(df.columns):
         raise ValueError("Kolom 'judul' atau 'tahun' tidak ditemukan.")
 
     df = df[["judul", "tahun"]].dropna(subset=["judul"])
-    df["judul"] = df["judul"].astype(str).progress_apply(clean_text)
+    df["judul"] = clean_titles_cached(df["judul"].astype(str))
     df["tahun"] = df["tahun"].astype(str).str.extract(r"(\d{4})")
 
     df = df.drop_duplicates(subset=["judul"])
-    df.to_excel(OUTPUT_FILE, index=False)
-    print(f"Cleaned titles saved to: {OUTPUT_FILE}")
+    output_path = write_stage(df, OUTPUT_FILE)
+    print(f"Cleaned titles saved to: {output_path}")
 
 if __name__ == "__main__":
-    preprocess_titles()
\ No newline at end of file
+    preprocess_titles()
@@ -0,0 +1,287 @@
+import os
+import re
+import sys
+import time
+import pstats
+import cProfile
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+LOGS_DIR = BASE_DIR / "logs"
+PROFILE_DIR = LOGS_DIR / "profiles"
+MLFLOW_DIR = BASE_DIR / "mlruns"
+
+if str(BASE_DIR / "src" / "modelling") not in sys.path:
+    sys.path.insert(0, str(BASE_DIR / "src" / "modelling"))
+
+from logging_config import setup_logging
+
+# off | cprofile | sampling (pyinstrument, fallback ke cprofile jika tidak terpasang)
+PROFILE_MODE = os.getenv("PROFILE_MODE", "off").lower()
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.05"))
+PROFILE_MLFLOW = os.getenv("PROFILE_MLFLOW", "true").lower() in ["1", "true", "yes"]
+PROFILE_EXPERIMENT = "pipeline_profiling"
+MAX_PENDING_RECORDS = 10_000
+
+log = setup_logging("profiling", log_dir=LOGS_DIR)
+
+_pending = deque(maxlen=MAX_PENDING_RECORDS)
+_pending_lock = threading.Lock()
+_current_stage = ContextVar("profiling_stage", default=None)
+_collector = ContextVar("profiling_collector", default=None)
+
+@dataclass
+class ProfileRecord:
+    name: str
+    stage: str = None
+    status: str = "ok"
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    peak_rss_bytes: int = None
+    rows_in: int = None
+    rows_out: int = None
+    started_at: float = field(default_factory=time.time)
+
+    def to_dict(self):
+        return asdict(self)
+
+def current_rss():
+    """Resident memory proses saat ini dalam byte (None jika platform tidak menyediakan)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        pass
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        return None
+
+def _cpu_seconds():
+    """CPU user + system proses ini dan child process yang sudah selesai (mis. pool spawn)."""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+class _PeakMemorySampler(threading.Thread):
+    """Sampling RSS berkala di thread latar; puncak per blok, bukan puncak seumur proses."""
+
+    def __init__(self, interval=PROFILE_SAMPLE_INTERVAL):
+        super().__init__(daemon=True, name="profiling-rss")
+        self.interval = interval
+        self.peak = current_rss()
+        self._done = threading.Event()
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is not None and (self.peak is None or rss > self.peak):
+            self.peak = rss
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            self._sample()
+
+    def finish(self):
+        self._done.set()
+        self.join()
+        self._sample()
+        return self.peak
+
+def safe_name(name):
+    return re.sub(r"[^a-zA-Z0-9_]", "_", str(name))
+
+def _start_profiler(mode):
+    if mode == "sampling":
+        try:
+            from pyinstrument import Profiler
+            profiler = Profiler(interval=0.001)
+            profiler.start()
+            return "sampling", profiler
+        except ImportError:
+            log.warning("[PROFILE] pyinstrument not installed, falling back to cProfile")
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+    except ValueError as e:
+        # Hanya satu profiler aktif per thread; stage di dalam stage tidak diprofil dua kali.
+        log.warning(f"[PROFILE] cProfile unavailable: {e}")
+        return None, None
+    return "cprofile", profiler
+
+def _dump_profile(kind, profiler, name):
+    """Simpan hasil profiler ke logs/profiles/<nama>-<waktu>.*; kembalikan path ringkasan teks."""
+    PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+    base = PROFILE_DIR / f"{safe_name(name)}-{datetime.now():%Y%m%d-%H%M%S}"
+    if kind == "sampling":
+        profiler.stop()
+        base.with_suffix(".html").write_text(profiler.output_html())
+        summary = base.with_suffix(".txt")
+        summary.write_text(profiler.output_text(unicode=False, color=False))
+        return summary
+
+    profiler.disable()
+    profiler.dump_stats(str(base.with_suffix(".prof")))
+    summary = base.with_suffix(".txt")
+    with open(summary, "w") as f:
+        pstats.Stats(profiler, stream=f).sort_stats("cumulative").print_stats(40)
+    return summary
+
+def _log_to_active_run(record):
+    """Catat metrik ke run MLflow yang sedang aktif (mis. training BERTopic); tanpa run, tidak ada apa-apa."""
+    mlflow = sys.modules.get("mlflow")
+    if not PROFILE_MLFLOW or mlflow is None or mlflow.active_run() is None:
+        return
+    mlflow.log_metrics(record_metrics(record, prefix=f"profile_{safe_name(record.name)}"))
+
+def record_metrics(record, prefix):
+    metrics = {
+        f"{prefix}_wall_seconds": float(record.wall_seconds),
+        f"{prefix}_cpu_seconds": float(record.cpu_seconds),
+    }
+    if record.peak_rss_bytes is not None:
+        metrics[f"{prefix}_peak_rss_mb"] = record.peak_rss_bytes / (1024 * 1024)
+    if record.rows_in is not None:
+        metrics[f"{prefix}_rows_in"] = float(record.rows_in)
+    if record.rows_out is not None:
+        metrics[f"{prefix}_rows_out"] = float(record.rows_out)
+    return metrics
+
+def _finish(record):
+    with _pending_lock:
+        _pending.append(record)
+    collected = _collector.get()
+    if collected is not None:
+        collected.append(record)
+
+    rss = f"{record.peak_rss_bytes / (1024 * 1024):.0f} MB" if record.peak_rss_bytes is not None else "n/a"
+    rows = f", rows {record.rows_in} -> {record.rows_out}" if record.rows_in is not None or record.rows_out is not None else ""
+    log.info(
+        f"[PROFILE] {record.stage or '-'}/{record.name} {record.status}: wall {record.wall_seconds:.2f}s, "
+        f"cpu {record.cpu_seconds:.2f}s, peak RSS {rss}{rows}"
+    )
+    try:
+        _log_to_active_run(record)
+    except Exception as e:
+        log.warning(f"[PROFILE] Failed to log {record.name} to MLflow: {e}")
+
+@contextmanager
+def profiled(name, rows_in=None, stage=None, dump_profile=False):
+    """
+    Ukur wall time, CPU time, puncak RSS dan jumlah baris sebuah blok. Isi `rows_out` pada record
+    yang di-yield. Blok di dalam stage mewarisi nama stage-nya; dengan dump_profile=True dan
+    PROFILE_MODE aktif, output cProfile/pyinstrument blok ini disimpan ke logs/profiles.
+    """
+    record = ProfileRecord(name=name, stage=stage or _current_stage.get(), rows_in=rows_in)
+    token = _current_stage.set(record.stage) if stage else None
+    sampler = _PeakMemorySampler()
+    sampler.start()
+    kind, profiler = _start_profiler(PROFILE_MODE) if dump_profile and PROFILE_MODE != "off" else (None, None)
+
+    wall_start = time.perf_counter()
+    cpu_start = _cpu_seconds()
+    try:
+        yield record
+    except BaseException:
+        record.status = "error"
+        raise
+    finally:
+        record.wall_seconds = time.perf_counter() - wall_start
+        record.cpu_seconds = _cpu_seconds() - cpu_start
+        record.peak_rss_bytes = sampler.finish()
+        if token is not None:
+            _current_stage.reset(token)
+        if profiler is not None:
+            summary = _dump_profile(kind, profiler, record.stage or name)
+            log.info(f"[PROFILE] {kind} output for {name}: {summary}")
+        _finish(record)
+
+def _len_or_none(value):
+    if isinstance(value, tuple):
+        value = value[0] if value else None
+    try:
+        return len(value)
+    except TypeError:
+        return None
+
+@contextmanager
+def profiled_methods(obj, methods):
+    """
+    Bungkus sementara method sebuah objek dengan profiled (mis. tahap UMAP/HDBSCAN di dalam BERTopic),
+    dipulihkan setelah blok agar objek tetap bisa di-pickle. Method yang tidak ada dilewati.
+    """
+    patched = {}
+    for attr, name in methods.items():
+        original = getattr(obj, attr, None)
+        if original is None:
+            log.warning(f"[PROFILE] {type(obj).__name__}.{attr} not found, not profiled")
+            continue
+
+        def wrapper(*args, _original=original, _name=name, **kwargs):
+            with profiled(_name, rows_in=_len_or_none(args[0]) if args else None) as record:
+                result = _original(*args, **kwargs)
+                record.rows_out = _len_or_none(result)
+            return result
+
+        patched[attr] = obj.__dict__.get(attr)
+        setattr(obj, attr, wrapper)
+    try:
+        yield obj
+    finally:
+        for attr, own_value in patched.items():
+            if own_value is None:
+                delattr(obj, attr)
+            else:
+                setattr(obj, attr, own_value)
+
+@contextmanager
+def collect_records():
+    """Kumpulkan record yang selesai di dalam blok ini (mis. satu stage di worker) ke sebuah list."""
+    records = []
+    token = _collector.set(records)
+    try:
+        yield records
+    finally:
+        _collector.reset(token)
+
+def add_records(records):
+    """Masukkan record dari proses lain (worker pipeline) ke antrean proses ini."""
+    with _pending_lock:
+        _pending.extend(r if isinstance(r, ProfileRecord) else ProfileRecord(**r) for r in records)
+
+def drain_records():
+    """Ambil dan kosongkan record yang belum dibaca (dipakai endpoint /metrics)."""
+    with _pending_lock:
+        records = list(_pending)
+        _pending.clear()
+    return records
+
+def log_records_to_mlflow(records, run_name="pipeline"):
+    """Satu run MLflow per eksekusi pipeline berisi metrik setiap stage dan fungsi yang diprofil."""
+    if not PROFILE_MLFLOW or not records:
+        return
+    try:
+        import mlflow
+    except ImportError:
+        return
+
+    try:
+        mlflow.set_tracking_uri(f"file:///{MLFLOW_DIR.resolve().as_posix()}")
+        experiment = mlflow.get_experiment_by_name(PROFILE_EXPERIMENT)
+        experiment_id = experiment.experiment_id if experiment else mlflow.create_experiment(PROFILE_EXPERIMENT)
+        with mlflow.start_run(run_name=run_name, experiment_id=experiment_id, nested=mlflow.active_run() is not None):
+            metrics = {}
+            for record in records:
+                prefix = safe_name(record.name) if record.name == record.stage else (
+                    f"{safe_name(record.stage or 'app')}.{safe_name(record.name)}"
+                )
+                metrics.update(record_metrics(record, prefix=prefix))
+            mlflow.log_metrics(metrics)
+            mlflow.log_param("stages", ",".join(sorted({r.stage for r in records if r.stage})))
+    except Exception as e:
+        log.warning(f"[PROFILE] Failed to log pipeline profile to MLflow: {e}")
@@ -0,0 +1,219 @@
+import os
+import json
+import hashlib
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from pandas.io.parsers import TextParser
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+RAW_CACHE_DIR = BASE_DIR / "data" / "cleaned" / ".raw_cache"
+RAW_EXCEL_ENGINE = os.getenv("RAW_EXCEL_ENGINE", "auto").lower()
+RAW_CHUNK_SIZE = int(os.getenv("RAW_CHUNK_SIZE", "20000"))
+# Ikut kunci cache: perubahan parser membuat salinan lama tidak terpakai.
+PARSER_DIGEST = hashlib.sha1(Path(__file__).read_bytes()).hexdigest()[:12]
+
+def calamine_available():
+    try:
+        import python_calamine  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def _convert_cell(cell):
+    """Konversi sel openpyxl sama seperti pd.read_excel (kosong -> "", angka bulat -> int)."""
+    from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        val = int(cell.value)
+        return val if val == cell.value else float(cell.value)
+    return cell.value
+
+def _select_indices(header, columns):
+    """Posisi kolom yang dibutuhkan; nama dicocokkan tanpa membedakan huruf besar/kecil."""
+    if columns is None:
+        return list(range(len(header)))
+    wanted = {str(col).strip().lower() for col in columns}
+    return [i for i, name in enumerate(header) if str(name).strip().lower() in wanted]
+
+def iter_excel_rows(path, columns=None, chunk_size=RAW_CHUNK_SIZE):
+    """
+    Baca sheet pertama secara streaming (openpyxl read-only) dan hasilkan (header, potongan baris)
+    yang hanya berisi kolom yang dibutuhkan. Baris kosong di akhir sheet diabaikan seperti read_excel.
+    Sheet berikutnya dengan header yang sama dianggap lanjutan data (export di atas batas baris Excel).
+    """
+    from openpyxl import load_workbook
+
+    book = load_workbook(path, read_only=True, data_only=True, keep_links=False)
+    try:
+        header_row, indices, header = None, [], []
+        chunk = []
+        yielded = False
+        for sheet in book.worksheets:
+            sheet.reset_dimensions()
+            rows = sheet.rows
+            sheet_header = [_convert_cell(cell) for cell in next(rows, [])]
+            if header_row is None:
+                header_row = sheet_header
+                indices = _select_indices(header_row, columns)
+                header = [header_row[i] for i in indices]
+            elif sheet_header != header_row:
+                continue
+
+            pending_blank = []
+            for row in rows:
+                values = [_convert_cell(cell) for cell in row]
+                selected = [values[i] if i < len(values) else "" for i in indices]
+                if all(v == "" for v in values):
+                    pending_blank.append(selected)
+                    continue
+                chunk.extend(pending_blank)
+                pending_blank = []
+                chunk.append(selected)
+                if len(chunk) >= chunk_size:
+                    yield header, chunk
+                    yielded = True
+                    chunk = []
+        if chunk or not yielded:
+            yield header, chunk
+    finally:
+        book.close()
+
+def _match_dtype(header, dtype):
+    """Petakan kunci dtype ke nama kolom di file tanpa membedakan huruf besar/kecil."""
+    if not dtype:
+        return dtype
+    wanted = {str(key).strip().lower(): value for key, value in dtype.items()}
+    return {name: wanted[str(name).strip().lower()] for name in header if str(name).strip().lower() in wanted}
+
+def _parse_rows(header, rows, dtype=None):
+    if not header:
+        return pd.DataFrame()
+    return TextParser([header] + rows, header=0, dtype=_match_dtype(header, dtype), skip_blank_lines=False).read()
+
+def iter_raw_excel(path, columns=None, dtype=None, chunk_size=RAW_CHUNK_SIZE):
+    """Hasilkan DataFrame per potongan; tipe kolom diinferensi per potongan."""
+    for header, rows in iter_excel_rows(path, columns=columns, chunk_size=chunk_size):
+        yield _parse_rows(header, rows, dtype=dtype)
+
+def _read_with_calamine(path, columns=None, dtype=None):
+    wanted = None if columns is None else {str(col).strip().lower() for col in columns}
+    usecols = None if wanted is None else (lambda name: str(name).strip().lower() in wanted)
+    with pd.ExcelFile(path, engine="calamine") as book:
+        names = book.sheet_names
+    if dtype:
+        dtype = _match_dtype(pd.read_excel(path, engine="calamine", nrows=0).columns, dtype)
+    if len(names) == 1:
+        return pd.read_excel(path, engine="calamine", usecols=usecols, dtype=dtype)
+
+    # Sheet lanjutan: header sama persis dengan sheet pertama.
+    headers = pd.read_excel(path, engine="calamine", sheet_name=names, nrows=0)
+    sheets = [name for name in names if list(headers[name].columns) == list(headers[names[0]].columns)]
+    frames = pd.read_excel(path, engine="calamine", sheet_name=sheets, usecols=usecols, dtype=dtype)
+    return pd.concat([frames[name] for name in sheets], ignore_index=True)
+
+def _integral_to_int(series):
+    values = series.astype(object)
+    mask = series.notna() & (series % 1 == 0)
+    values[mask] = series[mask].astype("int64").astype(object)
+    return values
+
+def _concat_chunks(frames):
+    """
+    Gabungkan potongan yang sudah bertipe. Kolom yang menjadi object di potongan lain tetapi
+    float di satu potongan (angka bulat + sel kosong) dikembalikan ke int, sama seperti parse
+    seluruh file sekaligus.
+    """
+    if len(frames) == 1:
+        return frames[0]
+    for col in frames[0].columns:
+        kinds = {frame[col].dtype.kind for frame in frames}
+        if "O" in kinds and "f" in kinds:
+            for frame in frames:
+                if frame[col].dtype.kind == "f":
+                    frame[col] = _integral_to_int(frame[col])
+    return pd.concat(frames, ignore_index=True)
+
+def _read_streaming(path, columns=None, dtype=None, chunk_size=RAW_CHUNK_SIZE):
+    # Tiap potongan langsung di-parse menjadi kolom bertipe sehingga daftar baris Python hanya
+    # sebesar satu potongan. Kolom identitas (NIP, ID Scopus) sebaiknya diberi dtype=str agar
+    # digit panjang tidak lewat float.
+    frames = [_parse_rows(header, chunk, dtype=dtype)
+              for header, chunk in iter_excel_rows(path, columns=columns, chunk_size=chunk_size)]
+    return _concat_chunks(frames)
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def _cache_base(path, columns, dtype):
+    spec = json.dumps(
+        {"columns": sorted(str(c).lower() for c in columns) if columns is not None else None,
+         "dtype": {k: str(v) for k, v in (dtype or {}).items()},
+         "parser": PARSER_DIGEST},
+        sort_keys=True
+    )
+    key = hashlib.sha1(spec.encode("utf-8")).hexdigest()[:12]
+    return RAW_CACHE_DIR / f"{Path(path).stem}-{key}"
+
+def _read_cache(base, meta):
+    if meta.get("format") == "pickle":
+        return pd.read_pickle(base.with_suffix(".pkl"))
+    return pd.read_parquet(base.with_suffix(".parquet"))
+
+def _write_cache(base, df):
+    """Parquet bila tipe kolom seragam; kolom campuran (mis. NIP angka dan teks) disimpan sebagai pickle."""
+    RAW_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        df.to_parquet(base.with_suffix(".parquet"), index=False)
+        return "parquet"
+    except (ValueError, TypeError):
+        base.with_suffix(".parquet").unlink(missing_ok=True)
+        df.to_pickle(base.with_suffix(".pkl"))
+        return "pickle"
+
+def read_raw_excel(path, columns=None, dtype=None, engine=None, use_cache=True):
+    """
+    Baca export mentah (SISTER/Scopus) hanya untuk kolom yang dibutuhkan. Salinannya disimpan
+    di RAW_CACHE_DIR dan dipakai ulang selama file sumber tidak berubah: mtime+ukuran sama
+    berarti cocok, jika berbeda hash isi file yang menentukan.
+    """
+    path = Path(path)
+    base = _cache_base(path, columns, dtype)
+    meta_path = base.with_suffix(".json")
+    stat = path.stat()
+
+    meta = None
+    if use_cache and meta_path.exists():
+        meta = json.loads(meta_path.read_text())
+        if meta["mtime_ns"] == stat.st_mtime_ns and meta["size"] == stat.st_size:
+            return _read_cache(base, meta)
+
+    sha256 = _file_sha256(path)
+    if meta is not None and meta["sha256"] == sha256:
+        meta.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+        meta_path.write_text(json.dumps(meta))
+        return _read_cache(base, meta)
+
+    engine = engine or RAW_EXCEL_ENGINE
+    if engine == "auto":
+        engine = "calamine" if calamine_available() else "openpyxl"
+    if engine == "calamine":
+        df = _read_with_calamine(path, columns=columns, dtype=dtype)
+    else:
+        df = _read_streaming(path, columns=columns, dtype=dtype)
+
+    if use_cache:
+        cache_format = _write_cache(base, df)
+        meta_path.write_text(json.dumps({
+            "source": str(path), "format": cache_format,
+            "mtime_ns": stat.st_mtime_ns, "size": stat.st_size, "sha256": sha256
+        }))
+    return df
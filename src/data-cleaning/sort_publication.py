@@ -1,34 +1,48 @@
-import pandas as pd
 from pathlib import Path
+from stage_io import read_stage, stage_exists, stage_path, write_stage
+from preprocessing_titles import clean_titles
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 CLEANED_DATA_DIR = BASE_DIR / "data" / "cleaned"
 CLEANED_TOPIC_DIR = CLEANED_DATA_DIR / "output"
 
-COMBINED_PATH = CLEANED_DATA_DIR / "combined_publication.xlsx"
-TOPIC_PATH = CLEANED_TOPIC_DIR / "topic_assignments.xlsx"
-OUTPUT_EMPTY_NIP = CLEANED_DATA_DIR / "empty_nip.xlsx"
-OUTPUT_NIP = CLEANED_DATA_DIR / "final_publication.xlsx"
-OUTPUT_JOURNALS = CLEANED_DATA_DIR / "journals_list.xlsx"
-OUTPUT_TOPIC = CLEANED_DATA_DIR / "topics_list.xlsx"
+COMBINED_PATH = CLEANED_DATA_DIR / "combined_publication"
+TOPIC_PATH = CLEANED_TOPIC_DIR / "topic_assignments"
+OUTPUT_EMPTY_NIP = CLEANED_DATA_DIR / "empty_nip"
+OUTPUT_NIP = CLEANED_DATA_DIR / "final_publication"
+OUTPUT_JOURNALS = CLEANED_DATA_DIR / "journals_list"
+OUTPUT_TOPIC = CLEANED_DATA_DIR / "topics_list"
+
+def attach_topics(df, df_topic):
+    """Tambahkan topic/domain dari topic_assignments, dicocokkan lewat judul yang sudah dibersihkan."""
+    df_topic = df_topic.drop_duplicates(subset=["judul"]).set_index("judul")
+    cleaned = clean_titles(df["judul"])
+    df = df.copy()
+    df["topic"] = cleaned.map(df_topic["topic"])
+    df["domain"] = cleaned.map(df_topic["domain"])
+    return df
 
 def sort_nip_data():
     CLEANED_DATA_DIR.mkdir(parents=True, exist_ok=True)
     CLEANED_TOPIC_DIR.mkdir(parents=True, exist_ok=True)
 
-    if not COMBINED_PATH.exists():
-        raise FileNotFoundError(f"File '{COMBINED_PATH}' not found.")
+    if not stage_exists(COMBINED_PATH):
+        raise FileNotFoundError(f"File '{stage_path(COMBINED_PATH)}' not found.")
 
-    df = pd.read_excel(COMBINED_PATH, dtype=str)
+    df = read_stage(COMBINED_PATH)
 
     if "nip" not in df.columns:
         raise ValueError("'nip' column not found.")
 
+    df_topic = read_stage(TOPIC_PATH) if stage_exists(TOPIC_PATH) else None
+    if df_topic is not None and {"judul", "topic", "domain"}.issubset(df_topic.columns):
+        df = attach_topics(df, df_topic)
+
     df_nip_kosong = df[df["nip"].isna() | (df["nip"].str.strip() == "")]
     df_nip_ada = df[df["nip"].notna() & (df["nip"].str.strip() != "")]
 
-    df_nip_kosong.to_excel(OUTPUT_EMPTY_NIP, index=False)
-    df_nip_ada.to_excel(OUTPUT_NIP, index=False)
+    write_stage(df_nip_kosong, OUTPUT_EMPTY_NIP)
+    write_stage(df_nip_ada, OUTPUT_NIP)
 
     if "nama_jurnal" in df.columns:
         journals_unique = (
@@ -39,12 +53,11 @@ def sort_nip_data():
             .sort_values()
             .reset_index(drop=True)
         )
-        journals_unique.to_frame(name="nama_jurnal").to_excel(OUTPUT_JOURNALS, index=False)
+        write_stage(journals_unique.to_frame(name="nama_jurnal"), OUTPUT_JOURNALS)
     else:
         print("Kolom 'nama_jurnal' tidak ditemukan, lewati pembuatan daftar jurnal.")
 
-    if TOPIC_PATH.exists():
-        df_topic = pd.read_excel(TOPIC_PATH, dtype=str)
+    if df_topic is not None:
         if "topic_name" in df_topic.columns:
             topics_unique = (
                 df_topic["topic_name"]
@@ -54,16 +67,16 @@ def sort_nip_data():
                 .sort_values()
                 .reset_index(drop=True)
             )
-            topics_unique.to_frame(name="topic_name").to_excel(OUTPUT_TOPIC, index=False)
+            write_stage(topics_unique.to_frame(name="topic_name"), OUTPUT_TOPIC)
         else:
-            print("Kolom 'topic_name' tidak ditemukan di topics_assignments.xlsx.")
+            print("Kolom 'topic_name' tidak ditemukan di topic_assignments.")
     else:
-        print(f"File '{TOPIC_PATH}' tidak ditemukan, lewati pembuatan daftar topik.")
+        print(f"File '{stage_path(TOPIC_PATH)}' tidak ditemukan, lewati pembuatan daftar topik.")
 
-    print(f"Empty NIP saved to: {OUTPUT_EMPTY_NIP}")
-    print(f"Non-empty NIP saved to: {OUTPUT_NIP}")
-    print(f"Journals list saved to: {OUTPUT_JOURNALS}")
-    print(f"Topics list saved to: {OUTPUT_TOPIC}")
+    print(f"Empty NIP saved to: {stage_path(OUTPUT_EMPTY_NIP)}")
+    print(f"Non-empty NIP saved to: {stage_path(OUTPUT_NIP)}")
+    print(f"Journals list saved to: {stage_path(OUTPUT_JOURNALS)}")
+    print(f"Topics list saved to: {stage_path(OUTPUT_TOPIC)}")
 
 if __name__ == "__main__":
     try:
@@ -0,0 +1,193 @@
+import os
+import logging
+import pandas as pd
+from pathlib import Path
+
+STAGE_FORMAT = os.getenv("STAGE_FORMAT", "parquet").lower()
+STAGE_EXPORT_EXCEL = os.getenv("STAGE_EXPORT_EXCEL", "false").lower() in ["1", "true", "yes"]
+
+PUBLICATION_COLUMNS = [
+    "nip", "id_scopus", "nama", "judul", "jenis_publikasi",
+    "nama_jurnal", "tautan", "doi", "tahun", "sumber_data"
+]
+
+# Tipe eksplisit per stage; kolom yang tidak disebut mengikuti tipe bawaan DataFrame.
+STAGE_SCHEMAS = {
+    "nip_scopus_id_cleaned": {"nip": "string", "id_scopus": "string", "nm": "string"},
+    "sister_cleaned": {
+        "nip": "string", "id_scopus": "string", "nama_sdm": "string", "judul": "string",
+        "jenis_publikasi": "string", "nama_jurnal": "string", "tautan": "string",
+        "doi": "string", "tahun": "string", "sumber data": "string"
+    },
+    "scopus_cleaned": {
+        "nip": "string", "author_id": "string", "author_name": "string", "judul": "string",
+        "jenis_publikasi": "string", "nama_jurnal": "string", "tautan": "string",
+        "doi": "string", "tahun": "string", "sumber_data": "string"
+    },
+    "combined_publication": {col: "string" for col in PUBLICATION_COLUMNS},
+    "final_publication": {
+        **{col: "string" for col in PUBLICATION_COLUMNS}, "topic": "int", "domain": "string"
+    },
+    "empty_nip": {col: "string" for col in PUBLICATION_COLUMNS},
+    "journals_list": {"nama_jurnal": "string"},
+    "topics_list": {"topic_name": "string"},
+    "titles_cleaned": {"judul": "string", "tahun": "string"},
+    "topic_assignments": {
+        "judul": "string", "tahun": "int", "topic": "int",
+        "probability": "float", "topic_name": "string", "domain": "string"
+    },
+    "topic_trends": {"topic": "int", "topic_words": "string", "count": "int"},
+    "topic_domain_trends": {"domain": "string", "domain_words": "string", "count": "int"},
+    "trend_topic_year": {"topic": "int", "topic_name": "string", "tahun": "int", "count": "int"},
+    "trend_domain_year": {"domain": "string", "tahun": "int", "count": "int"},
+    "trend_nip_topics": {
+        "nip": "string", "rank": "int", "topic": "int", "topic_name": "string", "count": "int"
+    },
+    "topic_domain_mapping": {
+        "topic": "int", "topic_words": "string", "best_domain": "string", "similarity": "float"
+    },
+}
+
+log = logging.getLogger(__name__)
+
+class StaleStageError(Exception):
+    pass
+
+def _to_string(col):
+    return col.map(lambda x: str(x) if pd.notna(x) else None).astype(object)
+
+def apply_schema(df, name):
+    """Samakan tipe kolom dengan skema stage agar nip/id_scopus tidak berubah jadi angka."""
+    df = df.copy()
+    schema = STAGE_SCHEMAS.get(name, {})
+    for col in df.columns:
+        kind = schema.get(col)
+        if kind == "string" or (kind is None and df[col].dtype == object):
+            df[col] = _to_string(df[col])
+        elif kind == "int":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("Int64")
+        elif kind == "float":
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype("float64")
+    return df
+
+def _read_parquet(path, columns=None):
+    return pd.read_parquet(path, columns=columns)
+
+def _write_parquet(df, path):
+    df.to_parquet(path, index=False)
+
+def _read_feather(path, columns=None):
+    return pd.read_feather(path, columns=columns)
+
+def _write_feather(df, path):
+    df.reset_index(drop=True).to_feather(path)
+
+def _read_excel(path, columns=None):
+    string_cols = [c for c, kind in STAGE_SCHEMAS.get(path.stem, {}).items() if kind == "string"]
+    return pd.read_excel(path, usecols=columns, dtype={c: str for c in string_cols})
+
+def _write_excel(df, path):
+    df.to_excel(path, index=False)
+
+FORMATS = {
+    "parquet": (".parquet", _read_parquet, _write_parquet),
+    "feather": (".feather", _read_feather, _write_feather),
+    "xlsx": (".xlsx", _read_excel, _write_excel),
+}
+
+if STAGE_FORMAT not in FORMATS:
+    raise ValueError(f"STAGE_FORMAT '{STAGE_FORMAT}' tidak dikenal, pilih salah satu: {', '.join(FORMATS)}")
+
+def stage_path(path, fmt=None):
+    suffix, _, _ = FORMATS[fmt or STAGE_FORMAT]
+    return Path(path).with_suffix(suffix)
+
+def find_stage(path):
+    """
+    Cari file stage dalam format aktif. File format lain hanya dipakai bila format aktif belum ada
+    (mis. .xlsx dari run lama) dan selalu dengan peringatan; bila file format lain lebih baru dari
+    file format aktif, file aktif dianggap basi dan dibatalkan daripada diam-diam membaca data lama.
+    """
+    found = {}
+    for fmt in FORMATS:
+        candidate = stage_path(path, fmt)
+        if candidate.exists():
+            found[fmt] = (candidate, candidate.stat().st_mtime)
+    if not found:
+        return None, None
+
+    if STAGE_FORMAT in found:
+        active, active_mtime = found[STAGE_FORMAT]
+        newer = [str(candidate) for fmt, (candidate, mtime) in found.items() if mtime > active_mtime]
+        if newer:
+            raise StaleStageError(
+                f"Stage file '{active}' is older than {', '.join(newer)}; "
+                f"set STAGE_FORMAT to the format that was written last or remove the stale file."
+            )
+        return active, STAGE_FORMAT
+
+    fmt = max(found, key=lambda f: found[f][1])
+    log.warning(f"Stage file '{stage_path(path)}' not found, falling back to '{found[fmt][0]}'")
+    return found[fmt][0], fmt
+
+def stage_exists(path):
+    return find_stage(path)[0] is not None
+
+def read_stage(path, columns=None):
+    found, fmt = find_stage(path)
+    if found is None:
+        raise FileNotFoundError(f"Stage file '{stage_path(path)}' not found.")
+    _, reader, _ = FORMATS[fmt]
+    df = reader(found, columns=columns)
+    return apply_schema(df, Path(path).stem)
+
+def stage_rows(path):
+    """Jumlah baris stage dari metadata file tanpa membaca datanya; None untuk format lain."""
+    found, fmt = find_stage(path)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        return pq.ParquetFile(found).metadata.num_rows
+    if fmt == "feather":
+        import pyarrow as pa
+        with pa.memory_map(str(found)) as source:
+            reader = pa.ipc.open_file(source)
+            return sum(reader.get_batch(i).num_rows for i in range(reader.num_record_batches))
+    return None
+
+def iter_stage(path, chunk_size=50_000, columns=None):
+    """Baca stage per potongan baris; parquet dibaca per batch sehingga memori tetap terbatas."""
+    found, fmt = find_stage(path)
+    if found is None:
+        raise FileNotFoundError(f"Stage file '{stage_path(path)}' not found.")
+
+    name = Path(path).stem
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+        for batch in pq.ParquetFile(found).iter_batches(batch_size=chunk_size, columns=columns):
+            yield apply_schema(batch.to_pandas(), name)
+        return
+
+    df = read_stage(path, columns=columns)
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+def write_stage(df, path, export_excel=None):
+    """Tulis output stage dalam format aktif; salinan .xlsx opsional untuk dibuka manual."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    df = apply_schema(df, path.stem)
+
+    out_path = stage_path(path)
+    _, _, writer = FORMATS[STAGE_FORMAT]
+    writer(df, out_path)
+
+    if export_excel is None:
+        export_excel = STAGE_EXPORT_EXCEL
+    if export_excel and STAGE_FORMAT != "xlsx":
+        excel_path = stage_path(path, "xlsx")
+        _write_excel(df, excel_path)
+        # Salinan .xlsx diberi mtime yang sama agar find_stage tidak menganggap file utama basi.
+        stat = out_path.stat()
+        os.utime(excel_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+    return out_path
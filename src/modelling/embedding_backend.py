@@ -0,0 +1,121 @@
+import os
+import time
+import logging
+import numpy as np
+
+try:
+    from bertopic.backend import BaseEmbedder
+except ImportError:
+    BaseEmbedder = object
+
+# torch: fp32 SentenceTransformer | torch-int8: dynamic int8 quantization pada layer Linear
+# onnx / onnx-int8: onnxruntime lewat backend ONNX sentence-transformers (>= 3.2, optimum[onnxruntime])
+EMBED_BACKEND = os.getenv("EMBED_BACKEND", "torch").lower()
+EMBED_WORKERS = int(os.getenv("EMBED_WORKERS", "1"))
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "64"))
+EMBED_CHUNK_SIZE = int(os.getenv("EMBED_CHUNK_SIZE", "1000"))
+EMBED_ONNX_FILE = os.getenv("EMBED_ONNX_FILE", "onnx/model_quint8_avx2.onnx")
+# Di bawah jumlah ini biaya start pool proses lebih besar dari keuntungannya.
+MULTIPROCESS_MIN_TEXTS = 2000
+
+BACKENDS = ["torch", "torch-int8", "onnx", "onnx-int8"]
+
+log = logging.getLogger(__name__)
+
+def load_sentence_transformer(model_name, backend):
+    from sentence_transformers import SentenceTransformer
+
+    if backend == "torch":
+        return SentenceTransformer(model_name)
+    if backend == "torch-int8":
+        import torch
+        model = SentenceTransformer(model_name, device="cpu")
+        return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+    model_kwargs = {"file_name": EMBED_ONNX_FILE} if backend == "onnx-int8" else None
+    try:
+        return SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+    except TypeError as e:
+        raise RuntimeError(
+            f"Backend '{backend}' membutuhkan sentence-transformers >= 3.2 dan optimum[onnxruntime]."
+        ) from e
+
+class EmbeddingBackend(BaseEmbedder):
+    """
+    Embedder untuk BERTopic dan cache embedding dengan backend yang bisa dipilih lewat EMBED_BACKEND.
+    Dengan workers > 1, batch besar di-encode oleh pool proses (satu proses per porsi core);
+    model dimuat saat pertama dipakai dan tidak ikut di-pickle bersama model BERTopic.
+    """
+
+    def __init__(self, model_name, backend=EMBED_BACKEND, workers=EMBED_WORKERS, batch_size=EMBED_BATCH_SIZE):
+        if backend not in BACKENDS:
+            raise ValueError(f"EMBED_BACKEND '{backend}' tidak dikenal, pilih salah satu: {', '.join(BACKENDS)}")
+        if BaseEmbedder is not object:
+            super().__init__()
+        self.model_name = model_name
+        self.backend = backend
+        self.workers = max(1, workers)
+        self.batch_size = batch_size
+        self._model = None
+        self._pool = None
+
+        if self.workers > 1 and backend.startswith("onnx"):
+            # Sesi onnxruntime tidak bisa dikirim ke proses lain; ONNX sudah memakai semua core per batch.
+            log.warning(f"EMBED_WORKERS ignored for backend '{backend}'")
+            self.workers = 1
+
+    @property
+    def cache_name(self):
+        """Nama folder cache embedding; vektor backend terkuantisasi tidak dicampur dengan fp32."""
+        return self.model_name if self.backend == "torch" else f"{self.model_name}@{self.backend}"
+
+    @property
+    def model(self):
+        if self._model is None:
+            start = time.perf_counter()
+            self._model = load_sentence_transformer(self.model_name, self.backend)
+            log.info(f"Loaded {self.model_name} ({self.backend}) in {time.perf_counter() - start:.2f}s")
+        return self._model
+
+    def _get_pool(self):
+        if self._pool is None:
+            # Setiap proses pool mendapat porsi thread sendiri agar core tidak diperebutkan.
+            threads = str(max(1, (os.cpu_count() or 1) // self.workers))
+            previous = os.environ.get("OMP_NUM_THREADS")
+            os.environ["OMP_NUM_THREADS"] = threads
+            try:
+                self._pool = self.model.start_multi_process_pool(target_devices=["cpu"] * self.workers)
+            finally:
+                if previous is None:
+                    os.environ.pop("OMP_NUM_THREADS", None)
+                else:
+                    os.environ["OMP_NUM_THREADS"] = previous
+            log.info(f"Started embedding pool: {self.workers} processes x {threads} threads")
+        return self._pool
+
+    def encode(self, sentences, batch_size=None, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        sentences = list(sentences)
+        batch_size = batch_size or self.batch_size
+
+        if self.workers > 1 and len(sentences) >= MULTIPROCESS_MIN_TEXTS:
+            embeddings = self.model.encode_multi_process(
+                sentences, self._get_pool(), batch_size=batch_size, chunk_size=EMBED_CHUNK_SIZE
+            )
+        else:
+            embeddings = self.model.encode(
+                sentences, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=show_progress_bar
+            )
+        return np.asarray(embeddings, dtype=np.float32)
+
+    def embed(self, documents, verbose=False):
+        return self.encode(documents, show_progress_bar=verbose)
+
+    def close(self):
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def __getstate__(self):
+        return {**self.__dict__, "_model": None, "_pool": None}
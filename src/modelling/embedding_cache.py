@@ -0,0 +1,117 @@
+import hashlib
+import json
+import re
+import time
+import numpy as np
+from pathlib import Path
+
+VECTORS_FILE = "embeddings.f32"
+KEYS_FILE = "keys.txt"
+META_FILE = "meta.json"
+
+def text_hash(text: str) -> str:
+    return hashlib.sha1(str(text).encode("utf-8")).hexdigest()
+
+def model_cache_dir(cache_root: Path, model_name: str) -> Path:
+    """Satu folder per model embedding, karena vektor dari model berbeda tidak bisa dicampur."""
+    safe_name = re.sub(r"[^a-zA-Z0-9_.-]", "_", model_name)
+    return Path(cache_root) / safe_name
+
+def load_embedding_cache(cache_dir: Path):
+    """Baca index hash -> baris dan matriks vektor (memory-mapped, read-only)."""
+    cache_dir = Path(cache_dir)
+    meta_path = cache_dir / META_FILE
+    keys_path = cache_dir / KEYS_FILE
+    vectors_path = cache_dir / VECTORS_FILE
+    if not (meta_path.exists() and keys_path.exists() and vectors_path.exists()):
+        return {}, None
+
+    dim = json.loads(meta_path.read_text())["dim"]
+    keys = keys_path.read_text().split()
+    row_bytes = dim * np.dtype(np.float32).itemsize
+    n_rows = min(len(keys), vectors_path.stat().st_size // row_bytes)
+    if n_rows == 0:
+        return {}, None
+
+    # keys.txt ditulis setelah vektor; baris tanpa key (run yang terputus) diabaikan.
+    vectors = np.memmap(vectors_path, dtype=np.float32, mode="r", shape=(n_rows, dim))
+    index = {key: row for row, key in enumerate(keys[:n_rows])}
+    return index, vectors
+
+def append_embeddings(cache_dir: Path, model_name: str, keys, vectors: np.ndarray, n_existing: int):
+    cache_dir = Path(cache_dir)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+    meta_path = cache_dir / META_FILE
+    if not meta_path.exists():
+        meta_path.write_text(json.dumps({"model": model_name, "dim": int(vectors.shape[1])}))
+
+    row_bytes = vectors.shape[1] * vectors.itemsize
+    with open(cache_dir / VECTORS_FILE, "ab") as f:
+        f.truncate(n_existing * row_bytes)
+        f.write(vectors.tobytes())
+
+    keys_path = cache_dir / KEYS_FILE
+    existing_keys = keys_path.read_text().split() if keys_path.exists() else []
+    if len(existing_keys) != n_existing:
+        keys_path.write_text("".join(f"{key}\n" for key in existing_keys[:n_existing]))
+    with open(keys_path, "a") as f:
+        f.writelines(f"{key}\n" for key in keys)
+
+def encode_with_cache(embedder, texts, cache_root: Path, model_name: str, batch_size=None, show_progress_bar=True):
+    """
+    Encode judul dengan cache di disk yang di-key oleh hash judul dan nama model.
+    Hanya judul yang belum pernah di-encode yang dikirim ke embedder; batch_size=None
+    memakai batch size bawaan embedder.
+    """
+    if not texts:
+        raise ValueError("Tidak ada judul untuk di-encode.")
+
+    cache_dir = model_cache_dir(cache_root, model_name)
+    index, vectors = load_embedding_cache(cache_dir)
+    n_cached = 0 if vectors is None else vectors.shape[0]
+
+    keys = [text_hash(t) for t in texts]
+    missing = {}
+    for key, text in zip(keys, texts):
+        if key not in index and key not in missing:
+            missing[key] = text
+
+    encode_seconds = 0.0
+    new_vectors = None
+    if missing:
+        start = time.time()
+        encode_kwargs = {} if batch_size is None else {"batch_size": batch_size}
+        new_vectors = embedder.encode(
+            list(missing.values()),
+            convert_to_numpy=True,
+            show_progress_bar=show_progress_bar,
+            **encode_kwargs
+        ).astype(np.float32)
+        encode_seconds = time.time() - start
+
+        append_embeddings(cache_dir, model_name, list(missing.keys()), new_vectors, n_cached)
+        for offset, key in enumerate(missing.keys()):
+            index[key] = n_cached + offset
+
+    rows = np.array([index[key] for key in keys], dtype=np.int64)
+    cached = rows < n_cached
+
+    dim = vectors.shape[1] if vectors is not None else new_vectors.shape[1]
+    embeddings = np.empty((len(texts), dim), dtype=np.float32)
+    if cached.any():
+        embeddings[cached] = vectors[rows[cached]]
+    if not cached.all():
+        embeddings[~cached] = new_vectors[rows[~cached] - n_cached]
+
+    hits = int(cached.sum())
+    stats = {
+        "hits": hits,
+        "misses": len(texts) - hits,
+        "hit_rate": hits / len(texts) if texts else 0.0,
+        "encoded": len(missing),
+        "encode_seconds": encode_seconds,
+        "titles_per_second": len(missing) / encode_seconds if encode_seconds > 0 else None,
+    }
+    return embeddings, stats
@@ -0,0 +1,101 @@
+import sys
+import time
+import argparse
+import mlflow
+import numpy as np
+from sklearn.metrics import adjusted_rand_score
+from logging_config import setup_logging
+from embedding_backend import BACKENDS, EMBED_BATCH_SIZE, EMBED_WORKERS, EmbeddingBackend
+from model_artifact import artifact_exists, load_model_artifact
+from publication_trend import EMBED_MODEL_NAME, LOGS_DIR, MODEL_PATH, load_titles
+
+log = setup_logging(__name__, log_dir=LOGS_DIR)
+
+CHECK_SAMPLE_SIZE = 2000
+MIN_TOPIC_AGREEMENT = 0.9
+WARMUP_TITLES = 32
+
+def timed_encode(embedder, titles):
+    """Encode tanpa cache embedding (yang diukur adalah backend-nya); model dimuat sebelum timer."""
+    embedder.encode(titles[:WARMUP_TITLES])
+    start = time.perf_counter()
+    embeddings = embedder.encode(titles)
+    seconds = time.perf_counter() - start
+    return embeddings, len(titles) / seconds if seconds > 0 else float("inf")
+
+def compare_backends(titles, baseline, candidate, topic_model):
+    """Bandingkan throughput, kemiripan vektor dan topik hasil transform backend kandidat terhadap baseline."""
+    base_emb, base_tps = timed_encode(baseline, titles)
+    cand_emb, cand_tps = timed_encode(candidate, titles)
+
+    base_norm = base_emb / np.maximum(np.linalg.norm(base_emb, axis=1, keepdims=True), 1e-12)
+    cand_norm = cand_emb / np.maximum(np.linalg.norm(cand_emb, axis=1, keepdims=True), 1e-12)
+    cosine = (base_norm * cand_norm).sum(axis=1)
+
+    base_topics, _ = topic_model.transform(titles, base_emb)
+    cand_topics, _ = topic_model.transform(titles, cand_emb)
+    base_topics = np.asarray(base_topics)
+    cand_topics = np.asarray(cand_topics)
+
+    return {
+        "baseline_titles_per_second": base_tps,
+        "candidate_titles_per_second": cand_tps,
+        "speedup": cand_tps / base_tps,
+        "cosine_mean": float(cosine.mean()),
+        "cosine_min": float(cosine.min()),
+        "topic_agreement": float((base_topics == cand_topics).mean()),
+        "topic_ari": float(adjusted_rand_score(base_topics, cand_topics)),
+    }
+
+def main(backend, workers=EMBED_WORKERS, batch_size=EMBED_BATCH_SIZE, sample_size=CHECK_SAMPLE_SIZE,
+         min_agreement=MIN_TOPIC_AGREEMENT):
+    if not artifact_exists(MODEL_PATH):
+        raise FileNotFoundError(f"Model artifact '{MODEL_PATH}' not found, run training first.")
+
+    titles = load_titles()["judul"].astype(str).drop_duplicates()
+    if sample_size and len(titles) > sample_size:
+        titles = titles.sample(sample_size, random_state=42)
+    titles = titles.tolist()
+
+    baseline = EmbeddingBackend(EMBED_MODEL_NAME, backend="torch", workers=1, batch_size=batch_size)
+    candidate = EmbeddingBackend(EMBED_MODEL_NAME, backend=backend, workers=workers, batch_size=batch_size)
+    topic_model = load_model_artifact(MODEL_PATH, baseline)
+
+    with mlflow.start_run(run_name="embedding_backend_check"):
+        mlflow.log_param("embedding_model", EMBED_MODEL_NAME)
+        mlflow.log_param("embedding_backend", candidate.backend)
+        mlflow.log_param("embedding_workers", candidate.workers)
+        mlflow.log_param("embedding_batch_size", batch_size)
+        mlflow.log_param("num_titles", len(titles))
+
+        try:
+            results = compare_backends(titles, baseline, candidate, topic_model)
+        finally:
+            candidate.close()
+        mlflow.log_metrics(results)
+
+    log.info(
+        f"{candidate.backend} x{candidate.workers}: {results['candidate_titles_per_second']:.1f} titles/s "
+        f"vs fp32 {results['baseline_titles_per_second']:.1f} titles/s ({results['speedup']:.2f}x)"
+    )
+    log.info(
+        f"Cosine similarity to fp32: mean {results['cosine_mean']:.4f}, min {results['cosine_min']:.4f}; "
+        f"topic agreement {results['topic_agreement']:.2%} (ARI {results['topic_ari']:.4f})"
+    )
+    if results["topic_agreement"] < min_agreement:
+        log.warning(f"Topic agreement below {min_agreement:.0%}, keep the fp32 backend.")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare an embedding backend against the fp32 baseline")
+    parser.add_argument("--backend", choices=BACKENDS, required=True)
+    parser.add_argument("--workers", type=int, default=EMBED_WORKERS)
+    parser.add_argument("--batch-size", type=int, default=EMBED_BATCH_SIZE)
+    parser.add_argument("--sample-size", type=int, default=CHECK_SAMPLE_SIZE)
+    parser.add_argument("--min-agreement", type=float, default=MIN_TOPIC_AGREEMENT)
+    args = parser.parse_args()
+    results = main(
+        args.backend, workers=args.workers, batch_size=args.batch_size,
+        sample_size=args.sample_size, min_agreement=args.min_agreement
+    )
+    sys.exit(0 if results["topic_agreement"] >= args.min_agreement else 1)
@@ -0,0 +1,213 @@
+import os
+import json
+import time
+import struct
+import shutil
+import logging
+import argparse
+from datetime import datetime
+import numpy as np
+from pathlib import Path
+
+ARTIFACT_VERSION = 1
+MANIFEST_FILE = "artifact.json"
+CLUSTER_MODELS_FILE = "cluster_models.joblib"
+# Yang dicatat ke MLflow: topik, c-TF-IDF dan config. Model UMAP/HDBSCAN (terbesar) hanya disimpan lokal.
+MLFLOW_FILES = ["config.json", "topics.json", "topic_embeddings.safetensors", "ctfidf.safetensors", "ctfidf_config.json"]
+# Topic embedding, c-TF-IDF dan array model UMAP/HDBSCAN dibaca lewat memory map, halaman file dimuat saat dipakai.
+MODEL_MMAP = os.getenv("MODEL_MMAP", "true").lower() in ["1", "true", "yes"]
+SAFETENSORS_DTYPES = {
+    "F64": "<f8", "F32": "<f4", "F16": "<f2", "I64": "<i8", "I32": "<i4", "I16": "<i2",
+    "I8": "i1", "U64": "<u8", "U32": "<u4", "U16": "<u2", "U8": "u1", "BOOL": "?",
+}
+
+log = logging.getLogger(__name__)
+
+def legacy_model_file(model_dir):
+    """Lokasi model pickle format lama (model/bertopic_model.pkl untuk model/bertopic_model)."""
+    return Path(model_dir).with_suffix(".pkl")
+
+def artifact_exists(model_dir):
+    return (Path(model_dir) / MANIFEST_FILE).exists() or legacy_model_file(model_dir).exists()
+
+def read_manifest(model_dir):
+    return json.loads((Path(model_dir) / MANIFEST_FILE).read_text(encoding="utf-8"))
+
+def mmap_safetensors(path):
+    """
+    Tensor file safetensors sebagai np.memmap read-only: saat load hanya header JSON yang dibaca,
+    isi tensor dimuat OS per halaman saat pertama kali diakses.
+    """
+    path = Path(path)
+    with open(path, "rb") as f:
+        header_size = struct.unpack("<Q", f.read(8))[0]
+        header = json.loads(f.read(header_size))
+
+    tensors = {}
+    for name, info in header.items():
+        if name == "__metadata__":
+            continue
+        begin, end = info["data_offsets"]
+        dtype = np.dtype(SAFETENSORS_DTYPES[info["dtype"]])
+        shape = tuple(info["shape"])
+        if end == begin or not shape:
+            # np.memmap tidak bisa memetakan tensor kosong atau skalar; keduanya kecil.
+            with open(path, "rb") as f:
+                f.seek(8 + header_size + begin)
+                tensors[name] = np.frombuffer(f.read(end - begin), dtype=dtype).reshape(shape)
+        else:
+            tensors[name] = np.memmap(path, dtype=dtype, mode="r", offset=8 + header_size + begin, shape=shape)
+    return tensors
+
+def _load_bertopic_mmap(model_dir, embedding_model):
+    """Setara BERTopic.load(model_dir) tetapi tensor safetensors di-memory-map, bukan dibaca penuh."""
+    from bertopic._bertopic import _create_model_from_files
+    from bertopic._save_utils import load_cfg_from_json
+    from bertopic.backend._utils import select_backend
+
+    params = load_cfg_from_json(model_dir / "config.json")
+    # Artifact lama menyimpan nama embedding model di config; tanpa key ini BERTopic tidak memuatnya.
+    params.pop("embedding_model", None)
+    ctfidf_tensors, ctfidf_config = None, None
+    if (model_dir / "ctfidf.safetensors").exists():
+        ctfidf_tensors = mmap_safetensors(model_dir / "ctfidf.safetensors")
+        ctfidf_config = load_cfg_from_json(model_dir / "ctfidf_config.json")
+    topic_model = _create_model_from_files(
+        load_cfg_from_json(model_dir / "topics.json"),
+        params,
+        mmap_safetensors(model_dir / "topic_embeddings.safetensors"),
+        ctfidf_tensors,
+        ctfidf_config,
+        warn_no_backend=embedding_model is None,
+    )
+    if embedding_model is not None:
+        topic_model.embedding_model = select_backend(embedding_model, verbose=topic_model.verbose)
+    return topic_model
+
+def save_model_artifact(topic_model, model_dir, embedding_model_name, embedding_backend=None):
+    """
+    Simpan BERTopic dalam format terpisah: safetensors untuk topic embedding dan c-TF-IDF, JSON untuk
+    config/topik/vectorizer, nama embedding model di manifest (bukan salinan model), dan model
+    UMAP/HDBSCAN di file joblib tersendiri. Folder ditulis di samping lalu ditukar, manifest paling akhir.
+    """
+    import joblib
+
+    model_dir = Path(model_dir)
+    tmp_dir = model_dir.with_name(f"{model_dir.name}.tmp")
+    old_dir = model_dir.with_name(f"{model_dir.name}.old")
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # Nama embedding model hanya di manifest: bila ada di config.json, BERTopic.load membuat
+    # SentenceTransformer dari nama itu lalu membuangnya saat embedder dari pemanggil dipasang.
+    topic_model.save(str(tmp_dir), serialization="safetensors", save_ctfidf=True, save_embedding_model=False)
+    joblib.dump(
+        {"umap_model": topic_model.umap_model, "hdbscan_model": topic_model.hdbscan_model},
+        tmp_dir / CLUSTER_MODELS_FILE
+    )
+
+    manifest = {
+        "format_version": ARTIFACT_VERSION,
+        "serialization": "safetensors",
+        "embedding_model": embedding_model_name,
+        "embedding_backend": embedding_backend,
+        "num_topics": int(sum(1 for topic in topic_model.get_topics() if topic != -1)),
+        "cluster_models": CLUSTER_MODELS_FILE,
+        "mlflow_files": [name for name in MLFLOW_FILES if (tmp_dir / name).exists()],
+        "files": {p.name: p.stat().st_size for p in sorted(tmp_dir.iterdir())},
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    (tmp_dir / MANIFEST_FILE).write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    shutil.rmtree(old_dir, ignore_errors=True)
+    if model_dir.exists():
+        model_dir.rename(old_dir)
+    tmp_dir.rename(model_dir)
+    shutil.rmtree(old_dir, ignore_errors=True)
+
+    total_mb = sum(manifest["files"].values()) / (1024 * 1024)
+    log.info(f"Saved BERTopic artifact to {model_dir} ({total_mb:.1f} MB, {len(manifest['files'])} files)")
+    return model_dir / MANIFEST_FILE
+
+def load_model_artifact(model_dir, embedding_model, cluster_models=True, mmap=MODEL_MMAP):
+    """
+    Muat model dari format terpisah. Dengan mmap, topic embedding, c-TF-IDF dan model UMAP/HDBSCAN
+    di-memory-map sehingga baru dibaca dari disk saat dipakai. Dengan cluster_models=False UMAP/HDBSCAN
+    tidak dimuat sama sekali dan transform memakai kemiripan dengan topic embedding (cukup untuk
+    label/kata topik dan c-TF-IDF). Tanpa manifest, model pickle format lama dimuat apa adanya.
+    """
+    from bertopic import BERTopic
+
+    model_dir = Path(model_dir)
+    start = time.perf_counter()
+    if not (model_dir / MANIFEST_FILE).exists():
+        legacy_file = legacy_model_file(model_dir)
+        if not legacy_file.exists():
+            raise FileNotFoundError(f"Model artifact '{model_dir}' not found, run training first.")
+        log.warning(f"Loading legacy pickled model {legacy_file}, convert it with model_artifact.py --convert")
+        return BERTopic.load(str(legacy_file), embedding_model=embedding_model)
+
+    manifest = read_manifest(model_dir)
+    if manifest.get("format_version") != ARTIFACT_VERSION:
+        raise ValueError(f"Unsupported model artifact version {manifest.get('format_version')} in {model_dir}")
+
+    topic_model = None
+    if mmap:
+        try:
+            topic_model = _load_bertopic_mmap(model_dir, embedding_model)
+        except ImportError as e:
+            # Helper internal BERTopic berubah antar versi; tanpa itu tensor dibaca penuh seperti biasa.
+            log.warning(f"Memory-mapped loading not supported by this BERTopic version ({e}), loading eagerly")
+    if topic_model is None:
+        topic_model = BERTopic.load(str(model_dir), embedding_model=embedding_model)
+    if cluster_models:
+        import joblib
+        models = joblib.load(model_dir / manifest["cluster_models"], mmap_mode="r" if mmap else None)
+        topic_model.umap_model = models["umap_model"]
+        topic_model.hdbscan_model = models["hdbscan_model"]
+
+    log.info(
+        f"Loaded BERTopic artifact {model_dir} in {time.perf_counter() - start:.2f}s "
+        f"(mmap: {mmap}, cluster models: {cluster_models})"
+    )
+    return topic_model
+
+def check_transform(topic_model, n=5):
+    """
+    Smoke test transform pada model hasil load (array UMAP/HDBSCAN memory-map bersifat read-only):
+    topic embedding dipakai sebagai input sehingga tidak perlu embedding model.
+    """
+    embeddings = np.asarray(topic_model.topic_embeddings_[:n])
+    topic_info = topic_model.get_topic_info()
+    docs = topic_info["Name"].astype(str).tolist()[:len(embeddings)]
+    topics, _ = topic_model.transform(docs, embeddings)
+    return [int(topic) for topic in topics]
+
+def convert_legacy_model(model_dir, embedding_model_name):
+    """Konversi model/bertopic_model.pkl ke format terpisah tanpa retrain."""
+    from bertopic import BERTopic
+
+    legacy_file = legacy_model_file(model_dir)
+    topic_model = BERTopic.load(str(legacy_file))
+    manifest_path = save_model_artifact(topic_model, model_dir, embedding_model_name)
+    log.info(f"Converted {legacy_file} ({legacy_file.stat().st_size / (1024 * 1024):.1f} MB) to {model_dir}")
+    return manifest_path
+
+if __name__ == "__main__":
+    from logging_config import setup_logging
+
+    BASE_DIR = Path(__file__).resolve().parent.parent.parent
+    setup_logging(__name__, log_dir=BASE_DIR / "logs")
+    parser = argparse.ArgumentParser(description="Inspect or convert BERTopic model artifacts")
+    parser.add_argument("--convert", action="store_true", help="konversi model pickle lama ke format terpisah")
+    parser.add_argument("--check", action="store_true", help="muat artifact (mmap) lalu jalankan transform singkat")
+    parser.add_argument("--model-dir", type=Path, default=BASE_DIR / "model" / "bertopic_model")
+    parser.add_argument(
+        "--embedding-model", default=os.getenv("EMBED_MODEL_NAME", "paraphrase-multilingual-MiniLM-L12-v2")
+    )
+    args = parser.parse_args()
+    if args.convert:
+        convert_legacy_model(args.model_dir, args.embedding_model)
+    print(json.dumps(read_manifest(args.model_dir), indent=2))
+    if args.check:
+        topic_model = load_model_artifact(args.model_dir, None)
+        print(f"transform ok, topics: {check_transform(topic_model)}")
@@ -1,5 +1,6 @@
 import os
 import sys
+import argparse
 import time
 import re
 import mlflow
@@ -7,11 +8,13 @@ import numpy as np
 import pandas as pd
 from pathlib import Path
 from bertopic import BERTopic
-from gensim.corpora import Dictionary
-from gensim.models.coherencemodel import CoherenceModel
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
 from logging_config import setup_logging
+from embedding_cache import encode_with_cache
+from embedding_backend import EmbeddingBackend
+from reduction_cache import CachedUMAP
+from model_artifact import MANIFEST_FILE, artifact_exists, load_model_artifact, read_manifest, save_model_artifact
+from trend_engine import TREND_BIN, build_trend_matrix, domains_over_time, topics_over_time
+from topic_metrics import build_doc_term_matrix, topic_coherence, topic_diversity, topic_words_from_model
 
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
 DATA_DIR = BASE_DIR / "data" / "cleaned"
@@ -21,16 +24,24 @@ APP_DIR = BASE_DIR / "app"
 MLFLOW_DIR = BASE_DIR / "mlruns"
 OUTPUT_DIR = DATA_DIR / "output"
 
-INPUT_PATH = DATA_DIR / "titles_cleaned.xlsx"
-TOPIC_ASSIGNMENT_PATH = OUTPUT_DIR / "topic_assignments.xlsx"
-TOPIC_TREND_PATH = OUTPUT_DIR / "topic_trends.xlsx"
-TOPIC_DOMAIN_MAP_PATH = OUTPUT_DIR / "topic_domain_mapping.xlsx"
-MODEL_FILE = MODEL_DIR / "bertopic_model.pkl"
+INPUT_PATH = DATA_DIR / "titles_cleaned"
+TOPIC_ASSIGNMENT_PATH = OUTPUT_DIR / "topic_assignments"
+TOPIC_TREND_PATH = OUTPUT_DIR / "topic_trends"
+TOPIC_DOMAIN_TREND_PATH = OUTPUT_DIR / "topic_domain_trends"
+TOPIC_DOMAIN_MAP_PATH = OUTPUT_DIR / "topic_domain_mapping"
+TOPIC_GRANULARITY_PATH = OUTPUT_DIR / "topic_granularity"
+MODEL_PATH = MODEL_DIR / "bertopic_model"
+EMBED_CACHE_DIR = MODEL_DIR / "embeddings"
+UMAP_CACHE_DIR = MODEL_DIR / "umap"
 
 for p in [MODEL_DIR, LOGS_DIR, APP_DIR, MLFLOW_DIR, OUTPUT_DIR]:
     p.mkdir(parents=True, exist_ok=True)
 
 sys.path.insert(0, str(APP_DIR))
+sys.path.insert(0, str(BASE_DIR / "src" / "data-cleaning"))
+
+from stage_io import read_stage, stage_exists, write_stage
+from profiling import profiled, profiled_methods
 
 mlflow.set_tracking_uri(f"file:///{MLFLOW_DIR.resolve().as_posix()}")
 mlflow.set_experiment("bertopic_experiment")
@@ -38,6 +49,21 @@ mlflow.set_experiment("bertopic_experiment")
 log = setup_logging(__name__, log_dir=LOGS_DIR)
 
 EMBED_MODEL_NAME = os.getenv("EMBED_MODEL_NAME", "paraphrase-multilingual-MiniLM-L12-v2")
+TOPIC_MODE = os.getenv("TOPIC_MODE", "train")
+OUTLIER_RETRAIN_RATE = float(os.getenv("OUTLIER_RETRAIN_RATE", "0.5"))
+COHERENCE_SAMPLE_SIZE = int(os.getenv("COHERENCE_SAMPLE_SIZE", "0")) or None
+HDBSCAN_MIN_CLUSTER_SIZE = int(os.getenv("HDBSCAN_MIN_CLUSTER_SIZE", "10"))
+
+ASSIGN_COLUMNS = ["judul", "tahun", "topic", "probability", "topic_name", "domain"]
+
+def parse_nr_topics(value):
+    """'' atau 'none' -> None (tanpa reduksi topik), 'auto' -> 'auto', selain itu jumlah topik."""
+    value = str(value).strip().lower()
+    if value in ["", "none"]:
+        return None
+    return value if value == "auto" else int(value)
+
+NR_TOPICS = parse_nr_topics(os.getenv("NR_TOPICS", ""))
 
 DOMAIN_LABELS = {
     "Sains & Teknologi": [
@@ -68,35 +94,18 @@ def safe_metric_name(name: str) -> str:
     """Sanitize metric name agar sesuai aturan MLflow."""
     return re.sub(r"[^a-zA-Z0-9_\- ./]", "_", name)
 
-def compute_topic_coherence(titles, topic_model, top_n_words=10):
-    """Hitung u_mass coherence (cepat) untuk kualitas topik."""
-    topic_words = topic_model.get_topics()
-    topics_tokens = [
-        [word for word, _ in topic_words[t][:top_n_words]]
-        for t in topic_words if t != -1 and topic_words[t]
-    ]
-    words = [doc.split() for doc in titles]
-    dictionary = Dictionary(words)
-    cm = CoherenceModel(
-        topics=topics_tokens,
-        texts=words,
-        dictionary=dictionary,
-        coherence='u_mass'
-    )
-    return cm.get_coherence()
+def compute_topic_coherence(titles, topic_model, top_n_words=10, measure="u_mass", doc_term=None):
+    """Hitung coherence (u_mass atau c_npmi) dari matriks dokumen-kata sparse."""
+    if doc_term is None:
+        doc_term = build_doc_term_matrix(titles, sample_size=COHERENCE_SAMPLE_SIZE)
+    matrix, vocabulary = doc_term
+    topics_tokens = topic_words_from_model(topic_model, top_n_words=top_n_words)
+    coherence, _ = topic_coherence(topics_tokens, matrix, vocabulary, measure=measure)
+    return coherence
 
 def compute_topic_diversity(topic_model, top_k=10):
     """Proporsi kata unik di seluruh topik (semakin tinggi semakin beragam)."""
-    topic_words = topic_model.get_topics()
-    all_words = set()
-    total = 0
-    for topic in topic_words.values():
-        if not topic:
-            continue
-        words = [w for w, _ in topic[:top_k]]
-        total += len(words)
-        all_words.update(words)
-    return len(all_words) / total if total > 0 else 0
+    return topic_diversity(topic_words_from_model(topic_model, top_n_words=top_k), top_k=top_k)
 
 def topic_label_text(topic_model, topic_id, top_k=8):
     """Gabungkan top-k kata dari satu topik menjadi frasa representatif."""
@@ -105,168 +114,436 @@ def topic_label_text(topic_model, topic_id, top_k=8):
         return ""
     return ", ".join([w for w, _ in words[:top_k]])
 
+def encode_normalized(embedder, texts):
+    """Encode lewat cache embedding lalu normalisasi L2 (setara normalize_embeddings=True)."""
+    embeddings, _ = encode_with_cache(
+        embedder, texts, EMBED_CACHE_DIR, embedder.cache_name, show_progress_bar=False
+    )
+    norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+    return embeddings / np.where(norms == 0, 1, norms)
+
+def keyword_overlap(rep_texts, domain_keys):
+    """Jumlah kata topik yang sama dengan kata kunci tiap domain, dihitung sebagai perkalian matriks."""
+    vocab = {w: i for i, w in enumerate(sorted({w for k in domain_keys for w in DOMAIN_LABELS[k]}))}
+    domain_matrix = np.zeros((len(domain_keys), len(vocab)), dtype=np.int32)
+    for d, key in enumerate(domain_keys):
+        domain_matrix[d, [vocab[w] for w in set(DOMAIN_LABELS[key])]] = 1
+
+    topic_matrix = np.zeros((len(rep_texts), len(vocab)), dtype=np.int32)
+    for t, rep_text in enumerate(rep_texts):
+        tokens = {w.strip().lower() for w in rep_text.split(",")}
+        topic_matrix[t, [vocab[w] for w in tokens if w in vocab]] = 1
+    return topic_matrix @ domain_matrix.T
+
 def map_topics_to_domains(topic_model, embedder, threshold=0.30, top_k_words=8):
     """
     Pemetaan topic -> domain dengan cosine similarity antara:
     - embedding frasa kata topik
     - embedding kalimat label domain
     Fallback: keyword overlap jika similarity < threshold.
+    Semua topik di-encode dalam satu batch; embedding kalimat domain diambil dari cache per model.
     """
     domain_keys = list(DOMAIN_SENTENCES.keys())
     domain_texts = [DOMAIN_SENTENCES[k] for k in domain_keys]
 
-    domain_emb = embedder.encode(
-        domain_texts,
-        convert_to_numpy=True,
-        normalize_embeddings=True
-    )
+    topic_ids = [t for t in topic_model.get_topic_info()["Topic"] if t != -1]
+    rep_texts = [topic_label_text(topic_model, t, top_k=top_k_words) for t in topic_ids]
 
-    mapping_rows = []
-    topic_info = topic_model.get_topic_info()
+    mapping_df = pd.DataFrame({
+        "topic": topic_ids,
+        "topic_words": rep_texts,
+        "best_domain": "Unassigned",
+        "similarity": 0.0
+    })
+
+    has_words = np.array([bool(text) for text in rep_texts], dtype=bool)
+    if has_words.any():
+        texts = [text for text in rep_texts if text]
+        domain_emb = encode_normalized(embedder, domain_texts)
+        topic_emb = encode_normalized(embedder, texts)
+        sims = topic_emb @ domain_emb.T
 
-    for _, row in topic_info.iterrows():
-        t_id = row["Topic"]
-        if t_id == -1:
-            continue
-
-        rep_text = topic_label_text(topic_model, t_id, top_k=top_k_words)
-        if not rep_text:
-            mapping_rows.append({
-                "topic": t_id, "topic_words": "", "best_domain": "Unassigned",
-                "similarity": 0.0
-            })
-            continue
-
-        t_emb = embedder.encode([rep_text], convert_to_numpy=True, normalize_embeddings=True)
-        sims = cosine_similarity(t_emb, domain_emb)[0]
-        best_idx = int(np.argmax(sims))
-        best_domain = domain_keys[best_idx]
-        best_score = float(sims[best_idx])
-
-        if best_score < threshold:
-            rep_tokens = set([w.strip().lower() for w in rep_text.split(",")])
-            overlap_scores = []
-            for dk, kw in DOMAIN_LABELS.items():
-                overlap = len(rep_tokens.intersection(set(kw)))
-                overlap_scores.append((dk, overlap))
-            overlap_scores.sort(key=lambda x: x[1], reverse=True)
-            if overlap_scores and overlap_scores[0][1] > 0:
-                best_domain = overlap_scores[0][0]
-                best_score = max(best_score, 0.25)
-
-        mapping_rows.append({
-            "topic": t_id,
-            "topic_words": rep_text,
-            "best_domain": best_domain,
-            "similarity": round(best_score, 4)
-        })
-
-    mapping_df = pd.DataFrame(mapping_rows).sort_values(["best_domain", "topic"]).reset_index(drop=True)
+        best_idx = sims.argmax(axis=1)
+        best_score = sims[np.arange(len(texts)), best_idx]
+        best_domain = np.array(domain_keys, dtype=object)[best_idx]
+
+        overlap = keyword_overlap(texts, domain_keys)
+        use_overlap = (best_score < threshold) & (overlap.max(axis=1) > 0)
+        best_domain = np.where(use_overlap, np.array(domain_keys, dtype=object)[overlap.argmax(axis=1)], best_domain)
+        best_score = np.where(use_overlap, np.maximum(best_score, 0.25), best_score)
+
+        mapping_df.loc[has_words, "best_domain"] = best_domain
+        mapping_df.loc[has_words, "similarity"] = np.round(best_score.astype(float), 4)
+
+    mapping_df = mapping_df.sort_values(["best_domain", "topic"]).reset_index(drop=True)
     return mapping_df
 
-def main():
-    np.random.seed(42)
+def remap_domains(embedder):
+    """Petakan ulang domain dari model tersimpan tanpa retrain, mis. setelah DOMAIN_LABELS diubah."""
+    with mlflow.start_run(run_name="bertopic_domain_remap"):
+        mlflow.log_param("mode", "domains")
+        mlflow.log_param("embedding_model", EMBED_MODEL_NAME)
+        log_embedding_params(embedder)
+
+        log.info(f"Loading saved BERTopic model: {MODEL_PATH}")
+        topic_model = load_model_artifact(MODEL_PATH, embedder, cluster_models=False)
+
+        log.info("Mapping topics to domains...")
+        domain_map_df = map_topics_to_domains(topic_model, embedder, threshold=0.30, top_k_words=8)
+        domain_map_path = write_stage(domain_map_df, TOPIC_DOMAIN_MAP_PATH)
+        mlflow.log_artifact(str(domain_map_path))
 
-    log.info("Loading cleaned data...")
-    df = pd.read_excel(INPUT_PATH).dropna(subset=["judul", "tahun"])
+        if stage_exists(TOPIC_ASSIGNMENT_PATH):
+            df = read_stage(TOPIC_ASSIGNMENT_PATH)
+            df = label_assignments(df, topic_model, domain_map_df)
+            assignment_path = write_stage(df[ASSIGN_COLUMNS], TOPIC_ASSIGNMENT_PATH)
+            mlflow.log_artifact(str(assignment_path))
+
+        counts = domain_map_df["best_domain"].value_counts().to_dict()
+        for dom, cnt in counts.items():
+            mlflow.log_metric(f"topics_in_{safe_metric_name(dom)}", int(cnt))
+
+def build_topic_model(embedder, min_cluster_size=HDBSCAN_MIN_CLUSTER_SIZE, nr_topics=NR_TOPICS):
+    """
+    BERTopic dengan UMAP/HDBSCAN setara default BERTopic, tetapi UMAP memakai cache reduksi
+    (model/umap) sehingga fit ulang dengan embedding yang sama hanya menjalankan HDBSCAN dan c-TF-IDF.
+    """
+    from hdbscan import HDBSCAN
+
+    umap_model = CachedUMAP(UMAP_CACHE_DIR)
+    hdbscan_model = HDBSCAN(
+        min_cluster_size=min_cluster_size,
+        metric="euclidean",
+        cluster_selection_method="eom",
+        prediction_data=True
+    )
+    return BERTopic(
+        embedding_model=embedder,
+        umap_model=umap_model,
+        hdbscan_model=hdbscan_model,
+        nr_topics=nr_topics,
+        language="multilingual",
+        verbose=True
+    )
+
+def fit_topic_model(topic_model, titles, embeddings):
+    # UMAP dan HDBSCAN dijalankan di dalam fit_transform; method internalnya diprofil terpisah.
+    with profiled_methods(topic_model, {"_reduce_dimensionality": "umap", "_cluster_embeddings": "hdbscan"}):
+        with profiled("bertopic_fit", rows_in=len(titles)):
+            return topic_model.fit_transform(titles, embeddings)
+
+def log_topic_model_params(topic_model):
+    mlflow.log_params({f"umap_{k}": v for k, v in topic_model.umap_model.params.items()})
+    mlflow.log_param("umap_fit_sample", topic_model.umap_model.fit_sample)
+    mlflow.log_param("hdbscan_min_cluster_size", topic_model.hdbscan_model.min_cluster_size)
+    mlflow.log_param("nr_topics", topic_model.nr_topics)
+
+def log_embedding_params(embedder):
+    mlflow.log_param("embedding_backend", embedder.backend)
+    mlflow.log_param("embedding_workers", embedder.workers)
+    mlflow.log_param("embedding_batch_size", embedder.batch_size)
+
+def log_model_artifact(model_path):
+    """Catat file topik/c-TF-IDF/config dan manifest ke MLflow; model UMAP/HDBSCAN tetap lokal."""
+    manifest = read_manifest(model_path)
+    for name in [*manifest["mlflow_files"], MANIFEST_FILE]:
+        mlflow.log_artifact(str(model_path / name), artifact_path="model")
+    mlflow.log_metric("model_artifact_mb", sum(manifest["files"].values()) / (1024 * 1024))
+
+def load_titles():
+    df = read_stage(INPUT_PATH).dropna(subset=["judul", "tahun"])
     df["tahun"] = df["tahun"].astype(str).str.extract(r"(\d{4})")
     df = df.dropna(subset=["tahun"])
     df["tahun"] = df["tahun"].astype(int)
+    return df.reset_index(drop=True)
+
+def encode_titles(embedder, titles):
+    """Encode judul lewat cache embedding dan catat statistiknya ke MLflow."""
+    with profiled("embedding", rows_in=len(titles)) as prof:
+        embeddings, cache_stats = encode_with_cache(embedder, titles, EMBED_CACHE_DIR, embedder.cache_name)
+        prof.rows_out = int(cache_stats["encoded"])
+    mlflow.log_metric("embedding_cache_hit_rate", float(cache_stats["hit_rate"]))
+    mlflow.log_metric("embedding_cache_misses", int(cache_stats["misses"]))
+    mlflow.log_metric("embedding_encode_seconds", float(cache_stats["encode_seconds"]))
+    if cache_stats["titles_per_second"] is not None:
+        mlflow.log_metric("embedding_titles_per_second", float(cache_stats["titles_per_second"]))
+    log.info(
+        f"Embedding cache: {cache_stats['hits']} hits, {cache_stats['encoded']} newly encoded "
+        f"in {cache_stats['encode_seconds']:.2f}s (hit rate {cache_stats['hit_rate']:.2%}, "
+        f"{cache_stats['titles_per_second'] or 0:.1f} titles/s)"
+    )
+    return embeddings
+
+def label_assignments(df, topic_model, domain_map_df):
+    topic_info = topic_model.get_topic_info()
+    topic_names = {row["Topic"]: row["Name"] for _, row in topic_info.iterrows()}
+    topic_to_domain = dict(zip(domain_map_df["topic"], domain_map_df["best_domain"]))
+
+    df["topic_name"] = df["topic"].map(topic_names)
+    df["domain"] = df["topic"].map(topic_to_domain).fillna("Unassigned")
+    return df
+
+def compute_topic_trends(topic_model, df, bin_spec=TREND_BIN):
+    """
+    Frekuensi topik dan domain per periode dari satu matriks dokumen-kata (lihat trend_engine);
+    mengembalikan tabel tren topik, tren domain dan judul yang dipakai.
+    """
+    df_valid = df[df["topic"] != -1].copy()
+    valid_years = df_valid["tahun"].value_counts()
+    valid_years = valid_years[valid_years > 2].index
+    df_valid = df_valid[df_valid["tahun"].isin(valid_years)]
+
+    valid_topics = topic_model.get_topic_freq()["Topic"].tolist()
+    df_valid = df_valid[df_valid["topic"].isin(valid_topics)]
+
+    titles = df_valid["judul"].tolist()
+    timestamps = pd.to_datetime(df_valid["tahun"].astype(str), format="%Y")
+
+    unique_years = sorted(df_valid["tahun"].unique())
+    nr_bins = min(30, max(5, len(unique_years)))
+    with profiled("topics_over_time", rows_in=len(titles)) as prof:
+        doc_term, words = build_trend_matrix(topic_model, titles)
+        trends_df = topics_over_time(
+            topic_model, doc_term, words, df_valid["topic"].to_numpy(), timestamps,
+            bin_spec=bin_spec, nr_bins=nr_bins
+        )
+        domain_trends_df = domains_over_time(
+            topic_model, doc_term, words, df_valid["domain"].to_numpy(), timestamps,
+            bin_spec=bin_spec, nr_bins=nr_bins
+        )
+        prof.rows_out = len(trends_df)
+
+    return trends_df, domain_trends_df, titles
 
+def train(df, embedder):
     titles_all = df["judul"].astype(str).tolist()
-    years_all = df["tahun"].astype(str).tolist()
 
     with mlflow.start_run(run_name="bertopic_training_with_domains"):
         start_time = time.time()
 
         mlflow.log_param("model", "BERTopic")
+        mlflow.log_param("mode", "train")
         mlflow.log_param("embedding_model", EMBED_MODEL_NAME)
+        log_embedding_params(embedder)
         mlflow.log_param("num_titles", len(titles_all))
 
-        log.info(f"Loading embedding model: {EMBED_MODEL_NAME}")
-        embedder = SentenceTransformer(EMBED_MODEL_NAME)
+        log.info("Encoding titles (with embedding cache)...")
+        embeddings = encode_titles(embedder, titles_all)
 
         log.info("Training BERTopic...")
-        topic_model = BERTopic(
-            embedding_model=embedder,
-            language="multilingual",
-            verbose=True
-        )
-        topics, probs = topic_model.fit_transform(titles_all)
-
-        log.info("Assigning topics to documents...")
-        topic_info = topic_model.get_topic_info()
-        topic_names = {row["Topic"]: row["Name"] for _, row in topic_info.iterrows()}
-
-        df["topic"] = topics
-        df["probability"] = probs
-        df["topic_name"] = df["topic"].map(topic_names)
+        topic_model = build_topic_model(embedder)
+        log_topic_model_params(topic_model)
+        topics, probs = fit_topic_model(topic_model, titles_all, embeddings)
+        mlflow.log_metric("umap_cache_hit", int(topic_model.umap_model.cache_hit))
 
         log.info("Mapping topics to domains...")
         domain_map_df = map_topics_to_domains(topic_model, embedder, threshold=0.30, top_k_words=8)
-        domain_map_df.to_excel(TOPIC_DOMAIN_MAP_PATH, index=False)
-        mlflow.log_artifact(str(TOPIC_DOMAIN_MAP_PATH))
-
-        topic_to_domain = dict(zip(domain_map_df["topic"], domain_map_df["best_domain"]))
-        df["domain"] = df["topic"].map(topic_to_domain).fillna("Unassigned")
-
-        assign_cols = ["judul", "tahun", "topic", "probability", "topic_name", "domain"]
-        df[assign_cols].to_excel(TOPIC_ASSIGNMENT_PATH, index=False)
-        mlflow.log_artifact(str(TOPIC_ASSIGNMENT_PATH))
-
-        df_valid = df[df["topic"] != -1].copy()
-        valid_years = df_valid["tahun"].value_counts()
-        valid_years = valid_years[valid_years > 2].index
-        df_valid = df_valid[df_valid["tahun"].isin(valid_years)]
+        domain_map_path = write_stage(domain_map_df, TOPIC_DOMAIN_MAP_PATH)
+        mlflow.log_artifact(str(domain_map_path))
 
-        valid_topics = topic_model.get_topic_freq()["Topic"].tolist()
-        df_valid = df_valid[df_valid["topic"].isin(valid_topics)]
+        log.info("Assigning topics to documents...")
+        df["topic"] = topics
+        df["probability"] = probs
+        df = label_assignments(df, topic_model, domain_map_df)
 
-        titles = df_valid["judul"].tolist()
-        topics_valid = df_valid["topic"].tolist()
-        years = df_valid["tahun"].astype(str).tolist()
+        assignment_path = write_stage(df[ASSIGN_COLUMNS], TOPIC_ASSIGNMENT_PATH)
+        mlflow.log_artifact(str(assignment_path))
 
         log.info("Calculating topics over time...")
-        unique_years = sorted(df_valid["tahun"].unique())
-        nr_bins = min(30, max(5, len(unique_years)))
-        topics_over_time = topic_model.topics_over_time(
-            docs=titles,
-            topics=topics_valid,
-            timestamps=years,
-            nr_bins=nr_bins
-        )
-
-        trends_df = topics_over_time[["Topic", "Words", "Timestamp", "Frequency"]].copy()
-        trends_df.columns = ["topic", "topic_words", "tahun", "count"]
-        trends_df.to_excel(TOPIC_TREND_PATH, index=False)
-        mlflow.log_artifact(str(TOPIC_TREND_PATH))
+        trends_df, domain_trends_df, titles = compute_topic_trends(topic_model, df)
+        trend_path = write_stage(trends_df, TOPIC_TREND_PATH)
+        mlflow.log_artifact(str(trend_path))
+        mlflow.log_artifact(str(write_stage(domain_trends_df, TOPIC_DOMAIN_TREND_PATH)))
 
         counts = domain_map_df["best_domain"].value_counts().to_dict()
         for dom, cnt in counts.items():
             metric_name = f"topics_in_{safe_metric_name(dom)}"
             mlflow.log_metric(metric_name, int(cnt))
 
+        topic_info = topic_model.get_topic_info()
         mlflow.log_metric("num_topics", int((topic_info["Topic"] != -1).sum()))
 
         log.info("Evaluating topic quality...")
-        coherence = compute_topic_coherence(titles, topic_model)
+        doc_term = build_doc_term_matrix(titles, sample_size=COHERENCE_SAMPLE_SIZE)
+        coherence = compute_topic_coherence(titles, topic_model, doc_term=doc_term)
+        coherence_npmi = compute_topic_coherence(titles, topic_model, measure="c_npmi", doc_term=doc_term)
         diversity = compute_topic_diversity(topic_model)
         mlflow.log_metric("topic_coherence_umass", float(coherence))
+        mlflow.log_metric("topic_coherence_npmi", float(coherence_npmi))
         mlflow.log_metric("topic_diversity", float(diversity))
 
         log.info(f"Coherence (u_mass): {coherence:.4f}")
+        log.info(f"Coherence (c_npmi): {coherence_npmi:.4f}")
         log.info(f"Diversity: {diversity:.4f}")
 
         log.info("Saving BERTopic model...")
-        topic_model.save(str(MODEL_FILE), serialization="pkl")
-        if MODEL_FILE.exists():
-            mlflow.log_artifact(str(MODEL_FILE), artifact_path="model")
-        else:
-            log.warning("Model file not found, skipping artifact log.")
+        save_model_artifact(topic_model, MODEL_PATH, EMBED_MODEL_NAME, embedding_backend=embedder.backend)
+        log_model_artifact(MODEL_PATH)
 
         duration = time.time() - start_time
         mlflow.log_metric("training_duration_seconds", float(duration))
         log.info(f"Training completed in {duration:.2f} seconds")
 
+def assign(df, embedder, outlier_threshold=OUTLIER_RETRAIN_RATE):
+    """
+    Tetapkan topik hanya untuk judul baru/berubah memakai model tersimpan, lalu gabungkan
+    dengan topic_assignments lama. Mengembalikan False jika perlu retrain penuh.
+    """
+    with mlflow.start_run(run_name="bertopic_incremental_assign"):
+        start_time = time.time()
+
+        mlflow.log_param("model", "BERTopic")
+        mlflow.log_param("mode", "assign")
+        mlflow.log_param("embedding_model", EMBED_MODEL_NAME)
+        log_embedding_params(embedder)
+        mlflow.log_param("num_titles", len(df))
+
+        existing = read_stage(TOPIC_ASSIGNMENT_PATH).drop_duplicates(subset=["judul"]).set_index("judul")
+        is_new = ~df["judul"].isin(existing.index)
+        df_new = df[is_new].copy()
+        df_old = df[~is_new].copy()
+        log.info(f"{len(df_new)} new or changed titles, {len(df_old)} already assigned")
+        mlflow.log_metric("num_new_titles", len(df_new))
+
+        log.info(f"Loading saved BERTopic model: {MODEL_PATH}")
+        topic_model = load_model_artifact(MODEL_PATH, embedder)
+
+        if len(df_new):
+            titles_new = df_new["judul"].astype(str).tolist()
+            embeddings = encode_titles(embedder, titles_new)
+            with profiled("bertopic_transform", rows_in=len(titles_new)):
+                new_topics, new_probs = topic_model.transform(titles_new, embeddings)
+            new_topics = np.asarray(new_topics)
+
+            outlier_rate = float((new_topics == -1).mean())
+            mlflow.log_metric("new_title_outlier_rate", outlier_rate)
+            log.info(f"Outlier rate on new titles: {outlier_rate:.2%}")
+            if outlier_rate > outlier_threshold:
+                log.warning(f"Outlier rate above {outlier_threshold:.2%}, full retrain required.")
+                return False
+
+            df_new["topic"] = new_topics
+            df_new["probability"] = new_probs if new_probs is not None else np.nan
+
+        df_old["topic"] = df_old["judul"].map(existing["topic"])
+        df_old["probability"] = df_old["judul"].map(existing["probability"])
+
+        if stage_exists(TOPIC_DOMAIN_MAP_PATH):
+            domain_map_df = read_stage(TOPIC_DOMAIN_MAP_PATH)
+        else:
+            domain_map_df = map_topics_to_domains(topic_model, embedder, threshold=0.30, top_k_words=8)
+            write_stage(domain_map_df, TOPIC_DOMAIN_MAP_PATH)
+
+        merged = pd.concat([df_old, df_new]).sort_index()
+        merged["topic"] = merged["topic"].astype(int)
+        merged = label_assignments(merged, topic_model, domain_map_df)
+
+        assignment_path = write_stage(merged[ASSIGN_COLUMNS], TOPIC_ASSIGNMENT_PATH)
+        mlflow.log_artifact(str(assignment_path))
+
+        log.info("Recalculating topics over time from merged assignments...")
+        trends_df, domain_trends_df, _ = compute_topic_trends(topic_model, merged)
+        trend_path = write_stage(trends_df, TOPIC_TREND_PATH)
+        mlflow.log_artifact(str(trend_path))
+        mlflow.log_artifact(str(write_stage(domain_trends_df, TOPIC_DOMAIN_TREND_PATH)))
+
+        duration = time.time() - start_time
+        mlflow.log_metric("assign_duration_seconds", float(duration))
+        log.info(f"Incremental assignment completed in {duration:.2f} seconds")
+        return True
+
+def explore(df, embedder, min_cluster_sizes, nr_topics_options):
+    """
+    Coba beberapa granularitas topik (min_cluster_size x nr_topics) tanpa menyimpan model.
+    Embedding dan reduksi UMAP diambil dari cache, jadi tiap percobaan hanya HDBSCAN + c-TF-IDF.
+    """
+    titles = df["judul"].astype(str).tolist()
+
+    with mlflow.start_run(run_name="bertopic_granularity_exploration"):
+        mlflow.log_param("mode", "explore")
+        mlflow.log_param("embedding_model", EMBED_MODEL_NAME)
+        log_embedding_params(embedder)
+        mlflow.log_param("num_titles", len(titles))
+
+        embeddings = encode_titles(embedder, titles)
+        doc_term = build_doc_term_matrix(titles, sample_size=COHERENCE_SAMPLE_SIZE)
+
+        rows = []
+        for min_cluster_size in min_cluster_sizes:
+            for nr_topics in nr_topics_options:
+                run_name = f"min_cluster_size={min_cluster_size}, nr_topics={nr_topics}"
+                with mlflow.start_run(run_name=run_name, nested=True):
+                    start_time = time.time()
+                    topic_model = build_topic_model(embedder, min_cluster_size=min_cluster_size, nr_topics=nr_topics)
+                    log_topic_model_params(topic_model)
+                    topics, _ = fit_topic_model(topic_model, titles, embeddings)
+                    topics = np.asarray(topics)
+
+                    row = {
+                        "min_cluster_size": min_cluster_size,
+                        "nr_topics": str(nr_topics),
+                        "num_topics": int(len(set(topics.tolist()) - {-1})),
+                        "outlier_rate": float((topics == -1).mean()),
+                        "coherence_npmi": float(compute_topic_coherence(
+                            titles, topic_model, measure="c_npmi", doc_term=doc_term
+                        )),
+                        "diversity": float(compute_topic_diversity(topic_model)),
+                        "umap_cache_hit": bool(topic_model.umap_model.cache_hit),
+                        "seconds": time.time() - start_time,
+                    }
+                    mlflow.log_metrics({k: float(v) for k, v in row.items() if k not in ["min_cluster_size", "nr_topics"]})
+                rows.append(row)
+                log.info(
+                    f"{run_name}: {row['num_topics']} topics, outliers {row['outlier_rate']:.2%}, "
+                    f"c_npmi {row['coherence_npmi']:.4f}, diversity {row['diversity']:.4f} ({row['seconds']:.1f}s)"
+                )
+
+        granularity_path = write_stage(pd.DataFrame(rows), TOPIC_GRANULARITY_PATH)
+        mlflow.log_artifact(str(granularity_path))
+        log.info(f"Granularity comparison saved to: {granularity_path}")
+
+def main(mode=TOPIC_MODE, outlier_threshold=OUTLIER_RETRAIN_RATE, min_cluster_sizes=None, nr_topics_options=None):
+    np.random.seed(42)
+
+    embedder = EmbeddingBackend(EMBED_MODEL_NAME)
+    log.info(f"Embedding model: {EMBED_MODEL_NAME} (backend {embedder.backend}, {embedder.workers} workers)")
+    try:
+        if mode == "domains":
+            if not artifact_exists(MODEL_PATH):
+                raise FileNotFoundError(f"Model artifact '{MODEL_PATH}' not found, run training first.")
+            remap_domains(embedder)
+            return
+
+        log.info("Loading cleaned data...")
+        df = load_titles()
+
+        if mode == "explore":
+            explore(
+                df, embedder,
+                min_cluster_sizes or [HDBSCAN_MIN_CLUSTER_SIZE],
+                nr_topics_options or [NR_TOPICS]
+            )
+            return
+        if mode == "assign":
+            if not artifact_exists(MODEL_PATH) or not stage_exists(TOPIC_ASSIGNMENT_PATH):
+                log.warning("Saved model or topic assignments not found, falling back to full training.")
+            elif assign(df, embedder, outlier_threshold=outlier_threshold):
+                return
+        elif mode != "train":
+            raise ValueError(f"Mode '{mode}' tidak dikenal, gunakan 'train', 'assign', 'domains' atau 'explore'.")
+
+        train(df, embedder)
+    finally:
+        embedder.close()
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="BERTopic publication trend modelling")
+    parser.add_argument("--mode", choices=["train", "assign", "domains", "explore"], default=TOPIC_MODE)
+    parser.add_argument("--outlier-threshold", type=float, default=OUTLIER_RETRAIN_RATE)
+    parser.add_argument("--min-cluster-sizes", type=int, nargs="+", help="explore: nilai min_cluster_size HDBSCAN")
+    parser.add_argument("--nr-topics", type=parse_nr_topics, nargs="+", help="explore: none, auto atau jumlah topik")
+    args = parser.parse_args()
+    main(
+        mode=args.mode, outlier_threshold=args.outlier_threshold,
+        min_cluster_sizes=args.min_cluster_sizes, nr_topics_options=args.nr_topics
+    )
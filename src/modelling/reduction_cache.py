@@ -0,0 +1,126 @@
+import os
+import json
+import pickle
+import hashlib
+import logging
+import numpy as np
+from pathlib import Path
+
+UMAP_N_NEIGHBORS = int(os.getenv("UMAP_N_NEIGHBORS", "15"))
+UMAP_N_COMPONENTS = int(os.getenv("UMAP_N_COMPONENTS", "5"))
+UMAP_MIN_DIST = float(os.getenv("UMAP_MIN_DIST", "0.0"))
+UMAP_METRIC = os.getenv("UMAP_METRIC", "cosine")
+UMAP_RANDOM_STATE = int(os.environ["UMAP_RANDOM_STATE"]) if os.getenv("UMAP_RANDOM_STATE") else None
+# Opsi hemat memori untuk korpus besar: nearest-neighbor descent low_memory dan fit pada sampel.
+UMAP_LOW_MEMORY = os.getenv("UMAP_LOW_MEMORY", "false").lower() in ["1", "true", "yes"]
+UMAP_FIT_SAMPLE = int(os.getenv("UMAP_FIT_SAMPLE", "0")) or None
+MAX_CACHED_REDUCTIONS = int(os.getenv("MAX_CACHED_REDUCTIONS", "5"))
+
+EMBEDDING_FILE = "{key}.npy"
+MODEL_FILE = "{key}.umap.pkl"
+
+log = logging.getLogger(__name__)
+
+class CachedUMAP:
+    """
+    UMAP untuk BERTopic yang menyimpan hasil reduksi di disk, di-key oleh hash embedding dan parameter
+    UMAP. Fit ulang dengan embedding dan parameter yang sama (mis. mencoba min_cluster_size atau
+    nr_topics lain) memuat hasil lama sehingga hanya HDBSCAN dan c-TF-IDF yang dihitung ulang.
+    """
+
+    def __init__(self, cache_dir, n_neighbors=UMAP_N_NEIGHBORS, n_components=UMAP_N_COMPONENTS,
+                 min_dist=UMAP_MIN_DIST, metric=UMAP_METRIC, low_memory=UMAP_LOW_MEMORY,
+                 random_state=UMAP_RANDOM_STATE, fit_sample=UMAP_FIT_SAMPLE):
+        self.cache_dir = Path(cache_dir)
+        self.params = {
+            "n_neighbors": n_neighbors,
+            "n_components": n_components,
+            "min_dist": min_dist,
+            "metric": metric,
+            "low_memory": low_memory,
+            "random_state": random_state,
+        }
+        self.fit_sample = fit_sample
+        self.umap_model = None
+        self.embedding_ = None
+        self.cache_hit = None
+        self._fit_input = None
+        self._fit_key = None
+
+    def cache_key(self, embeddings):
+        digest = hashlib.sha1(np.ascontiguousarray(embeddings, dtype=np.float32).tobytes())
+        digest.update(json.dumps({**self.params, "fit_sample": self.fit_sample}, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def _paths(self, key):
+        return self.cache_dir / EMBEDDING_FILE.format(key=key), self.cache_dir / MODEL_FILE.format(key=key)
+
+    def _load(self, key):
+        embedding_path, model_path = self._paths(key)
+        if not (embedding_path.exists() and model_path.exists()):
+            return False
+        with open(model_path, "rb") as f:
+            self.umap_model = pickle.load(f)
+        self.embedding_ = np.load(embedding_path)
+        os.utime(embedding_path)
+        return True
+
+    def _save(self, key):
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        embedding_path, model_path = self._paths(key)
+        tmp_model = model_path.with_suffix(".tmp")
+        with open(tmp_model, "wb") as f:
+            pickle.dump(self.umap_model, f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_model.replace(model_path)
+        tmp_embedding = embedding_path.with_suffix(".tmp.npy")
+        np.save(tmp_embedding, self.embedding_)
+        tmp_embedding.replace(embedding_path)
+        prune_reductions(self.cache_dir)
+
+    def _fit_umap(self, embeddings, y=None):
+        from umap import UMAP
+        self.umap_model = UMAP(**self.params)
+        if self.fit_sample and len(embeddings) > self.fit_sample:
+            rng = np.random.default_rng(42)
+            sample = np.sort(rng.choice(len(embeddings), size=self.fit_sample, replace=False))
+            log.info(f"Fitting UMAP on a sample of {self.fit_sample}/{len(embeddings)} embeddings")
+            self.umap_model.fit(embeddings[sample], y=None if y is None else np.asarray(y)[sample])
+            return self.umap_model.transform(embeddings)
+        self.umap_model.fit(embeddings, y=y)
+        return self.umap_model.embedding_
+
+    def fit(self, X, y=None):
+        X = np.asarray(X, dtype=np.float32)
+        # Reduksi semi-supervised bergantung pada label, jadi tidak di-cache.
+        key = self.cache_key(X) if y is None else None
+        self.cache_hit = key is not None and self._load(key)
+        if self.cache_hit:
+            log.info(f"Reusing cached UMAP reduction {key[:12]} ({len(X)} embeddings)")
+        else:
+            self.embedding_ = np.asarray(self._fit_umap(X, y=y), dtype=np.float32)
+            if key is not None:
+                self._save(key)
+        self._fit_input = X
+        self._fit_key = key
+        return self
+
+    def transform(self, X):
+        if self.embedding_ is not None and len(X) == len(self.embedding_):
+            if X is self._fit_input or (self._fit_key is not None and self.cache_key(X) == self._fit_key):
+                return self.embedding_
+        return self.umap_model.transform(np.asarray(X, dtype=np.float32))
+
+    def fit_transform(self, X, y=None):
+        return self.fit(X, y=y).embedding_
+
+    def __getstate__(self):
+        # Hasil reduksi sudah ada di cache; yang ikut model BERTopic cukup UMAP yang sudah di-fit.
+        return {**self.__dict__, "embedding_": None, "_fit_input": None}
+
+def prune_reductions(cache_dir, keep=MAX_CACHED_REDUCTIONS):
+    """Hapus hasil reduksi yang paling lama tidak dipakai, sisakan `keep` terakhir."""
+    cache_dir = Path(cache_dir)
+    embeddings = sorted(cache_dir.glob(EMBEDDING_FILE.format(key="*")), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in embeddings[keep:]:
+        path.unlink(missing_ok=True)
+        (cache_dir / MODEL_FILE.format(key=path.stem)).unlink(missing_ok=True)
@@ -0,0 +1,85 @@
+import numpy as np
+from sklearn.feature_extraction.text import CountVectorizer
+
+EPSILON = 1e-12
+
+def build_doc_term_matrix(docs, sample_size=None, random_state=42):
+    """
+    Matriks dokumen x kata (biner, sparse) dengan tokenisasi str.split seperti korpus gensim.
+    Bangun sekali lalu pakai ulang untuk coherence beberapa model.
+    """
+    docs = list(docs)
+    if sample_size is not None and sample_size < len(docs):
+        rng = np.random.default_rng(random_state)
+        docs = [docs[i] for i in rng.choice(len(docs), size=sample_size, replace=False)]
+
+    vectorizer = CountVectorizer(tokenizer=str.split, token_pattern=None, lowercase=False, binary=True)
+    doc_term = vectorizer.fit_transform(docs).tocsc()
+    return doc_term, vectorizer.vocabulary_
+
+def topic_words_from_model(topic_model, top_n_words=10):
+    topic_words = topic_model.get_topics()
+    return [
+        [word for word, _ in topic_words[t][:top_n_words]]
+        for t in topic_words if t != -1 and topic_words[t]
+    ]
+
+def _topic_index_matrix(topics, vocabulary):
+    """Indeks kata per topik (dipad dengan -1); kata di luar korpus diabaikan."""
+    indexed = [[vocabulary[w] for w in words if w in vocabulary] for words in topics]
+    width = max((len(words) for words in indexed), default=0)
+    index = np.full((len(indexed), width), -1, dtype=np.int64)
+    for t, words in enumerate(indexed):
+        index[t, :len(words)] = words
+    return index
+
+def topic_coherence(topics, doc_term, vocabulary, measure="u_mass"):
+    """
+    Coherence semua topik sekaligus dari co-occurrence sparse (X^T X pada kata-kata topik saja).
+    u_mass mengikuti segmentasi one_pre gensim; c_npmi memakai co-occurrence tingkat dokumen
+    (judul lebih pendek dari jendela geser 10 kata gensim). Mengembalikan (rata-rata, per topik).
+    """
+    if measure not in ["u_mass", "c_npmi"]:
+        raise ValueError(f"Measure '{measure}' tidak didukung, gunakan 'u_mass' atau 'c_npmi'.")
+
+    index = _topic_index_matrix(topics, vocabulary)
+    if index.size == 0:
+        return 0.0, np.array([])
+
+    used = np.unique(index[index >= 0])
+    local = np.full(index.shape, -1, dtype=np.int64)
+    local[index >= 0] = np.searchsorted(used, index[index >= 0])
+
+    sub = doc_term[:, used]
+    co_occur = np.asarray((sub.T @ sub).todense(), dtype=np.float64)
+    occurrence = np.diag(co_occur).copy()
+    num_docs = doc_term.shape[0]
+
+    later, earlier = np.tril_indices(index.shape[1], -1)
+    w_prime = local[:, later]
+    w_star = local[:, earlier]
+    valid = (w_prime >= 0) & (w_star >= 0)
+    w_prime_safe = np.where(valid, w_prime, 0)
+    w_star_safe = np.where(valid, w_star, 0)
+    joint = co_occur[w_prime_safe, w_star_safe]
+
+    p_joint = joint / num_docs
+    p_prime = occurrence[w_prime_safe] / num_docs
+    p_star = np.maximum(occurrence[w_star_safe], 1) / num_docs
+    if measure == "u_mass":
+        scores = np.log((p_joint + EPSILON) / p_star)
+    else:
+        pmi = np.log((p_joint + EPSILON) / np.maximum(p_prime * p_star, EPSILON))
+        scores = pmi / -np.log(p_joint + EPSILON)
+
+    scores = np.where(valid, scores, 0.0)
+    counts = valid.sum(axis=1)
+    per_topic = np.divide(scores.sum(axis=1), counts, out=np.zeros(len(counts)), where=counts > 0)
+    per_topic = per_topic[counts > 0]
+    return (float(per_topic.mean()) if per_topic.size else 0.0), per_topic
+
+def topic_diversity(topics, top_k=10):
+    """Proporsi kata unik di seluruh topik (semakin tinggi semakin beragam)."""
+    topics = [words[:top_k] for words in topics if words]
+    total = sum(len(words) for words in topics)
+    return len({w for words in topics for w in words}) / total if total > 0 else 0
@@ -0,0 +1,82 @@
+import os
+import sys
+import pandas as pd
+from pathlib import Path
+from logging_config import setup_logging
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+DATA_DIR = BASE_DIR / "data" / "cleaned"
+OUTPUT_DIR = DATA_DIR / "output"
+LOGS_DIR = BASE_DIR / "logs"
+
+TOPIC_ASSIGNMENT_PATH = OUTPUT_DIR / "topic_assignments"
+FINAL_PUBLICATION_PATH = DATA_DIR / "final_publication"
+TOPIC_YEAR_PATH = OUTPUT_DIR / "trend_topic_year"
+DOMAIN_YEAR_PATH = OUTPUT_DIR / "trend_domain_year"
+NIP_TOPICS_PATH = OUTPUT_DIR / "trend_nip_topics"
+
+TOP_TOPICS_PER_NIP = int(os.getenv("TOP_TOPICS_PER_NIP", "5"))
+
+sys.path.insert(0, str(BASE_DIR / "src" / "data-cleaning"))
+
+from stage_io import read_stage, stage_exists, write_stage
+from sort_publication import attach_topics
+
+log = setup_logging(__name__, log_dir=LOGS_DIR)
+
+def topic_year_counts(df_topic):
+    """Jumlah judul per topik per tahun (outlier -1 tidak dihitung)."""
+    df = df_topic[df_topic["topic"] != -1].dropna(subset=["tahun"])
+    return (
+        df.groupby(["topic", "topic_name", "tahun"]).size()
+        .reset_index(name="count")
+        .sort_values(["tahun", "count"], ascending=[True, False])
+        .reset_index(drop=True)
+    )
+
+def domain_year_counts(df_topic):
+    df = df_topic.dropna(subset=["tahun"])
+    return (
+        df.groupby(["domain", "tahun"]).size()
+        .reset_index(name="count")
+        .sort_values(["tahun", "count"], ascending=[True, False])
+        .reset_index(drop=True)
+    )
+
+def top_topics_per_nip(df_pub, df_topic, top_n=TOP_TOPICS_PER_NIP):
+    """Topik terbanyak tiap dosen; publikasi dicocokkan ke topik lewat judul yang sudah dibersihkan."""
+    df = attach_topics(df_pub.drop(columns=["topic", "domain"], errors="ignore"), df_topic)
+    df = df.dropna(subset=["nip", "topic"])
+    df = df[df["topic"] != -1]
+    counts = df.groupby(["nip", "topic"]).size().reset_index(name="count")
+    counts = counts.sort_values(["nip", "count", "topic"], ascending=[True, False, True])
+    counts["rank"] = counts.groupby("nip").cumcount() + 1
+    counts = counts[counts["rank"] <= top_n]
+
+    topic_names = df_topic.drop_duplicates(subset=["topic"]).set_index("topic")["topic_name"]
+    counts["topic_name"] = counts["topic"].map(topic_names)
+    return counts[["nip", "rank", "topic", "topic_name", "count"]].reset_index(drop=True)
+
+def main():
+    if not stage_exists(TOPIC_ASSIGNMENT_PATH):
+        raise FileNotFoundError(f"Topic assignments '{TOPIC_ASSIGNMENT_PATH}' not found, run the trend stage first.")
+
+    df_topic = read_stage(TOPIC_ASSIGNMENT_PATH)
+    df_topic["tahun"] = pd.to_numeric(df_topic["tahun"], errors="coerce").astype("Int64")
+
+    topic_year = topic_year_counts(df_topic)
+    domain_year = domain_year_counts(df_topic)
+    write_stage(topic_year, TOPIC_YEAR_PATH)
+    write_stage(domain_year, DOMAIN_YEAR_PATH)
+    log.info(f"Topic x year: {len(topic_year)} rows, domain x year: {len(domain_year)} rows")
+
+    if stage_exists(FINAL_PUBLICATION_PATH):
+        nip_topics = top_topics_per_nip(read_stage(FINAL_PUBLICATION_PATH), df_topic)
+    else:
+        log.warning(f"'{FINAL_PUBLICATION_PATH}' not found, top topics per NIP left empty.")
+        nip_topics = pd.DataFrame(columns=["nip", "rank", "topic", "topic_name", "count"])
+    write_stage(nip_topics, NIP_TOPICS_PATH)
+    log.info(f"Top topics per NIP: {nip_topics['nip'].nunique()} NIPs")
+
+if __name__ == "__main__":
+    main()
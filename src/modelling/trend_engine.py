@@ -0,0 +1,124 @@
+import os
+import re
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+# auto: nr_bins interval sama lebar seperti topics_over_time BERTopic; year/semester/quarter
+# atau "<n>y" / "<n>m" untuk periode kalender (periode bulanan butuh timestamp bertanggal).
+TREND_BIN = os.getenv("TREND_BIN", "auto").lower()
+TREND_WORDS = 5
+# Jumlah sel skor yang dijadikan dense sekaligus saat memilih top kata (~40 MB float64).
+TOP_WORDS_CHUNK = 5_000_000
+BIN_ALIASES = {"year": "1y", "semester": "6m", "quarter": "3m"}
+
+def parse_bin(spec):
+    """Lebar bin dalam bulan, atau None untuk 'auto'."""
+    spec = BIN_ALIASES.get(spec, spec)
+    if spec == "auto":
+        return None
+    match = re.fullmatch(r"(\d+)([ym])", spec)
+    if not match or int(match.group(1)) < 1:
+        raise ValueError(f"TREND_BIN '{spec}' tidak dikenal, gunakan auto, year, semester, quarter, <n>y atau <n>m.")
+    width = int(match.group(1))
+    return width * 12 if match.group(2) == "y" else width
+
+def bin_starts(timestamps, bin_spec=TREND_BIN, nr_bins=None):
+    """Awal periode tiap dokumen; 'auto' mengikuti pd.cut(nr_bins) yang dipakai BERTopic."""
+    timestamps = pd.Series(pd.to_datetime(timestamps)).reset_index(drop=True)
+    months = parse_bin(bin_spec)
+    if months is None:
+        if not nr_bins:
+            return timestamps
+        cut = pd.cut(timestamps, bins=nr_bins)
+        return pd.Series(cut.cat.categories.left[cut.cat.codes])
+
+    month_index = (timestamps.dt.year * 12 + timestamps.dt.month - 1) // months * months
+    return pd.to_datetime(pd.DataFrame({"year": month_index // 12, "month": month_index % 12 + 1, "day": 1}))
+
+def build_trend_matrix(topic_model, docs):
+    """Satu matriks dokumen x kata dengan vectorizer model; dipakai untuk semua tren topik dan domain."""
+    preprocess = getattr(topic_model, "_preprocess_text", lambda documents: list(documents))
+    doc_term = topic_model.vectorizer_model.transform(preprocess(np.asarray(list(docs), dtype=object)))
+    return doc_term.tocsr(), topic_model.vectorizer_model.get_feature_names_out()
+
+def grouped_counts(doc_term, labels, starts):
+    """
+    Jumlah kata per (label, periode) dengan satu perkalian matriks indikator sparse.
+    Sama dengan menggabungkan judul per grup lalu meng-vectorize ulang (unigram).
+    """
+    grouped = pd.DataFrame({"label": labels, "start": np.asarray(starts)}).groupby(["label", "start"], sort=True)
+    codes = grouped.ngroup().to_numpy()
+    sizes = grouped.size()
+    indicator = sparse.csr_matrix(
+        (np.ones(len(codes), dtype=doc_term.dtype), (codes, np.arange(len(codes)))),
+        shape=(len(sizes), doc_term.shape[0])
+    )
+    return indicator @ doc_term, sizes.index, sizes.to_numpy()
+
+def top_words(matrix, words, top_n=TREND_WORDS):
+    """Top-n kata per baris (skor > 0) dengan partition per blok baris, tanpa sort seluruh kosakata."""
+    matrix = sparse.csr_matrix(matrix)
+    words = np.asarray(words, dtype=object)
+    top_n = min(top_n, matrix.shape[1])
+    chunk = max(1, TOP_WORDS_CHUNK // max(1, matrix.shape[1]))
+    result = []
+    for start in range(0, matrix.shape[0], chunk):
+        scores = matrix[start:start + chunk].toarray()
+        # Skor ke-n tiap baris; skor sama di batas dipilih menurut urutan kolom agar hasil deterministik.
+        kth = -np.partition(-scores, top_n - 1, axis=1)[:, top_n - 1:top_n]
+        above = scores > kth
+        ties = scores == kth
+        selected = above | (ties & (np.cumsum(ties, axis=1) <= top_n - above.sum(axis=1, keepdims=True)))
+        top = np.nonzero(selected)[1].reshape(len(scores), top_n)
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        result.extend(", ".join(words[idx][val > 0]) for idx, val in zip(top, top_scores))
+    return result
+
+def group_c_tf_idf(topic_model, counts):
+    """c-TF-IDF tiap grup dengan idf dari model (tanpa fit ulang), dinormalisasi L1."""
+    return normalize(topic_model.ctfidf_model.transform(counts), axis=1, norm="l1", copy=False)
+
+def topics_over_time(topic_model, doc_term, words, topics, timestamps, bin_spec=TREND_BIN, nr_bins=None,
+                     top_n=TREND_WORDS):
+    """
+    Pengganti topic_model.topics_over_time: semua pasangan topik x periode dihitung sekaligus dari
+    satu matriks dokumen-kata, lalu dirata-rata dengan c-TF-IDF global topiknya (global tuning).
+    Hasilnya berkolom topic, topic_words, tahun (awal periode) dan count.
+    """
+    if doc_term.shape[0] == 0:
+        return pd.DataFrame(columns=["topic", "topic_words", "tahun", "count"])
+    starts = bin_starts(timestamps, bin_spec, nr_bins)
+    counts, groups, sizes = grouped_counts(doc_term, np.asarray(topics), starts)
+    group_topics = groups.get_level_values(0).to_numpy(dtype=np.int64)
+
+    c_tf_idf = group_c_tf_idf(topic_model, counts)
+    global_c_tf_idf = normalize(topic_model.c_tf_idf_, axis=1, norm="l1", copy=True)
+    # Baris global per id topik. BERTopic 0.17.4 memakai posisi topik di antara semua topik yang ada
+    # di input (terurut), hasilnya sama selama semua topik muncul di input, seperti judul training.
+    c_tf_idf = (global_c_tf_idf[group_topics + getattr(topic_model, "_outliers", 0)] + c_tf_idf) / 2.0
+
+    return pd.DataFrame({
+        "topic": group_topics,
+        "topic_words": top_words(c_tf_idf, words, top_n),
+        "tahun": groups.get_level_values(1),
+        "count": sizes,
+    })
+
+def domains_over_time(topic_model, doc_term, words, domains, timestamps, bin_spec=TREND_BIN, nr_bins=None,
+                      top_n=TREND_WORDS):
+    """Rollup tren per domain: jumlah judul dan kata khas tiap domain per periode."""
+    if doc_term.shape[0] == 0:
+        return pd.DataFrame(columns=["domain", "domain_words", "tahun", "count"])
+    starts = bin_starts(timestamps, bin_spec, nr_bins)
+    counts, groups, sizes = grouped_counts(doc_term, np.asarray(domains, dtype=object), starts)
+    return pd.DataFrame({
+        "domain": groups.get_level_values(0),
+        "domain_words": top_words(group_c_tf_idf(topic_model, counts), words, top_n),
+        "tahun": groups.get_level_values(1),
+        "count": sizes,
+    })